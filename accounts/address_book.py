@@ -0,0 +1,106 @@
+# accounts/address_book.py
+import logging
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import SavedAddress
+
+logger = logging.getLogger(__name__)
+
+MAX_SAVED_ADDRESSES = 5
+ADDRESS_BOOK_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+CONTACT_FIELDS = ('first_name', 'last_name', 'phone')
+
+
+def _cache_key(user_id):
+    return f"address-book:{user_id}"
+
+
+def get_address_book(user):
+    """
+    The user's saved addresses, most recently used first, as plain dicts.
+    Served from the cache backend; the table is only read after the book changes.
+    """
+    key = _cache_key(user.pk)
+    book = cache.get(key)
+    if book is None:
+        book = [address.as_prefill() for address in SavedAddress.objects.filter(user=user)[:MAX_SAVED_ADDRESSES]]
+        cache.set(key, book, ADDRESS_BOOK_CACHE_TIMEOUT)
+    return book
+
+
+def remember_address(user, *, address_line_1, address_line_2='', area='', state='', country='',
+                     first_name='', last_name='', phone=''):
+    """
+    Add an address to the user's book, or mark an existing identical one as just used.
+    The book keeps the MAX_SAVED_ADDRESSES most recently used entries.
+    """
+    if not getattr(user, 'is_authenticated', False) or not (address_line_1 or '').strip():
+        return None
+
+    values = {
+        'first_name': first_name or '',
+        'last_name': last_name or '',
+        'phone': phone or '',
+        'address_line_1': address_line_1.strip(),
+        'address_line_2': (address_line_2 or '').strip(),
+        'area': (area or '').strip(),
+        'state': (state or '').strip(),
+        'country': (country or '').strip() or 'Bangladesh',
+        'last_used_at': timezone.now(),
+    }
+    fingerprint = SavedAddress.make_fingerprint(
+        values['address_line_1'], values['address_line_2'], values['area'], values['state'],
+    )
+
+    address = None
+    try:
+        with transaction.atomic():
+            address = SavedAddress.objects.filter(user=user, fingerprint=fingerprint).first()
+            if address is None:
+                address = SavedAddress(user=user)
+            for field, value in values.items():
+                # Keep the contact details from earlier uses when this one didn't supply them.
+                if value or field not in CONTACT_FIELDS:
+                    setattr(address, field, value)
+            address.save()
+
+            stale = SavedAddress.objects.filter(user=user).values_list('pk', flat=True)[MAX_SAVED_ADDRESSES:]
+            SavedAddress.objects.filter(pk__in=list(stale)).delete()
+    except IntegrityError:
+        # Two requests saved the same address at once; the other one won.
+        logger.info(f"Address book entry for user {user.pk} was saved concurrently")
+
+    cache.delete(_cache_key(user.pk))
+    return address
+
+
+def remember_order_address(order):
+    return remember_address(
+        order.user,
+        first_name=order.first_name,
+        last_name=order.last_name,
+        phone=order.phone,
+        address_line_1=order.address_line_1,
+        address_line_2=order.address_line_2,
+        area=order.area,
+        state=order.state,
+        country=order.country,
+    )
+
+
+def remember_profile_address(profile):
+    user = profile.user
+    return remember_address(
+        user,
+        first_name=user.first_name,
+        last_name=user.last_name,
+        phone=user.phone_number,
+        address_line_1=profile.address_line_1,
+        address_line_2=profile.address_line_2,
+        area=profile.area,
+        state=profile.city,
+        country=profile.country,
+    )
@@ -2,7 +2,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.html import format_html
-from .models import Account, UserProfile
+from .models import Account, UserProfile, SavedAddress
 
 class AccountAdmin(UserAdmin):
     list_display = ('email', 'first_name', 'last_name', 'username', 'last_login', 'date_joined', 'is_active')
@@ -41,6 +41,13 @@ class UserProfileAdmin(admin.ModelAdmin):
 
     list_display = ('thumbnail', 'user', 'area', 'city', 'country')
 
+class SavedAddressAdmin(admin.ModelAdmin):
+    list_display = ('user', 'address_line_1', 'area', 'state', 'phone', 'last_used_at')
+    list_select_related = ('user',)
+    search_fields = ('user__email', 'address_line_1', 'area', 'state', 'phone')
+    list_filter = ('state',)
+    readonly_fields = ('last_used_at',)
+
 admin.site.register(Account, AccountAdmin)
 admin.site.register(UserProfile, UserProfileAdmin)
-
+admin.site.register(SavedAddress, SavedAddressAdmin)
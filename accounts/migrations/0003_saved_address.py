@@ -0,0 +1,37 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_userprofile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedAddress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_name', models.CharField(blank=True, max_length=50)),
+                ('last_name', models.CharField(blank=True, max_length=50)),
+                ('phone', models.CharField(blank=True, max_length=20)),
+                ('address_line_1', models.CharField(max_length=100)),
+                ('address_line_2', models.CharField(blank=True, max_length=100)),
+                ('area', models.CharField(blank=True, max_length=100)),
+                ('state', models.CharField(blank=True, max_length=50)),
+                ('country', models.CharField(blank=True, default='Bangladesh', max_length=50)),
+                ('fingerprint', models.CharField(editable=False, max_length=255)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_addresses', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-last_used_at'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'fingerprint'), name='accounts_address_user_fp_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:20
+
+from django.db import migrations
+
+MAX_SAVED_ADDRESSES = 5
+
+
+def _fingerprint(*parts):
+    # Same as SavedAddress.make_fingerprint (historical models have no custom methods)
+    return '|'.join(' '.join((p or '').lower().split()) for p in parts)[:255]
+
+
+def seed_saved_addresses(apps, schema_editor):
+    SavedAddress = apps.get_model('accounts', 'SavedAddress')
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    Order = apps.get_model('orders', 'Order')
+
+    books = {}  # user_id -> {fingerprint: SavedAddress}
+
+    def add(user_id, used_at, **fields):
+        fields = {key: (value or '').strip() for key, value in fields.items()}
+        if not fields['address_line_1']:
+            return
+        fp = _fingerprint(fields['address_line_1'], fields['address_line_2'], fields['area'], fields['state'])
+        book = books.setdefault(user_id, {})
+        if fp in book or len(book) >= MAX_SAVED_ADDRESSES:
+            return
+        book[fp] = SavedAddress(
+            user_id=user_id,
+            fingerprint=fp,
+            last_used_at=used_at,
+            country=fields.pop('country') or 'Bangladesh',
+            **fields,
+        )
+
+    # Newest orders first, so each user's book keeps their most recent addresses
+    orders = (
+        Order.objects.filter(is_ordered=True, user__isnull=False)
+        .order_by('-created_at')
+        .values_list('user_id', 'created_at', 'first_name', 'last_name', 'phone',
+                     'address_line_1', 'address_line_2', 'area', 'state', 'country')
+    )
+    for user_id, created_at, first_name, last_name, phone, line_1, line_2, area, state, country in orders.iterator():
+        add(user_id, created_at, first_name=first_name, last_name=last_name, phone=phone,
+            address_line_1=line_1, address_line_2=line_2, area=area, state=state, country=country)
+
+    profiles = UserProfile.objects.select_related('user').order_by('id')
+    for profile in profiles.iterator():
+        user = profile.user
+        add(user.pk, user.date_joined, first_name=user.first_name, last_name=user.last_name, phone=user.phone_number,
+            address_line_1=profile.address_line_1, address_line_2=profile.address_line_2,
+            area=profile.area, state=profile.city, country=profile.country)
+
+    SavedAddress.objects.bulk_create(
+        [address for book in books.values() for address in book.values()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_saved_address'),
+        ('orders', '0020_backfill_order_subtotals'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_saved_addresses, migrations.RunPython.noop),
+    ]
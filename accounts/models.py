@@ -2,6 +2,7 @@
 
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
+from django.utils import timezone
 
 class MyAccountManager(BaseUserManager):
     def create_user(self, first_name, last_name, username, email, password=None):
@@ -82,4 +83,51 @@ class UserProfile(models.Model):
         return self.user.first_name
     
     def full_address(self):
-        return f'{self.address_line_1} {self.address_line_2}'
\ No newline at end of file
+        return f'{self.address_line_1} {self.address_line_2}'
+
+class SavedAddress(models.Model):
+    """A delivery address the customer has used before; offered again at checkout."""
+    user = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='saved_addresses')
+    first_name = models.CharField(max_length=50, blank=True)
+    last_name = models.CharField(max_length=50, blank=True)
+    phone = models.CharField(max_length=20, blank=True)
+    address_line_1 = models.CharField(max_length=100)
+    address_line_2 = models.CharField(max_length=100, blank=True)
+    area = models.CharField(max_length=100, blank=True)
+    state = models.CharField(max_length=50, blank=True)  # district
+    country = models.CharField(max_length=50, blank=True, default='Bangladesh')
+    # Lower-cased address/area/district, used to fold repeats of the same address together
+    fingerprint = models.CharField(max_length=255, editable=False)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-last_used_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'fingerprint'], name='accounts_address_user_fp_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.address_line_1}, {self.area}, {self.state}'.strip(', ')
+
+    @staticmethod
+    def make_fingerprint(address_line_1, address_line_2, area, state):
+        parts = (address_line_1, address_line_2, area, state)
+        return '|'.join(' '.join((p or '').lower().split()) for p in parts)[:255]
+
+    def save(self, *args, **kwargs):
+        self.fingerprint = self.make_fingerprint(self.address_line_1, self.address_line_2, self.area, self.state)
+        super().save(*args, **kwargs)
+
+    def as_prefill(self):
+        return {
+            'id': self.pk,
+            'label': str(self),
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'phone': self.phone,
+            'address_line_1': self.address_line_1,
+            'address_line_2': self.address_line_2,
+            'area': self.area,
+            'state': self.state,
+            'country': self.country or 'Bangladesh',
+        }
@@ -1,3 +1,40 @@
+# accounts/tests.py
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from core.testing import QueryPlanTestMixin, create_customer, create_product
+from orders.models import Order, OrderProduct
+
+
+class AccountQueryPlanTests(QueryPlanTestMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_customer()
+        product = create_product()
+        cls.orders = []
+        for status in ('New', 'Completed'):
+            order = Order.objects.create(user=cls.user, first_name='Test', last_name='Customer',
+                                         phone='01700000000', email='customer@example.com',
+                                         address_line_1='Road 1', country='Bangladesh', state='Dhaka',
+                                         order_total=650, delivery_charge=150, status=status,
+                                         is_ordered=True)
+            OrderProduct.objects.create(order=order, user=cls.user, product=product,
+                                        quantity=1, product_price=500, ordered=True)
+            cls.orders.append(order)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_dashboard(self):
+        response = self.assertNoFullScans(self.client.get, reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_my_orders(self):
+        response = self.assertNoFullScans(self.client.get, reverse('my_orders'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_order_detail(self):
+        for order in self.orders:
+            response = self.assertNoFullScans(self.client.get, reverse('order_detail', args=[order.order_number]))
+            self.assertEqual(response.status_code, 200)
@@ -2,45 +2,48 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from .forms import RegistrationForm, UserForm, UserProfileForm
 from .models import Account, UserProfile
-from orders.models import Order, OrderProduct
+from .address_book import remember_profile_address
+from orders.models import ArchivedOrder, Order
+from orders.services import paginate_customer_orders, load_order_lines, render_order_fragment
 
 from django.contrib import messages, auth
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse
 
 from django.contrib.sites.shortcuts import get_current_site
-from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from django.utils.encoding import force_bytes
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import EmailMultiAlternatives
-from django.utils.html import strip_tags
+from core.email_templates import render_email
+from core.mail import build_email, send_email
 
 from carts.views import _cart_id
 from carts.models import Cart, CartItem
 
 import requests
 
+MY_ORDERS_PAGE_SIZE = 10
+
 
 # ---------------------------
 # Helper: send multipart HTML email
 # ---------------------------
-def _send_templated_email(*, subject: str, html_template: str, context: dict, to_email: str) -> None:
+def _send_templated_email(*, subject: str, template: str, context: dict, to_email: str) -> None:
     """
-    Sends a multipart/alternative email (plain text + HTML).
+    Sends a multipart/alternative email (plain text + HTML) rendered from
+    `<template>.html` and `<template>.txt`.
     Ensures clients like Gmail render the HTML version.
     """
-    html_body = render_to_string(html_template, context)
-    text_body = strip_tags(html_body)  # simple plaintext fallback
+    html_body, text_body = render_email(template, context)
 
-    email = EmailMultiAlternatives(
+    email = build_email(
         subject=subject,
-        body=text_body,  # text/plain
+        html_body=html_body,
+        text_body=text_body,  # text/plain
         to=[to_email],
     )
-    email.attach_alternative(html_body, "text/html")  # HTML part
-    email.send(fail_silently=False)
+    send_email(email, fail_silently=False)
 
 
 def register(request):
@@ -79,7 +82,7 @@ def register(request):
             # Send verification email (multipart)
             _send_templated_email(
                 subject="Please Activate Your Account",
-                html_template="accounts/account_verification_email.html",
+                template="accounts/account_verification_email",
                 context={
                     "user": user,
                     "activation_url": activation_url,
@@ -158,10 +161,13 @@ def activate(request, uidb64, token):
 
 @login_required(login_url='login')
 def dashboard(request):
-    orders = Order.objects.filter(user_id=request.user.id, is_ordered=True).order_by('-created_at')
+    orders_count = (
+        Order.objects.filter(user_id=request.user.id, is_ordered=True).count()
+        + ArchivedOrder.objects.filter(user_id=request.user.id).count()
+    )
     userprofile, _ = UserProfile.objects.get_or_create(user=request.user)
     return render(request, 'accounts/dashboard.html', {
-        'orders_count': orders.count(),
+        'orders_count': orders_count,
         'userprofile': userprofile,
     })
 
@@ -183,7 +189,7 @@ def forgotPassword(request):
 
         _send_templated_email(
             subject="Reset Your Password",
-            html_template="accounts/reset_password_email.html",
+            template="accounts/reset_password_email",
             context={
                 "user": user,
                 "reset_url": reset_url,
@@ -235,8 +241,17 @@ def resetPassword(request):
 
 @login_required(login_url='login')
 def my_orders(request):
-    orders = Order.objects.filter(user=request.user, is_ordered=True).order_by('-created_at')
-    return render(request, 'accounts/my_orders.html', {'orders': orders})
+    cursor = request.GET.get('cursor')
+    orders, next_cursor = paginate_customer_orders(
+        request.user,
+        cursor=cursor,
+        page_size=MY_ORDERS_PAGE_SIZE,
+    )
+    return render(request, 'accounts/my_orders.html', {
+        'orders': orders,
+        'next_cursor': next_cursor,
+        'is_first_page': not cursor,
+    })
 
 
 @login_required(login_url='login')
@@ -248,7 +263,8 @@ def edit_profile(request):
         profile_form = UserProfileForm(request.POST, request.FILES, instance=userprofile)
         if user_form.is_valid() and profile_form.is_valid():
             user_form.save()
-            profile_form.save()
+            profile = profile_form.save()
+            remember_profile_address(profile)
             messages.success(request, 'Your profile has been updated.')
             return redirect('edit_profile')
     else:
@@ -289,13 +305,25 @@ def change_password(request):
 
 @login_required(login_url='login')
 def order_detail(request, order_id):
-    order = Order.objects.get(order_number=order_id)
-    order_detail = OrderProduct.objects.filter(order__order_number=order_id)
-    subtotal = sum(i.product_price * i.quantity for i in order_detail)
-
+    archived = None
+    order = Order.objects.select_related('payment').filter(order_number=order_id, user=request.user).first()
+    if order is None:
+        # Finished orders move to the archive after a while; show them from there.
+        archived = ArchivedOrder.objects.filter(order_number=order_id, user=request.user).first()
+        if archived is None:
+            raise Http404("No order matches the given query.")
+        order = archived.as_order()
+
+    def build_context():
+        lines = archived.as_order_lines() if archived else load_order_lines(order)
+        return {
+            'order': order,
+            'order_detail': lines,
+            'subtotal': order.subtotal,
+        }
+
+    invoice_html = render_order_fragment(order, 'includes/order_invoice.html', build_context)
     return render(request, 'accounts/order_detail.html', {
-        'order_detail': order_detail,
         'order': order,
-        'subtotal': subtotal,
+        'invoice_html': invoice_html,
     })
-    return render(request, 'accounts/order_detail.html',context)
\ No newline at end of file
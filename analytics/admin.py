@@ -0,0 +1,44 @@
+# analytics/admin.py
+from django.contrib import admin
+from .models import DailySales, DailyProductSales, DailyDistrictSales, DailyPaymentMethodSales
+
+
+class ReadOnlyRollupAdmin(admin.ModelAdmin):
+    """Rollup rows are written by the refresh job only."""
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailySales)
+class DailySalesAdmin(ReadOnlyRollupAdmin):
+    list_display = ('day', 'revenue', 'order_count', 'units', 'updated_at')
+    date_hierarchy = 'day'
+
+    change_list_template = 'admin/analytics/dailysales/change_list.html'
+
+
+@admin.register(DailyProductSales)
+class DailyProductSalesAdmin(ReadOnlyRollupAdmin):
+    list_display = ('day', 'product_name', 'units', 'revenue')
+    list_filter = ('day',)
+    search_fields = ('product_name',)
+
+
+@admin.register(DailyDistrictSales)
+class DailyDistrictSalesAdmin(ReadOnlyRollupAdmin):
+    list_display = ('day', 'district', 'order_count', 'revenue')
+    list_filter = ('day',)
+    search_fields = ('district',)
+
+
+@admin.register(DailyPaymentMethodSales)
+class DailyPaymentMethodSalesAdmin(ReadOnlyRollupAdmin):
+    list_display = ('day', 'payment_method', 'order_count', 'revenue')
+    list_filter = ('day', 'payment_method')
@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_delete
+
+
+class AnalyticsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'analytics'
+
+    def ready(self):
+        # A deleted order leaves nothing behind for the incremental refresh to find
+        from orders.models import ArchivedOrder, Order
+        from .services import order_deleted
+
+        post_delete.connect(order_deleted, sender=Order, dispatch_uid='analytics.rollups.order_deleted')
+        post_delete.connect(order_deleted, sender=ArchivedOrder, dispatch_uid='analytics.rollups.archived_order_deleted')
@@ -0,0 +1,15 @@
+# analytics/management/commands/refresh_sales_rollups.py
+from django.core.management.base import BaseCommand
+
+from analytics.services import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = "Refresh the daily sales rollup tables from orders changed since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild every day instead of only changed days')
+
+    def handle(self, *args, **options):
+        days = refresh_rollups(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(days)} day(s) of sales rollups."))
@@ -0,0 +1,94 @@
+# analytics/models.py
+from decimal import Decimal
+from django.db import models
+from store.models import Product
+
+
+class RollupState(models.Model):
+    """Bookkeeping for incremental rollup refreshes."""
+    name = models.CharField(max_length=50, unique=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} (last run: {self.last_run_at or 'never'})"
+
+
+class StaleRollupDay(models.Model):
+    """A day whose orders were deleted; the next refresh rebuilds it (updated_at cannot show a delete)."""
+    day = models.DateField(unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.day} (stale)"
+
+
+class DailySales(models.Model):
+    day = models.DateField(unique=True)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+    order_count = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Daily Sales'
+        verbose_name_plural = 'Daily Sales'
+        ordering = ['-day']
+
+    def __str__(self):
+        return f"{self.day}: Tk. {self.revenue} ({self.order_count} orders)"
+
+
+class DailyProductSales(models.Model):
+    day = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True, blank=True)
+    product_name = models.CharField(max_length=200)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+
+    class Meta:
+        verbose_name = 'Daily Product Sales'
+        verbose_name_plural = 'Daily Product Sales'
+        ordering = ['-day', '-units']
+        indexes = [
+            models.Index(fields=['day', 'product'], name='analytics_dps_day_product_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: {self.product_name} × {self.units}"
+
+
+class DailyDistrictSales(models.Model):
+    day = models.DateField()
+    district = models.CharField(max_length=50)
+    order_count = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+
+    class Meta:
+        verbose_name = 'Daily District Sales'
+        verbose_name_plural = 'Daily District Sales'
+        ordering = ['-day', '-revenue']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'district'], name='analytics_dds_day_district_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: {self.district} Tk. {self.revenue}"
+
+
+class DailyPaymentMethodSales(models.Model):
+    day = models.DateField()
+    payment_method = models.CharField(max_length=100)
+    order_count = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+
+    class Meta:
+        verbose_name = 'Daily Payment Method Sales'
+        verbose_name_plural = 'Daily Payment Method Sales'
+        ordering = ['-day', 'payment_method']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'payment_method'], name='analytics_dpms_day_method_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: {self.payment_method} × {self.order_count}"
@@ -0,0 +1,168 @@
+# analytics/services.py
+import datetime
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from orders.models import ArchivedOrder, Order, OrderProduct
+from store.models import Product
+from .models import (
+    RollupState, StaleRollupDay, DailySales, DailyProductSales, DailyDistrictSales, DailyPaymentMethodSales,
+)
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_NAME = 'daily_sales'
+
+
+def refresh_rollups(full=False):
+    """
+    Bring the daily rollup tables up to date.
+
+    Only days that contain orders (or order lines) created or modified since the
+    previous run, or lost an order (StaleRollupDay), are rebuilt, one day per
+    transaction, so the job never holds a long write lock on the order tables.
+    `full=True` rebuilds every day. Returns the list of days that were rebuilt.
+    """
+    state, _ = RollupState.objects.get_or_create(name=ROLLUP_NAME)
+    started_at = timezone.now()
+    stale = dict(StaleRollupDay.objects.values_list('pk', 'day'))
+
+    if full or state.last_run_at is None:
+        days = set(
+            Order.objects.annotate(day=TruncDate('created_at'))
+            .values_list('day', flat=True).distinct()
+        )
+        days |= set(
+            ArchivedOrder.objects.annotate(day=TruncDate('created_at'))
+            .values_list('day', flat=True).distinct()
+        )
+        days |= set(DailySales.objects.values_list('day', flat=True))
+    else:
+        since = state.last_run_at
+        days = set(
+            Order.objects.filter(updated_at__gte=since)
+            .annotate(day=TruncDate('created_at'))
+            .values_list('day', flat=True).distinct()
+        )
+        days |= set(
+            OrderProduct.objects.filter(updated_at__gte=since)
+            .annotate(day=TruncDate('order__created_at'))
+            .values_list('day', flat=True).distinct()
+        )
+
+    days |= set(stale.values())
+
+    rebuilt = sorted(day for day in days if day is not None)
+    for day in rebuilt:
+        rebuild_day(day)
+    StaleRollupDay.objects.filter(pk__in=list(stale)).delete()
+
+    state.last_run_at = started_at
+    state.save(update_fields=['last_run_at', 'updated_at'])
+    logger.info(f"Sales rollups refreshed for {len(rebuilt)} day(s)")
+    return rebuilt
+
+
+def order_deleted(sender, instance, **kwargs):
+    """post_delete of Order/ArchivedOrder: have the next refresh rebuild the order's day."""
+    if instance.created_at and getattr(instance, 'is_ordered', True):
+        StaleRollupDay.objects.bulk_create(
+            [StaleRollupDay(day=timezone.localdate(instance.created_at))],
+            ignore_conflicts=True,
+        )
+
+
+def _day_bounds(day):
+    start = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+    return start, start + datetime.timedelta(days=1)
+
+
+@transaction.atomic
+def rebuild_day(day):
+    """
+    Recompute every rollup row for a single (local) day from the order tables.
+    Orders already moved to the archive (orders.archive) are counted from their snapshots.
+    """
+    start, end = _day_bounds(day)
+    orders = (
+        Order.objects
+        .filter(is_ordered=True, created_at__gte=start, created_at__lt=end)
+        .exclude(status='Cancelled')
+    )
+    lines = OrderProduct.objects.filter(order__in=orders)
+    archived = list(
+        ArchivedOrder.objects
+        .filter(created_at__gte=start, created_at__lt=end)
+        .exclude(status='Cancelled')
+    )
+    archived_lines = [entry['row']['fields'] | {'product_name': entry.get('product_name')}
+                      for order in archived for entry in order.data.get('lines', [])]
+
+    totals = orders.aggregate(revenue=Sum('order_total'), order_count=Count('id'))
+    units = lines.aggregate(units=Sum('quantity'))['units'] or 0
+    DailySales.objects.update_or_create(
+        day=day,
+        defaults={
+            'revenue': (totals['revenue'] or Decimal("0.00")) + sum((o.order_total for o in archived), Decimal("0.00")),
+            'order_count': (totals['order_count'] or 0) + len(archived),
+            'units': units + sum(line['quantity'] or 0 for line in archived_lines),
+        },
+    )
+
+    line_revenue = ExpressionWrapper(
+        F('product_price') * F('quantity'),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+    products = {}
+    for row in (lines.values('product_id', 'product__product_name')
+                .annotate(units=Sum('quantity'), revenue=Sum(line_revenue))):
+        products[row['product_id']] = DailyProductSales(
+            day=day,
+            product_id=row['product_id'],
+            product_name=row['product__product_name'] or 'Deleted product',
+            units=row['units'] or 0,
+            revenue=row['revenue'] or Decimal("0.00"),
+        )
+    # Archived lines may point at products that have since been deleted.
+    live_products = set(Product.objects.filter(
+        pk__in={line['product'] for line in archived_lines if line['product']}
+    ).values_list('pk', flat=True))
+    for line in archived_lines:
+        product_id = line['product'] if line['product'] in live_products else None
+        entry = products.setdefault(product_id, DailyProductSales(
+            day=day,
+            product_id=product_id,
+            product_name=line['product_name'] or 'Deleted product',
+        ))
+        entry.units += line['quantity'] or 0
+        entry.revenue += Decimal(str(line['product_price'])) * (line['quantity'] or 0)
+    DailyProductSales.objects.filter(day=day).delete()
+    DailyProductSales.objects.bulk_create(products.values())
+
+    # District is free text on Order; fold spelling variants ("dhaka ", "Dhaka") together.
+    district_rows = list(orders.values('state').annotate(order_count=Count('id'), revenue=Sum('order_total')))
+    district_rows += [{'state': o.state, 'order_count': 1, 'revenue': o.order_total} for o in archived]
+    districts = {}
+    for row in district_rows:
+        name = (row['state'] or '').strip() or 'Unknown'
+        entry = districts.setdefault(name.lower(), DailyDistrictSales(day=day, district=name))
+        entry.order_count += row['order_count']
+        entry.revenue += row['revenue'] or Decimal("0.00")
+    DailyDistrictSales.objects.filter(day=day).delete()
+    DailyDistrictSales.objects.bulk_create(districts.values())
+
+    method_rows = list(orders.values('payment__payment_method').annotate(order_count=Count('id'), revenue=Sum('order_total')))
+    method_rows += [{'payment__payment_method': o.payment_method, 'order_count': 1, 'revenue': o.order_total} for o in archived]
+    methods = {}
+    for row in method_rows:
+        name = row['payment__payment_method'] or 'Unknown'
+        entry = methods.setdefault(name, DailyPaymentMethodSales(day=day, payment_method=name))
+        entry.order_count += row['order_count']
+        entry.revenue += row['revenue'] or Decimal("0.00")
+    DailyPaymentMethodSales.objects.filter(day=day).delete()
+    DailyPaymentMethodSales.objects.bulk_create(methods.values())
@@ -0,0 +1,89 @@
+# analytics/tests.py
+import datetime
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from analytics.models import DailyDistrictSales, DailyPaymentMethodSales, DailyProductSales, DailySales
+from analytics.services import rebuild_day, refresh_rollups
+from core.testing import create_customer, create_order, create_product
+from orders.archive import archive_batch
+from orders.models import Order, OrderProduct, Payment
+
+DAY = datetime.date(2026, 10, 15)
+
+
+class SalesRollupTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_customer()
+        cls.shirt = create_product('Test Shirt', price=500)
+        cls.cap = create_product('Test Cap', price=200)
+        cls.cod = cls.place_order('Dhaka', 'COD', [(cls.shirt, 2)])
+        cls.bkash = cls.place_order(' dhaka', 'BKASH', [(cls.shirt, 1), (cls.cap, 3)])
+        cls.cancelled = cls.place_order('Gazipur', 'COD', [(cls.cap, 5)], status='Cancelled')
+        cls.gazipur = cls.place_order('Gazipur', 'NAGAD', [(cls.cap, 1)], status='Completed')
+
+    @classmethod
+    def place_order(cls, district, method, items, status='New', day=DAY):
+        payment = Payment.objects.create(user=cls.user, payment_id=f'PAY-{Payment.objects.count()}',
+                                         payment_method=method, status='Pending')
+        order = create_order(cls.user, payment=payment, state=district, status=status)
+        for product, quantity in items:
+            OrderProduct.objects.create(order=order, payment=payment, user=cls.user, product=product,
+                                        quantity=quantity, product_price=product.price, ordered=True)
+        order.refresh_item_totals()
+        order.update_totals()
+        created_at = timezone.make_aware(datetime.datetime.combine(day, datetime.time(12)))
+        Order.objects.filter(pk=order.pk).update(created_at=created_at)
+        order.refresh_from_db()
+        return order
+
+    def assertRollup(self, revenue, order_count, units):
+        sales = DailySales.objects.get(day=DAY)
+        self.assertEqual((sales.revenue, sales.order_count, sales.units), (revenue, order_count, units))
+
+    def expected_revenue(self, *orders):
+        return sum((order.order_total for order in orders), Decimal('0.00'))
+
+    def test_rebuild_day(self):
+        rebuild_day(DAY)
+        self.assertRollup(self.expected_revenue(self.cod, self.bkash, self.gazipur), 3, 7)
+        products = dict(DailyProductSales.objects.filter(day=DAY).values_list('product_name', 'units'))
+        self.assertEqual(products, {'Test Shirt': 3, 'Test Cap': 4})
+        # "Dhaka" and " dhaka" are one district
+        districts = {name.lower(): count for name, count in
+                     DailyDistrictSales.objects.filter(day=DAY).values_list('district', 'order_count')}
+        self.assertEqual(districts, {'dhaka': 2, 'gazipur': 1})
+        methods = dict(DailyPaymentMethodSales.objects.filter(day=DAY).values_list('payment_method', 'revenue'))
+        self.assertEqual(methods, {'COD': self.cod.order_total, 'BKASH': self.bkash.order_total,
+                                   'NAGAD': self.gazipur.order_total})
+
+    def test_archived_orders_still_count(self):
+        rebuild_day(DAY)
+        before = list(DailyProductSales.objects.filter(day=DAY).values_list('product_id', 'units', 'revenue'))
+        archive_batch([self.gazipur.pk, self.cancelled.pk])
+        self.assertEqual(refresh_rollups(), [DAY])
+        self.assertRollup(self.expected_revenue(self.cod, self.bkash, self.gazipur), 3, 7)
+        after = list(DailyProductSales.objects.filter(day=DAY).values_list('product_id', 'units', 'revenue'))
+        self.assertCountEqual(after, before)
+
+    def test_refresh_only_rebuilds_changed_days(self):
+        other_day = DAY - datetime.timedelta(days=3)
+        self.place_order('Dhaka', 'COD', [(self.cap, 1)], day=other_day)
+        self.assertEqual(refresh_rollups(), [other_day, DAY])
+        self.assertEqual(refresh_rollups(), [])
+
+        self.cod.status = 'Cancelled'
+        self.cod.save()
+        self.assertEqual(refresh_rollups(), [DAY])
+        self.assertRollup(self.expected_revenue(self.bkash, self.gazipur), 2, 5)
+
+    def test_deleted_order_rebuilds_its_day(self):
+        refresh_rollups()
+        self.bkash.delete()
+        self.assertEqual(refresh_rollups(), [DAY])
+        self.assertRollup(self.expected_revenue(self.cod, self.gazipur), 2, 3)
+        self.assertEqual(refresh_rollups(), [])
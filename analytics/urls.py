@@ -0,0 +1,9 @@
+# analytics/urls.py
+from django.urls import path
+from . import views
+
+app_name = 'analytics'
+
+urlpatterns = [
+    path('sales/', views.sales_dashboard, name='sales_dashboard'),
+]
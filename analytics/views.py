@@ -0,0 +1,78 @@
+# analytics/views.py
+import datetime
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Sum
+from django.shortcuts import render
+from django.utils import timezone
+
+from .models import RollupState, DailySales, DailyProductSales, DailyDistrictSales, DailyPaymentMethodSales
+from .services import ROLLUP_NAME
+
+
+@staff_member_required
+def sales_dashboard(request):
+    """Admin sales dashboard; reads only the rollup tables, never the order tables."""
+    try:
+        days = int(request.GET.get('days', 30))
+    except ValueError:
+        days = 30
+    days = max(7, min(days, 365))
+    since = timezone.localdate() - datetime.timedelta(days=days - 1)
+
+    daily = list(DailySales.objects.filter(day__gte=since).order_by('day'))
+    totals = DailySales.objects.filter(day__gte=since).aggregate(
+        revenue=Sum('revenue'), order_count=Sum('order_count'), units=Sum('units'),
+    )
+
+    top_products = list(
+        DailyProductSales.objects.filter(day__gte=since)
+        .values('product_name')
+        .annotate(units=Sum('units'), revenue=Sum('revenue'))
+        .order_by('-units')[:10]
+    )
+    districts = list(
+        DailyDistrictSales.objects.filter(day__gte=since)
+        .values('district')
+        .annotate(order_count=Sum('order_count'), revenue=Sum('revenue'))
+        .order_by('-revenue')[:10]
+    )
+    payment_mix = list(
+        DailyPaymentMethodSales.objects.filter(day__gte=since)
+        .values('payment_method')
+        .annotate(order_count=Sum('order_count'), revenue=Sum('revenue'))
+        .order_by('-order_count')
+    )
+
+    chart_data = {
+        'daily': {
+            'labels': [d.day.strftime('%d %b') for d in daily],
+            'revenue': [float(d.revenue) for d in daily],
+            'orders': [d.order_count for d in daily],
+        },
+        'products': {
+            'labels': [p['product_name'] for p in top_products],
+            'units': [p['units'] for p in top_products],
+        },
+        'districts': {
+            'labels': [d['district'] for d in districts],
+            'revenue': [float(d['revenue']) for d in districts],
+        },
+        'payment_mix': {
+            'labels': [p['payment_method'] for p in payment_mix],
+            'orders': [p['order_count'] for p in payment_mix],
+        },
+    }
+
+    context = {
+        'title': 'Sales Dashboard',
+        'days': days,
+        'since': since,
+        'totals': totals,
+        'top_products': top_products,
+        'districts': districts,
+        'payment_mix': payment_mix,
+        'chart_data': chart_data,
+        'rollup_state': RollupState.objects.filter(name=ROLLUP_NAME).first(),
+    }
+    return render(request, 'analytics/dashboard.html', context)
@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class CartsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'carts'
+
+    def ready(self):
+        # Memoized cart totals are keyed on a version that changes with the cart rows
+        # and with product prices.
+        from store.models import Product
+        from .models import CartItem
+        from .pricing import cart_item_changed, product_changed
+
+        post_save.connect(cart_item_changed, sender=CartItem, dispatch_uid='carts.pricing.item_saved')
+        post_delete.connect(cart_item_changed, sender=CartItem, dispatch_uid='carts.pricing.item_deleted')
+        post_save.connect(product_changed, sender=Product, dispatch_uid='carts.pricing.product_saved')
+        post_delete.connect(product_changed, sender=Product, dispatch_uid='carts.pricing.product_deleted')
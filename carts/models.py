@@ -7,7 +7,7 @@ from django.conf import settings
 from django.db import models
 
 class Cart(models.Model):
-    cart_id = models.CharField(max_length=250,blank=True)
+    cart_id = models.CharField(max_length=250,blank=True,db_index=True)
     date_added = models.DateField(auto_now_add=True)
     
     def __str__(self):
@@ -20,6 +20,13 @@ class CartItem(models.Model):
     cart = models.ForeignKey(Cart, on_delete= models.CASCADE,null=True)
     quantity = models.IntegerField()
     is_active = models.BooleanField(default=True)
+
+    class Meta:
+        indexes = [
+            # Cart lookups in add_cart/remove_cart filter on (owner, product)
+            models.Index(fields=['user', 'product'], name='carts_item_user_product_idx'),
+            models.Index(fields=['cart', 'product'], name='carts_item_cart_product_idx'),
+        ]
     
     def sub_total(self):
         return self.product.price * self.quantity
@@ -0,0 +1,131 @@
+# carts/pricing.py
+import uuid
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+
+from orders.delivery import charge_for_district
+from .models import CartItem
+
+PRICING_CACHE_TIMEOUT = 60 * 60
+
+LINE_TOTAL = ExpressionWrapper(
+    F('product__price') * F('quantity'),
+    output_field=DecimalField(max_digits=12, decimal_places=2),
+)
+
+_CATALOG_VERSION_KEY = 'pricing:catalog-version'
+
+
+def _money(value):
+    return Decimal(value or 0).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+class CartPricing:
+    """
+    Totals for one cart. `delivery_charge` and `grand_total` include delivery only
+    once a district is known (checkout, payments); on the cart page they don't.
+    """
+    def __init__(self, subtotal, item_count, delivery_charge=None):
+        self.subtotal = _money(subtotal)
+        self.item_count = int(item_count or 0)
+        self.delivery_charge = None if delivery_charge is None else _money(delivery_charge)
+
+    @classmethod
+    def from_items(cls, items):
+        """Totals of loaded cart rows (with their product) at the current prices; no cache, no queries."""
+        items = [item for item in items if item.product]
+        return cls(
+            sum((_money(item.product.price) * item.quantity for item in items), Decimal('0.00')),
+            sum(item.quantity for item in items),
+        )
+
+    @property
+    def grand_total(self):
+        return self.subtotal + (self.delivery_charge or Decimal('0.00'))
+
+    def with_delivery(self, district, table=None):
+        return CartPricing(self.subtotal, self.item_count, charge_for_district(district, table))
+
+
+def cart_items(user=None, cart=None):
+    """Active cart rows of a signed-in user, or of a guest's session cart."""
+    if user is not None and user.is_authenticated:
+        return CartItem.objects.filter(user=user, is_active=True)
+    if cart is not None:
+        return CartItem.objects.filter(cart=cart, is_active=True)
+    return CartItem.objects.none()
+
+
+def with_line_totals(queryset):
+    """Cart rows for display, each carrying `line_total` (price x quantity) from SQL."""
+    return queryset.select_related('product').prefetch_related('variations').annotate(line_total=LINE_TOTAL)
+
+
+def cart_pricing(user=None, cart=None, district=None):
+    """
+    Subtotal and item count of the cart in one SQL aggregate, plus the delivery
+    charge for `district` when given.
+
+    The aggregate is memoized in the cache under the cart's version, which changes
+    whenever one of its rows or any product is saved or deleted (see
+    bump_cart_version), so repeat page views within a checkout reuse it. It is
+    for display: what an order is charged comes from CartPricing.from_items() over
+    the rows being ordered.
+    """
+    owner = _owner_key(user, cart)
+    if owner is None:
+        totals = (Decimal('0.00'), 0)
+    else:
+        key = f"cart-pricing:{owner}:{_version(f'cart-version:{owner}')}:{_version(_CATALOG_VERSION_KEY)}"
+        totals = cache.get(key)
+        if totals is None:
+            result = cart_items(user, cart).aggregate(subtotal=Sum(LINE_TOTAL), item_count=Sum('quantity'))
+            totals = (_money(result['subtotal']), result['item_count'] or 0)
+            cache.set(key, totals, PRICING_CACHE_TIMEOUT)
+
+    pricing = CartPricing(*totals)
+    return pricing.with_delivery(district) if district is not None else pricing
+
+
+def bump_cart_version(user_id=None, cart_pk=None):
+    """Invalidate memoized totals for a cart (use after queryset .update() on CartItem)."""
+    if user_id:
+        cache.set(f'cart-version:user:{user_id}', uuid.uuid4().hex, None)
+    if cart_pk:
+        cache.set(f'cart-version:cart:{cart_pk}', uuid.uuid4().hex, None)
+
+
+def cart_item_changed(sender, instance, **kwargs):
+    # Bump now for this request, and again on commit so a total computed by another
+    # request from the not-yet-committed rows can't outlive the change.
+    bump_cart_version(instance.user_id, instance.cart_id)
+    transaction.on_commit(lambda: bump_cart_version(instance.user_id, instance.cart_id))
+
+
+def product_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields and 'price' not in update_fields:
+        return  # e.g. the stock decrement on every order
+    cache.set(_CATALOG_VERSION_KEY, uuid.uuid4().hex, None)
+    transaction.on_commit(lambda: cache.set(_CATALOG_VERSION_KEY, uuid.uuid4().hex, None))
+
+
+def _owner_key(user, cart):
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    if cart is not None:
+        return f'cart:{cart.pk}'
+    return None
+
+
+def _version(key):
+    # A random token rather than a counter: if the cache drops the key, the next
+    # read starts a fresh version instead of reusing an old one.
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, None):
+            version = cache.get(key) or version
+    return version
@@ -1,3 +1,40 @@
+# carts/tests.py
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from carts.models import Cart, CartItem
+from core.testing import QueryPlanTestMixin, create_customer, create_product
+
+
+class CartQueryPlanTests(QueryPlanTestMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_customer()
+        cls.product = create_product()
+
+    def test_cart_anonymous(self):
+        self.client.get(reverse('store'))
+        cart = Cart.objects.create(cart_id=self.client.session.session_key)
+        CartItem.objects.create(cart=cart, product=self.product, quantity=1)
+        response = self.assertNoFullScans(self.client.get, reverse('cart'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_cart_authenticated(self):
+        CartItem.objects.create(user=self.user, product=self.product, quantity=1)
+        self.client.force_login(self.user)
+        response = self.assertNoFullScans(self.client.get, reverse('cart'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_add_cart_authenticated(self):
+        self.client.force_login(self.user)
+        color, size = self.product.variation_set.order_by('id')
+        data = {'color': color.variation_value, 'size': size.variation_value}
+        url = reverse('add_cart', args=[self.product.id])
+        self.assertNoFullScans(self.client.post, url, data)
+        self.assertNoFullScans(self.client.post, url, data)
+        self.assertEqual(CartItem.objects.get(user=self.user).quantity, 2)
+
+    def test_add_cart_anonymous(self):
+        self.assertNoFullScans(self.client.post, reverse('add_cart', args=[self.product.id]))
+        self.assertEqual(CartItem.objects.filter(cart__isnull=False).count(), 1)
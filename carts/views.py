@@ -343,13 +343,16 @@ from django.conf import settings
 from django.urls import reverse
 from store.models import Product, Variation
 from .models import Cart, CartItem
+from . import pricing
 from django.contrib.auth.views import redirect_to_login
 
 
 def _cart_id(request):
     cart = request.session.session_key
     if not cart:
-        cart = request.session.create()
+        # session.create() returns None; the new key is only available afterwards.
+        request.session.create()
+        cart = request.session.session_key
     return cart
 
 
@@ -389,38 +392,28 @@ def _merge_duplicate_rows(qs):
             d.delete()
 
 
-def cart(request, total=0, quantity=0, cart_items=None):
-    try:
-        tax = 0
-        grand_total = 0
-
-        if request.user.is_authenticated:
-            base_qs = CartItem.objects.filter(user=request.user, is_active=True)
-        else:
-            cart = Cart.objects.get(cart_id=_cart_id(request))
-            base_qs = CartItem.objects.filter(cart=cart, is_active=True)
+def _cart_owner(request):
+    """(user, cart) whose rows make up this visitor's cart; the cart is only looked up for guests."""
+    if request.user.is_authenticated:
+        return request.user, None
+    return None, Cart.objects.filter(cart_id=_cart_id(request)).first()
 
-        _merge_duplicate_rows(base_qs)
-        cart_items = base_qs.select_related('product').prefetch_related('variations')
 
-        for ci in cart_items:
-            total += (ci.product.price * ci.quantity)
-            quantity += ci.quantity
+def cart(request, total=0, quantity=0, cart_items=None):
+    user, session_cart = _cart_owner(request)
+    base_qs = pricing.cart_items(user, session_cart)
 
-        tax = (2 * total) / 100
-        grand_total = total + tax
+    # Merge duplicate rows for a clean view
+    _merge_duplicate_rows(base_qs)
 
-    except ObjectDoesNotExist:
-        cart_items = []
-        tax = 0
-        grand_total = 0
+    cart_items = pricing.with_line_totals(base_qs)
+    cart_pricing = pricing.cart_pricing(user, session_cart)
 
     context = {
-        'total': total,
-        'quantity': quantity,
+        'total': cart_pricing.subtotal,
+        'quantity': cart_pricing.item_count,
         'cart_items': cart_items,
-        'tax': tax,
-        'grand_total': grand_total,
+        'grand_total': cart_pricing.grand_total,
     }
     return render(request, 'store/cart.html', context)
 
@@ -0,0 +1,173 @@
+# core/email_templates.py
+import os
+import re
+import threading
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist, engines
+from django.template.loader import get_template
+from django.utils.html import strip_tags
+
+# name -> _CompiledEmail; rebuilt only when the template source changes.
+_cache = {}
+_cache_lock = threading.Lock()
+
+_STYLE_BLOCK_RE = re.compile(r'<style[^>]*>(.*?)</style>', re.S | re.I)
+_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+_SIMPLE_SELECTOR_RE = re.compile(r'^(?P<tag>[a-zA-Z][a-zA-Z0-9]*)?(?:\.(?P<cls>[\w-]+))?$')
+_START_TAG_RE = re.compile(r'<(?P<tag>[a-zA-Z][a-zA-Z0-9]*)(?P<attrs>(?:[^<>"\']|"[^"]*"|\'[^\']*\')*)>')
+_CLASS_ATTR_RE = re.compile(r'\sclass\s*=\s*"(?P<value>[^"]*)"', re.I)
+_STYLE_ATTR_RE = re.compile(r'\sstyle\s*=\s*"(?P<value>[^"]*)"', re.I)
+
+
+class _CompiledEmail:
+    def __init__(self, version, html, text):
+        self.version = version
+        self.html = html
+        self.text = text
+
+
+def render_email(name, context):
+    """
+    Render the email template pair `<name>.html` / `<name>.txt`.
+
+    Templates are compiled once per source version with their CSS already
+    inlined, so rendering a batch only pays for the context substitution.
+    The plain-text part comes from the `.txt` template; when a template has
+    none, the rendered HTML is stripped as before.
+    Returns (html_body, text_body).
+    """
+    compiled = _get_compiled(name)
+    html_body = compiled.html.render(context)
+    if compiled.text is not None:
+        text_body = compiled.text.render(context)
+    else:
+        text_body = strip_tags(html_body)
+    return html_body, text_body
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def _get_compiled(name):
+    compiled = _cache.get(name)
+    # Outside DEBUG templates are treated as immutable for the life of the process.
+    if compiled is not None and not settings.DEBUG:
+        return compiled
+
+    html_source = get_template(f'{name}.html')
+    version = _source_version(html_source)
+    if compiled is not None and compiled.version == version:
+        return compiled
+
+    with _cache_lock:
+        compiled = _CompiledEmail(
+            version=version,
+            html=engines['django'].from_string(inline_css(html_source.template.source)),
+            text=_load_text_template(name),
+        )
+        _cache[name] = compiled
+    return compiled
+
+
+def _load_text_template(name):
+    try:
+        return get_template(f'{name}.txt')
+    except TemplateDoesNotExist:
+        return None
+
+
+def _source_version(template):
+    origin = getattr(template, 'origin', None)
+    path = getattr(origin, 'name', None)
+    try:
+        return os.path.getmtime(path)
+    except (TypeError, OSError):
+        return None
+
+
+def inline_css(source):
+    """
+    Copy simple `<style>` rules (`tag`, `.class`, `tag.class`) onto the matching
+    elements' style attributes. Rules inside @media blocks and anything with a more
+    complex selector stay in the style block, where capable clients still apply them.
+    Existing inline declarations win over inlined ones.
+    """
+    rules = []
+
+    def collect(match):
+        css = _COMMENT_RE.sub('', match.group(1))
+        kept = []
+        for block, selectors, declarations in _iter_rules(css):
+            if selectors is None:
+                kept.append(block)
+                continue
+            simple = [_SIMPLE_SELECTOR_RE.match(sel) for sel in selectors]
+            if all(simple):
+                for sel in simple:
+                    rules.append((sel.group('tag'), sel.group('cls'), declarations))
+            else:
+                kept.append(block)
+        if not kept:
+            return ''
+        return '<style>\n' + '\n'.join(kept) + '\n</style>'
+
+    source = _STYLE_BLOCK_RE.sub(collect, source)
+    if not rules:
+        return source
+
+    def apply(match):
+        tag = match.group('tag').lower()
+        attrs = match.group('attrs')
+        class_match = _CLASS_ATTR_RE.search(attrs)
+        classes = set(class_match.group('value').split()) if class_match else set()
+        declarations = [
+            decl for rule_tag, rule_cls, decl in rules
+            if (rule_tag is None or rule_tag.lower() == tag)
+            and (rule_cls is None or rule_cls in classes)
+        ]
+        if not declarations:
+            return match.group(0)
+
+        inlined = '; '.join(declarations)
+        style_match = _STYLE_ATTR_RE.search(attrs)
+        if style_match:
+            merged = f'{inlined}; {style_match.group("value")}'
+            attrs = attrs[:style_match.start('value')] + merged + attrs[style_match.end('value'):]
+        else:
+            closing = '/' if attrs.rstrip().endswith('/') else ''
+            body = attrs.rstrip()[:-1] if closing else attrs
+            attrs = f'{body} style="{inlined}"{closing}'
+        return f'<{match.group("tag")}{attrs}>'
+
+    return _START_TAG_RE.sub(apply, source)
+
+
+def _iter_rules(css):
+    """
+    Yield (original_text, selectors, declarations) for each top-level rule.
+    At-rules such as @media are yielded with selectors=None so they are kept verbatim.
+    """
+    i, length = 0, len(css)
+    while i < length:
+        open_brace = css.find('{', i)
+        if open_brace == -1:
+            break
+        prelude = css[i:open_brace].strip()
+        depth, j = 1, open_brace + 1
+        while j < length and depth:
+            if css[j] == '{':
+                depth += 1
+            elif css[j] == '}':
+                depth -= 1
+            j += 1
+        block = css[i:j].strip()
+        if prelude.startswith('@'):
+            yield block, None, None
+        else:
+            selectors = [sel.strip() for sel in prelude.split(',') if sel.strip()]
+            declarations = css[open_brace + 1:j - 1].strip().rstrip(';').strip()
+            yield block, selectors, declarations
+        i = j
@@ -0,0 +1,76 @@
+# core/mail.py
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+logger = logging.getLogger(__name__)
+
+
+def build_email(*, subject, html_body, text_body, to, from_email=None):
+    """Build a multipart/alternative message (plain text + HTML)."""
+    if isinstance(to, str):
+        to = [to]
+    msg = EmailMultiAlternatives(
+        subject=subject,
+        body=text_body,
+        to=list(to),
+        from_email=from_email or getattr(settings, 'DEFAULT_FROM_EMAIL', None),
+    )
+    msg.attach_alternative(html_body, "text/html")
+    return msg
+
+
+def send_bulk(messages, *, fail_silently=False, connection=None):
+    """
+    Deliver many messages over a single backend connection.
+
+    One SMTP session (and one TLS handshake) is shared by the whole batch; messages
+    are pushed back to back on it. A failing message does not abort the rest of the
+    batch. Returns a list of (message, exception) for the ones that failed; if
+    fail_silently is False and any message failed, the first error is re-raised
+    after the whole batch has been attempted.
+    """
+    messages = [m for m in messages if m is not None]
+    if not messages:
+        return []
+
+    own_connection = connection is None
+    connection = connection or get_connection(fail_silently=fail_silently)
+    failures = []
+
+    try:
+        connection.open()
+        for msg in messages:
+            msg.connection = connection
+            try:
+                if not connection.send_messages([msg]):
+                    raise RuntimeError(f"Backend did not accept message to {msg.to}")
+            except Exception as e:
+                logger.warning(f"Email to {msg.to} failed: {e}")
+                failures.append((msg, e))
+                # The server may have dropped us; reconnect for the rest of the batch.
+                _reopen(connection)
+    finally:
+        if own_connection:
+            connection.close()
+
+    if failures and not fail_silently:
+        raise failures[0][1]
+    return failures
+
+
+def send_email(message, *, fail_silently=False):
+    """Send a single message through the shared delivery path."""
+    return send_bulk([message], fail_silently=fail_silently)
+
+
+def _reopen(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+    try:
+        connection.open()
+    except Exception:
+        logger.warning("Could not reopen mail connection")
@@ -0,0 +1,44 @@
+# core/management/commands/mail_loadtest.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.mail import build_email, send_bulk
+
+
+class Command(BaseCommand):
+    help = (
+        "Send a burst of test emails through the shared mail service and report throughput. "
+        "Run with EMAIL_BACKEND set to the file or console backend to test without SMTP."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=200, help='Number of messages to send')
+        parser.add_argument('--batch-size', type=int, default=50, help='Messages per connection')
+        parser.add_argument('--to', default='loadtest@example.com', help='Recipient address')
+
+    def handle(self, *args, **options):
+        count = options['count']
+        batch_size = max(1, options['batch_size'])
+        self.stdout.write(f"Backend: {settings.EMAIL_BACKEND}")
+
+        failed = 0
+        started = time.monotonic()
+        for offset in range(0, count, batch_size):
+            batch = [
+                build_email(
+                    subject=f"Load test message {i + 1}",
+                    html_body=f"<p>Load test message {i + 1}</p>",
+                    text_body=f"Load test message {i + 1}",
+                    to=[options['to']],
+                )
+                for i in range(offset, min(offset + batch_size, count))
+            ]
+            failed += len(send_bulk(batch, fail_silently=True))
+        elapsed = time.monotonic() - started
+
+        rate = count / elapsed if elapsed else float('inf')
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {count - failed}/{count} message(s) in {elapsed:.2f}s ({rate:.1f} msg/s), {failed} failed"
+        ))
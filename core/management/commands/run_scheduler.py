@@ -0,0 +1,45 @@
+# core/management/commands/run_scheduler.py
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def _run_job(path):
+    close_old_connections()
+    try:
+        import_string(path)()
+    except Exception:
+        logger.exception(f"Scheduled job {path} failed")
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = "Run the background jobs listed in settings.SCHEDULED_JOBS (APScheduler, blocking)."
+
+    def handle(self, *args, **options):
+        from apscheduler.schedulers.blocking import BlockingScheduler
+
+        scheduler = BlockingScheduler(timezone=settings.TIME_ZONE)
+        for job in getattr(settings, 'SCHEDULED_JOBS', []):
+            scheduler.add_job(
+                _run_job,
+                trigger='interval',
+                args=[job['func']],
+                seconds=job['seconds'],
+                id=job['func'],
+                max_instances=1,
+                coalesce=True,
+                replace_existing=True,
+            )
+            self.stdout.write(f"Scheduled {job['func']} every {job['seconds']}s")
+
+        try:
+            scheduler.start()
+        except (KeyboardInterrupt, SystemExit):
+            scheduler.shutdown(wait=False)
@@ -0,0 +1,40 @@
+# core/pagination.py
+import base64
+import datetime
+
+from django.db.models import Q
+
+
+def encode_cursor(obj):
+    """Opaque cursor for the page after `obj` in a (created_at, id) keyset."""
+    raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (created_at, id) from a cursor, or None if it is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return datetime.datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_paginate(queryset, cursor=None, page_size=25):
+    """
+    Keyset pagination over (created_at, id), newest first.
+    Each page costs one indexed range query however deep the reader pages.
+    Returns (objects, next_cursor); next_cursor is None on the last page.
+    """
+    queryset = queryset.order_by('-created_at', '-id')
+    position = decode_cursor(cursor)
+    if position:
+        created_at, pk = position
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    objects = list(queryset[:page_size + 1])
+    next_cursor = encode_cursor(objects[page_size - 1]) if len(objects) > page_size else None
+    return objects[:page_size], next_cursor
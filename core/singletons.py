@@ -0,0 +1,60 @@
+# core/singletons.py
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+SINGLETON_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class CachedSingletonModel(models.Model):
+    """
+    Base for configuration models that have one current row (payment numbers,
+    courier credentials, ...).
+
+    `current()` returns that row from the cache backend, so reading configuration
+    on a request costs no queries and never writes. Saving or deleting any row of
+    the model (admin, shell, queryset .delete()) clears the cached copy; a queryset
+    .update() does not, so follow one with clear_singleton_cache().
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def singleton_queryset(cls):
+        """Rows that can be the current one; the lowest pk wins."""
+        return cls._default_manager.all()
+
+    @classmethod
+    def singleton_default(cls):
+        """Returned when no row exists. Not saved."""
+        return None
+
+    @classmethod
+    def singleton_cache_key(cls):
+        return f"singleton:{cls._meta.label_lower}"
+
+    @classmethod
+    def current(cls):
+        key = cls.singleton_cache_key()
+        cached = cache.get(key)
+        if cached is None:
+            # Wrapped in a tuple so "no row" is cached too
+            cached = (cls.singleton_queryset().order_by('pk').first(),)
+            cache.set(key, cached, SINGLETON_CACHE_TIMEOUT)
+        return cached[0] if cached[0] is not None else cls.singleton_default()
+
+    @classmethod
+    def clear_singleton_cache(cls):
+        key = cls.singleton_cache_key()
+        cache.delete(key)
+        # Again after commit, in case another request re-cached the old row meanwhile
+        transaction.on_commit(lambda: cache.delete(key))
+
+
+@receiver(post_save, dispatch_uid='core.singletons.saved')
+@receiver(post_delete, dispatch_uid='core.singletons.deleted')
+def _clear_singleton_cache(sender, **kwargs):
+    if issubclass(sender, CachedSingletonModel):
+        sender.clear_singleton_cache()
@@ -0,0 +1,96 @@
+# core/testing.py
+import re
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# "SCAN store_product", "SCAN U0", "SCAN carts_cartitem USING INDEX ..." (SQLite >= 3.36 wording)
+_SCAN_RE = re.compile(r'^SCAN (?:TABLE )?(?P<table>\w+)(?: AS (?P<alias>\w+))?(?P<rest>.*)$')
+
+
+def explain_query_plan(sql):
+    """Return the detail lines of SQLite's EXPLAIN QUERY PLAN for an already-interpolated query."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def full_table_scans(sql, allowed=()):
+    """Tables `sql` reads front to back without using an index (allowed tables excepted)."""
+    scans = []
+    for detail in explain_query_plan(sql):
+        match = _SCAN_RE.match(detail)
+        if not match or 'INDEX' in match.group('rest'):
+            continue
+        table = match.group('table')
+        if table in ('CONSTANT', 'SUBQUERY') or table in allowed:
+            continue
+        scans.append(detail)
+    return scans
+
+
+class QueryPlanTestMixin:
+    """
+    Runs every SELECT issued by a view through EXPLAIN QUERY PLAN and fails when one
+    of them has to scan a whole table. Only meaningful on SQLite.
+    """
+    # Tables that are read whole on purpose: the category menu on every page and
+    # single-row settings tables.
+    full_scan_allowed = (
+        'category_category',
+        'orders_paymentsettings',
+        'orders_deliverycharge',
+    )
+
+    def assertNoFullScans(self, func, *args, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            result = func(*args, **kwargs)
+
+        problems = []
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            for detail in full_table_scans(sql, self.full_scan_allowed):
+                problems.append(f'{detail}\n    {sql}')
+
+        if problems:
+            self.fail('Full table scan(s):\n' + '\n'.join(problems))
+        return result
+
+
+def create_customer(username='customer', **extra):
+    from accounts.models import Account
+    user = Account.objects.create_user(
+        first_name='Test', last_name='Customer', username=username,
+        email=f'{username}@example.com', password='pass1234',
+    )
+    user.is_active = True
+    for field, value in extra.items():
+        setattr(user, field, value)
+    user.save()
+    return user
+
+
+def create_product(name='Test Shirt', price=500, stock=10):
+    from category.models import Category
+    from store.models import Product, Variation
+    category, _ = Category.objects.get_or_create(category_name='Shirts', slug='shirts')
+    product = Product.objects.create(
+        product_name=name, slug=name.lower().replace(' ', '-'), price=price,
+        images='photos/products/test.jpg', stock=stock, category=category,
+    )
+    Variation.objects.create(product=product, variation_category='color', variation_value='red')
+    Variation.objects.create(product=product, variation_category='size', variation_value='M')
+    return product
+
+
+def create_order(user=None, **extra):
+    from orders.models import Order
+    fields = {
+        'user': user, 'first_name': 'Test', 'last_name': 'Customer', 'phone': '01700000000',
+        'email': 'customer@example.com', 'address_line_1': 'Road 1', 'country': 'Bangladesh',
+        'state': 'Dhaka', 'is_ordered': True,
+    }
+    fields.update(extra)
+    return Order.objects.create(**fields)
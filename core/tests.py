@@ -0,0 +1,168 @@
+# core/tests.py
+import os
+import runpy
+from io import StringIO
+from smtplib import SMTPRecipientsRefused
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+
+from core import email_templates
+from core.email_templates import inline_css, render_email
+from core.mail import build_email, send_bulk, send_email
+
+
+class RefusingBackend(EmailBackend):
+    """locmem backend that refuses one address and counts how often it is opened."""
+
+    def __init__(self, *args, refuse='bounce@example.com', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.refuse = refuse
+        self.opened = 0
+
+    def open(self):
+        self.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if any(self.refuse in msg.to for msg in messages):
+            raise SMTPRecipientsRefused({self.refuse: (550, b'No such user')})
+        return super().send_messages(messages)
+
+
+def message(to, number=1):
+    return build_email(subject=f'Message {number}', html_body=f'<p>Message {number}</p>',
+                       text_body=f'Message {number}', to=to)
+
+
+class MailTests(SimpleTestCase):
+
+    def test_build_email_is_multipart(self):
+        msg = message('customer@example.com')
+        self.assertEqual(msg.to, ['customer@example.com'])
+        self.assertEqual(msg.from_email, settings.DEFAULT_FROM_EMAIL)
+        self.assertEqual(msg.body, 'Message 1')
+        self.assertEqual(msg.alternatives, [('<p>Message 1</p>', 'text/html')])
+        self.assertIn('multipart/alternative', msg.message().get_content_type())
+
+    def test_send_bulk_shares_one_connection(self):
+        batch = [message('a@example.com', n) for n in range(3)]
+        with mock.patch('core.mail.get_connection', wraps=get_connection) as connect:
+            failures = send_bulk(batch + [None])
+        self.assertEqual(failures, [])
+        connect.assert_called_once()
+        self.assertEqual({id(msg.connection) for msg in batch}, {id(batch[0].connection)})
+        self.assertEqual([m.subject for m in mail.outbox], ['Message 0', 'Message 1', 'Message 2'])
+
+    def test_send_bulk_reports_partial_failures(self):
+        connection = RefusingBackend()
+        batch = [message('a@example.com', 1), message('bounce@example.com', 2), message('b@example.com', 3)]
+        failures = send_bulk(batch, fail_silently=True, connection=connection)
+        self.assertEqual([(msg.subject, type(error)) for msg, error in failures],
+                         [('Message 2', SMTPRecipientsRefused)])
+        self.assertEqual([m.subject for m in mail.outbox], ['Message 1', 'Message 3'])
+        self.assertEqual(connection.opened, 2)  # reopened once after the refusal
+
+        # Without fail_silently the rest of the batch still goes out before the error is raised
+        mail.outbox = []
+        with self.assertRaises(SMTPRecipientsRefused):
+            send_bulk(batch, connection=RefusingBackend())
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_send_email(self):
+        self.assertEqual(send_email(message('a@example.com')), [])
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_email_settings_come_from_environment(self):
+        environ = {
+            'EMAIL_HOST': 'smtp.example.com', 'EMAIL_PORT': '2525', 'EMAIL_USE_TLS': 'False',
+            'EMAIL_HOST_USER': 'shop@example.com', 'EMAIL_TIMEOUT': '7',
+            'EMAIL_BACKEND': 'django.core.mail.backends.console.EmailBackend',
+        }
+        with mock.patch.dict(os.environ, environ):
+            values = runpy.run_path(str(settings.BASE_DIR / 'khalab' / 'settings.py'))
+        self.assertEqual(
+            {name: values[name] for name in ('EMAIL_HOST', 'EMAIL_PORT', 'EMAIL_USE_TLS', 'EMAIL_TIMEOUT',
+                                             'EMAIL_BACKEND', 'DEFAULT_FROM_EMAIL')},
+            {'EMAIL_HOST': 'smtp.example.com', 'EMAIL_PORT': 2525, 'EMAIL_USE_TLS': False, 'EMAIL_TIMEOUT': 7,
+             'EMAIL_BACKEND': 'django.core.mail.backends.console.EmailBackend',
+             'DEFAULT_FROM_EMAIL': 'shop@example.com'},
+        )
+
+    def test_mail_loadtest(self):
+        out = StringIO()
+        call_command('mail_loadtest', count=5, batch_size=2, to='load@example.com', stdout=out)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual({tuple(m.to) for m in mail.outbox}, {('load@example.com',)})
+        self.assertIn('Sent 5/5 message(s)', out.getvalue())
+
+
+class EmailTemplateTests(SimpleTestCase):
+
+    def setUp(self):
+        email_templates.clear_cache()
+        self.addCleanup(email_templates.clear_cache)
+        user = SimpleNamespace(first_name='Rahim', username='rahim')
+        order = SimpleNamespace(order_number='202610190001', first_name='Rahim', full_name='Rahim Uddin',
+                                email='rahim@example.com', phone='01700000000', full_address='Road 1, Mirpur',
+                                state='Dhaka', country='Bangladesh', order_note='', subtotal=1000,
+                                delivery_charge=150, order_total=1150)
+        line = SimpleNamespace(product=SimpleNamespace(product_name='Test Shirt'), quantity=2, product_price=500,
+                               variations=SimpleNamespace(all=lambda: []))
+        self.contexts = {
+            'accounts/account_verification_email': (
+                {'user': user, 'activation_url': 'https://shop.example.com/activate/abc/'}, 'activate/abc'),
+            'accounts/reset_password_email': (
+                {'user': user, 'reset_url': 'https://shop.example.com/reset/xyz/'}, 'reset/xyz'),
+            'orders/order_received_email': (
+                {'order': order, 'payment': SimpleNamespace(payment_method='COD', amount_paid=0, status='Pending'),
+                 'ordered_products': [line], 'subtotal': 1000, 'now': timezone.now()}, 'Test Shirt'),
+            'orders/order_status_email': (
+                {'order': order, 'status': 'Shipped', 'now': timezone.now()}, 'Shipped'),
+        }
+
+    def test_renders_every_template(self):
+        for name, (context, expected) in self.contexts.items():
+            with self.subTest(name):
+                html_body, text_body = render_email(name, context)
+                self.assertIn('style="', html_body)
+                self.assertIn(expected, html_body)
+                self.assertIn(expected, text_body)
+                self.assertTrue(text_body.strip())
+
+    def test_style_rules_are_inlined(self):
+        html_body, _ = render_email('orders/order_status_email', self.contexts['orders/order_status_email'][0])
+        self.assertRegex(html_body, r'class="preheader"[^>]* style="display:none !important')
+        self.assertIn('@media (max-width:600px)', html_body)  # kept for clients that support it
+        self.assertNotIn('.preheader {', html_body)
+
+    def test_inline_css(self):
+        source = ('<style>p { color: red } .note, td.cell { padding: 4px } div > p { margin: 0 }</style>'
+                  '<p class="note" style="color: blue">x</p><td class="cell">y</td><br/>')
+        self.assertEqual(
+            inline_css(source),
+            '<style>\ndiv > p { margin: 0 }\n</style>'
+            '<p class="note" style="color: red; padding: 4px; color: blue">x</p>'
+            '<td class="cell" style="padding: 4px">y</td><br/>',
+        )
+
+    @override_settings(DEBUG=False)
+    def test_compiled_template_is_reused(self):
+        name = 'orders/order_status_email'
+        context = self.contexts[name][0]
+        render_email(name, context)
+        compiled = email_templates._cache[name]
+        with mock.patch('core.email_templates.get_template') as get_template, \
+                mock.patch('core.email_templates.inline_css') as inline:
+            html_body, _ = render_email(name, context)
+        get_template.assert_not_called()
+        inline.assert_not_called()
+        self.assertIs(email_templates._cache[name], compiled)
+        self.assertIn('Shipped', html_body)
@@ -2,20 +2,28 @@
 from django.contrib import admin
 from django.urls import reverse
 from django.utils.html import format_html
-from .models import REDXConfiguration, REDXParcel
+from . import breaker
+from .bulk import retry_failed_items
+from .models import ParcelBatch, ParcelBatchItem, ParcelEvent, REDXArea, REDXConfiguration, REDXParcel
 
 
 @admin.register(REDXConfiguration)
 class REDXConfigurationAdmin(admin.ModelAdmin):
-    list_display = ('mode', 'store_name', 'store_phone', 'is_active', 'created_at')
+    list_display = ('mode', 'store_name', 'store_phone', 'is_active', 'circuit_status', 'created_at')
     list_filter = ('mode', 'is_active')
     search_fields = ('store_name', 'store_phone')
+    readonly_fields = ('circuit_status',)
+    actions = ['reset_circuit_breaker']
     
     fieldsets = (
         ('Mode Selection', {
             'fields': ('mode', 'is_active'),
             'description': 'Select Sandbox for testing or Production for live operations'
         }),
+        ('Connection Health', {
+            'fields': ('circuit_status',),
+            'description': 'While the circuit is open, REDX calls fail at once instead of waiting for timeouts'
+        }),
         ('Sandbox Configuration', {
             'fields': ('sandbox_base_url', 'sandbox_token'),
             'classes': ('collapse',),
@@ -38,9 +46,100 @@ class REDXConfigurationAdmin(admin.ModelAdmin):
             REDXConfiguration.objects.exclude(pk=obj.pk).update(is_active=False)
         super().save_model(request, obj, form, change)
 
+    def circuit_status(self, obj):
+        """Circuit breaker state, shared by every worker through the cache"""
+        state = breaker.breaker_state()
+        colors = {'closed': '#10b981', 'half-open': '#f59e0b', 'open': '#ef4444'}
+        details = []
+        if state['state'] == 'open':
+            details.append(f"retry in {state['retry_in']}s")
+        elif state['failures']:
+            details.append(f"{state['failures']} recent failure(s)")
+        if state['state'] != 'closed' and state['last_error']:
+            details.append(f"last error: {state['last_error']}")
+        return format_html(
+            '<span style="background:{};color:white;padding:3px 8px;border-radius:3px;font-weight:bold;">{}</span> {}',
+            colors[state['state']],
+            state['state'].upper(),
+            '; '.join(details),
+        )
+    circuit_status.short_description = 'REDX Circuit'
+
+    def reset_circuit_breaker(self, request, queryset):
+        breaker.reset()
+        self.message_user(request, "REDX circuit breaker closed; calls go through again.")
+    reset_circuit_breaker.short_description = "Close the REDX circuit breaker"
+
+
+@admin.register(REDXArea)
+class REDXAreaAdmin(admin.ModelAdmin):
+    """Read-only: the list is replaced from REDX by `manage.py refresh_redx_areas`"""
+    list_display = ('name', 'district_name', 'division_name', 'post_code', 'redx_id', 'refreshed_at')
+    list_filter = ('division_name',)
+    search_fields = ('name', 'district_name', 'post_code')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class ParcelBatchItemInline(admin.TabularInline):
+    model = ParcelBatchItem
+    extra = 0
+    fields = ('order', 'state', 'tracking_id', 'error_message', 'attempts', 'updated_at')
+    readonly_fields = fields
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ParcelBatch)
+class ParcelBatchAdmin(admin.ModelAdmin):
+    list_display = ('id', 'requested_by', 'progress_bar', 'created', 'failed', 'skipped', 'state', 'created_at', 'finished_at')
+    list_filter = ('state', 'created_at')
+    readonly_fields = ('requested_by', 'parcel_weight', 'total', 'created', 'failed', 'skipped', 'state',
+                       'error_message', 'created_at', 'finished_at')
+    inlines = [ParcelBatchItemInline]
+    actions = ['retry_failed']
+
+    def progress_bar(self, obj):
+        percent = obj.progress_percent
+        return format_html(
+            '<div style="width:120px;background:#e5e7eb;border-radius:4px;">'
+            '<div style="width:{}%;background:#10b981;color:white;font-size:11px;padding:2px 4px;border-radius:4px;white-space:nowrap;">{}%</div>'
+            '</div>',
+            percent,
+            percent,
+        )
+    progress_bar.short_description = 'Progress'
+
+    def retry_failed(self, request, queryset):
+        requeued = sum(retry_failed_items(batch) for batch in queryset)
+        self.message_user(request, f"{requeued} failed or unfinished parcel(s) queued again.")
+    retry_failed.short_description = "Retry failed and unfinished parcels"
+
+    def has_add_permission(self, request):
+        return False
+
+
+class ParcelEventInline(admin.TabularInline):
+    """The parcel's history as REDX reported it; append-only"""
+    model = ParcelEvent
+    extra = 0
+    fields = ('happened_at', 'status', 'raw_status', 'message', 'source')
+    readonly_fields = fields
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
 
 @admin.register(REDXParcel)
 class REDXParcelAdmin(admin.ModelAdmin):
+    inlines = [ParcelEventInline]
     list_display = (
         'order_number',
         'tracking_id_display',
@@ -53,11 +152,11 @@ class REDXParcelAdmin(admin.ModelAdmin):
     )
     list_filter = ('status', 'created_at', 'customer_district')
     search_fields = ('tracking_id', 'customer_name', 'customer_phone', 'order__order_number')
-    readonly_fields = ('tracking_id', 'redx_response', 'error_message', 'created_at', 'updated_at')
+    readonly_fields = ('tracking_id', 'status_updated_at', 'redx_response', 'error_message', 'created_at', 'updated_at')
     
     fieldsets = (
         ('Order Information', {
-            'fields': ('order', 'tracking_id', 'status')
+            'fields': ('order', 'tracking_id', 'status', 'status_updated_at')
         }),
         ('Customer Information', {
             'fields': ('customer_name', 'customer_phone', 'customer_address', 'customer_area', 'customer_district')
@@ -0,0 +1,104 @@
+# courier/areas.py
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import REDXArea
+
+logger = logging.getLogger(__name__)
+
+AREA_BATCH_SIZE = 500
+
+
+def refresh_areas(service=None):
+    """
+    Download the REDX area list and store it in REDXArea: new areas are added,
+    known ones updated in place and areas REDX no longer lists are removed.
+    Returns the number of areas stored, or None when REDX could not be reached
+    (the existing table is then left alone).
+    """
+    from .services import REDXService
+
+    try:
+        service = service or REDXService()
+    except Exception as e:
+        logger.warning(f"REDX areas not refreshed: {e}")
+        return None
+
+    result = service.get_areas()
+    if not result['success']:
+        logger.error(f"REDX areas not refreshed: {result.get('error')}")
+        return None
+
+    now = timezone.now()
+    areas = {}
+    for entry in result['data']:
+        try:
+            redx_id = int(entry['id'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        area = REDXArea(
+            redx_id=redx_id,
+            name=str(entry.get('name') or '')[:150],
+            district_name=str(entry.get('district_name') or '')[:100],
+            division_name=str(entry.get('division_name') or '')[:100],
+            post_code=str(entry.get('post_code') or '')[:20],
+            zone_id=_int_or_none(entry.get('zone_id')),
+            refreshed_at=now,
+        )
+        # bulk_create doesn't call save(), so fill the lookup keys here
+        area.name_key = REDXArea.normalize(area.name)
+        area.district_key = REDXArea.normalize(area.district_name)
+        areas[redx_id] = area
+
+    if not areas:
+        logger.warning("REDX returned no areas; keeping the stored list")
+        return None
+
+    with transaction.atomic():
+        REDXArea.objects.bulk_create(
+            list(areas.values()),
+            batch_size=AREA_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['redx_id'],
+            update_fields=['name', 'district_name', 'division_name', 'post_code', 'zone_id',
+                           'name_key', 'district_key', 'refreshed_at'],
+        )
+        removed, _ = REDXArea.objects.filter(refreshed_at__lt=now).delete()
+
+    logger.info(f"Stored {len(areas)} REDX areas ({removed} removed)")
+    return len(areas)
+
+
+def find_area(area_name, district_name='Dhaka'):
+    """
+    Best REDXArea for a customer's area and district, trying in turn: exact name,
+    name prefix and partial name within the district, then any area of the district,
+    then any area at all. Every step is an index lookup on (district_key, name_key)
+    except the partial match, which only scans the district's rows.
+    """
+    name_key = REDXArea.normalize(area_name)
+    in_district = REDXArea.objects.filter(district_key=REDXArea.normalize(district_name)).order_by('name_key', 'redx_id')
+
+    candidates = []
+    if name_key:
+        candidates += [
+            in_district.filter(name_key=name_key),
+            in_district.filter(name_key__gte=name_key, name_key__lt=name_key + '\uffff'),
+            in_district.filter(name_key__contains=name_key),
+        ]
+    candidates += [in_district, REDXArea.objects.order_by('redx_id')]
+
+    for queryset in candidates:
+        area = queryset.first()
+        if area:
+            return area
+    return None
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
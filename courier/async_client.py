@@ -0,0 +1,111 @@
+# courier/async_client.py
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .services import REDXService
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Threads the HTTP calls run on: as many as the shared session keeps connections."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'REDX_POOL_SIZE', 10),
+                    thread_name_prefix='redx-async',
+                )
+    return _executor
+
+
+class AsyncREDXService:
+    """
+    Awaitable version of REDXService, with the same methods and results.
+
+    Calls go through the same pooled, retrying session and circuit breaker
+    (courier.transport); each one waits on a worker thread, so many can be in
+    flight from one event loop. Use gather() or the *_many helpers for batches:
+
+        client = await AsyncREDXService.connect()
+        results = await client.track_many(['TRK1', 'TRK2'])  # [result for TRK1, result for TRK2]
+    """
+
+    def __init__(self, service=None, concurrency=None):
+        self.service = service or REDXService()
+        self.concurrency = concurrency or getattr(settings, 'REDX_BULK_CONCURRENCY', 4)
+
+    @classmethod
+    async def connect(cls, concurrency=None):
+        """Build the client from inside an event loop (reading the configuration needs the database)."""
+        service = await sync_to_async(REDXService)()
+        return cls(service, concurrency)
+
+    async def _call(self, method, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), partial(method, *args))
+
+    async def get_areas(self):
+        return await self._call(self.service.get_areas)
+
+    async def find_area_by_name(self, area_name, district_name='Dhaka'):
+        return await sync_to_async(self.service.find_area_by_name)(area_name, district_name)
+
+    async def create_parcel(self, parcel_data):
+        return await self._call(self.service.create_parcel, parcel_data)
+
+    async def track_parcel(self, tracking_id):
+        return await self._call(self.service.track_parcel, tracking_id)
+
+    async def cancel_parcel(self, tracking_id):
+        return await self._call(self.service.cancel_parcel, tracking_id)
+
+    async def test_connection(self):
+        return (await self.get_areas())['success']
+
+    async def gather(self, calls, concurrency=None, rate_per_second=None):
+        """
+        Await `calls` (coroutines, e.g. from track_parcel()) with at most `concurrency`
+        running at once and starting no faster than `rate_per_second`. Results come
+        back in order; an exception is returned in place of its result.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency or self.concurrency))
+        interval = 1.0 / rate_per_second if rate_per_second else 0
+        loop = asyncio.get_running_loop()
+        next_start = loop.time()
+
+        async def run(call):
+            nonlocal next_start
+            async with semaphore:
+                if interval:
+                    now = loop.time()
+                    start = max(now, next_start)
+                    next_start = start + interval
+                    if start > now:
+                        await asyncio.sleep(start - now)
+                return await call
+
+        return await asyncio.gather(*(run(call) for call in calls), return_exceptions=True)
+
+    async def track_many(self, tracking_ids, concurrency=None, rate_per_second=None):
+        """track_parcel() results, in the order of `tracking_ids` (which may repeat)."""
+        results = await self.gather([self.track_parcel(t) for t in tracking_ids], concurrency, rate_per_second)
+        return [_as_result(r) for r in results]
+
+    async def create_many(self, payloads, concurrency=None, rate_per_second=None):
+        """create_parcel() results, in the order of `payloads`."""
+        results = await self.gather([self.create_parcel(p) for p in payloads], concurrency, rate_per_second)
+        return [_as_result(r) for r in results]
+
+
+def _as_result(result):
+    if isinstance(result, BaseException):
+        return {'success': False, 'error': str(result)}
+    return result
@@ -0,0 +1,112 @@
+# courier/breaker.py
+import logging
+import time
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+BREAKER_CACHE_PREFIX = 'redx-breaker'
+# A half-open probe that never reports back frees its slot after this long
+PROBE_TIMEOUT = 60
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling REDX while the circuit breaker is open."""
+
+
+def _key(name):
+    return f"{BREAKER_CACHE_PREFIX}:{name}"
+
+
+def _failure_threshold():
+    return getattr(settings, 'REDX_BREAKER_FAILURES', 5)
+
+
+def _cooldown():
+    return getattr(settings, 'REDX_BREAKER_COOLDOWN', 30)
+
+
+def _slow_call_seconds():
+    return getattr(settings, 'REDX_BREAKER_SLOW_CALL', 10)
+
+
+def before_call():
+    """
+    Check the breaker before calling REDX. Raises CircuitOpenError while it is
+    open; once the cool-down is over one caller, across all workers, is let through
+    as a probe. Returns True for that probe call.
+    """
+    opened_until = cache.get(_key('opened-until'))
+    if opened_until is None:
+        return False
+    remaining = opened_until - time.time()
+    if remaining <= 0 and cache.add(_key('probe'), 1, PROBE_TIMEOUT):
+        return True
+    raise CircuitOpenError(_open_message(max(remaining, 0)))
+
+
+def record_success(elapsed, probe=False):
+    """A call that got an answer; one slower than REDX_BREAKER_SLOW_CALL still counts as a failure."""
+    if elapsed > _slow_call_seconds():
+        record_failure(f"slow response ({elapsed:.1f}s)", probe)
+        return
+    if probe or cache.get(_key('failures')):
+        if probe:
+            logger.info("REDX circuit breaker closed: probe call succeeded")
+        cache.delete_many([_key('failures'), _key('opened-until'), _key('probe')])
+
+
+def record_failure(reason, probe=False):
+    """A call that failed or timed out; enough of them in a row open the breaker."""
+    cache.set(_key('last-error'), reason, None)
+    if probe:
+        _open(f"probe call failed: {reason}")
+        return
+    try:
+        failures = cache.incr(_key('failures'))
+    except ValueError:
+        cache.set(_key('failures'), 1, None)
+        failures = 1
+    if failures >= _failure_threshold():
+        _open(f"{failures} failed calls in a row, last: {reason}")
+
+
+def reset():
+    """Close the breaker by hand (admin action)."""
+    cache.delete_many([_key(name) for name in ('failures', 'opened-until', 'probe', 'last-error')])
+
+
+def breaker_state():
+    """State for display: 'closed', 'open' or 'half-open', with failure count, last error and reopen time."""
+    values = cache.get_many([_key(name) for name in ('failures', 'opened-until', 'probe', 'last-error')])
+    opened_until = values.get(_key('opened-until'))
+    if opened_until is None:
+        state = 'closed'
+    elif opened_until > time.time() and not values.get(_key('probe')):
+        state = 'open'
+    else:
+        state = 'half-open'
+    return {
+        'state': state,
+        'failures': values.get(_key('failures')) or 0,
+        'last_error': values.get(_key('last-error')) or '',
+        'retry_in': max(0, int(opened_until - time.time())) if opened_until else 0,
+    }
+
+
+def _open(reason):
+    cache.set(_key('opened-until'), time.time() + _cooldown(), None)
+    cache.set(_key('failures'), 0, None)
+    cache.delete(_key('probe'))
+    logger.warning(f"REDX circuit breaker opened for {_cooldown()}s: {reason}")
+
+
+def _open_message(remaining):
+    last_error = cache.get(_key('last-error')) or 'unknown error'
+    if remaining:
+        return (f"REDX is not responding ({last_error}); courier calls are paused "
+                f"for another {remaining:.0f}s. Please try again shortly.")
+    return f"REDX is not responding ({last_error}); another request is checking whether it is back."
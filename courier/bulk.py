@@ -0,0 +1,281 @@
+# courier/bulk.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Exists, F, Max, OuterRef
+from django.utils import timezone
+
+from orders.models import Order
+from .events import record_response
+from .models import ParcelBatch, ParcelBatchItem, REDXParcel
+from .services import REDXService
+
+logger = logging.getLogger(__name__)
+
+# Only the REDX calls run in parallel. Result writes take turns: SQLite has a single
+# writer, and a read-then-write transaction (update_or_create) that finds the
+# database busy fails at once with "database is locked" instead of waiting.
+_db_writes = threading.Lock()
+
+# A queued or running batch whose items have not moved for this long lost its worker
+# (the web process was restarted or recycled); see resume_stalled_batches()
+BATCH_STALL_AFTER = timedelta(minutes=10)
+
+
+def create_parcel_batch(orders, user=None, parcel_weight=Decimal('0.5'), background=True):
+    """
+    Queue REDX parcel creation for `orders` (a queryset or ids). Orders that already
+    have a parcel with a tracking ID are recorded as skipped.
+    Returns the ParcelBatch; with `background` it is processed on a daemon thread
+    once the transaction commits, otherwise call run_parcel_batch() yourself.
+    """
+    if not hasattr(orders, 'values_list'):
+        orders = Order.objects.filter(pk__in=list(orders))
+    order_ids = list(orders.order_by('id').values_list('id', flat=True))
+    tracked = set(
+        REDXParcel.objects.filter(order_id__in=order_ids, tracking_id__isnull=False)
+        .exclude(tracking_id='')
+        .values_list('order_id', flat=True)
+    )
+
+    with transaction.atomic():
+        batch = ParcelBatch.objects.create(
+            requested_by=user if getattr(user, 'is_authenticated', False) else None,
+            parcel_weight=parcel_weight,
+            total=len(order_ids),
+            skipped=len(tracked),
+        )
+        ParcelBatchItem.objects.bulk_create([
+            ParcelBatchItem(
+                batch=batch,
+                order_id=order_id,
+                state='skipped' if order_id in tracked else 'pending',
+                error_message='Order already has a REDX parcel' if order_id in tracked else '',
+            )
+            for order_id in order_ids
+        ])
+        if background:
+            transaction.on_commit(lambda: start_parcel_worker(batch.pk))
+    return batch
+
+
+def retry_failed_items(batch, background=True):
+    """
+    Put a batch's failed items back in the queue and process them again, together
+    with any still pending. A batch left `running` by a restart has pending items
+    and no worker; this starts one for it. Returns the number of items to process.
+    """
+    with transaction.atomic():
+        requeued = batch.items.filter(state='failed').update(state='pending', error_message='')
+        # Touching the items tells resume_stalled_batches() this batch is being handled
+        pending = batch.items.filter(state='pending').update(updated_at=timezone.now())
+        if not pending:
+            return 0
+        ParcelBatch.objects.filter(pk=batch.pk).update(
+            failed=F('failed') - requeued,
+            state='queued',
+            error_message='',
+            finished_at=None,
+        )
+        if background:
+            transaction.on_commit(lambda: start_parcel_worker(batch.pk))
+    return pending
+
+
+def resume_stalled_batches():
+    """
+    Scheduled job: finish batches whose worker thread died with its web process
+    (deploy, worker recycle). Queued or running batches with pending items and no
+    progress for BATCH_STALL_AFTER are run here, in the scheduler process.
+    Returns how many batches were resumed.
+    """
+    cutoff = timezone.now() - BATCH_STALL_AFTER
+    pending = ParcelBatchItem.objects.filter(batch=OuterRef('pk'), state='pending')
+    stalled = list(
+        ParcelBatch.objects.filter(state__in=('queued', 'running'), created_at__lt=cutoff)
+        .annotate(last_progress=Max('items__updated_at'))
+        .filter(last_progress__lt=cutoff)
+        .filter(Exists(pending))
+        .order_by('created_at')
+        .values_list('pk', flat=True)
+    )
+    for batch_id in stalled:
+        logger.warning(f"Parcel batch {batch_id} made no progress for {BATCH_STALL_AFTER}; resuming it")
+        run_parcel_batch(batch_id)
+    return len(stalled)
+
+
+def start_parcel_worker(batch_id):
+    """
+    Process a batch on a daemon thread so the admin request returns immediately.
+    If the process goes away first, resume_stalled_batches() picks the batch up.
+    """
+    worker = threading.Thread(
+        target=run_parcel_batch,
+        args=(batch_id,),
+        name=f'parcel-batch-{batch_id}',
+        daemon=True,
+    )
+    worker.start()
+    return worker
+
+
+def run_parcel_batch(batch_id, concurrency=None, rate_per_second=None):
+    """
+    Create parcels for every pending item of a batch.
+
+    Up to `concurrency` REDX calls run at once (default REDX_BULK_CONCURRENCY) and
+    calls start no faster than `rate_per_second` (default REDX_BULK_RATE_PER_SECOND).
+    Every item gets its own result row, so a batch interrupted half-way, or one
+    with failures, can be run again and only touches what is still pending.
+    """
+    concurrency = concurrency or getattr(settings, 'REDX_BULK_CONCURRENCY', 4)
+    rate_per_second = rate_per_second or getattr(settings, 'REDX_BULK_RATE_PER_SECOND', 5)
+
+    close_old_connections()
+    try:
+        batch = ParcelBatch.objects.get(pk=batch_id)
+        ParcelBatch.objects.filter(pk=batch_id).update(state='running')
+        service = REDXService()
+        limiter = RateLimiter(rate_per_second)
+        item_ids = list(batch.items.filter(state='pending').values_list('id', flat=True))
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix=f'parcel-batch-{batch_id}') as pool:
+            list(pool.map(lambda item_id: _process_item(item_id, batch, service, limiter), item_ids))
+
+        ParcelBatch.objects.filter(pk=batch_id).update(state='done', finished_at=timezone.now())
+        batch.refresh_from_db()
+        logger.info(
+            f"Parcel batch {batch_id}: {batch.created} created, {batch.failed} failed, {batch.skipped} skipped"
+        )
+        return batch
+    except Exception as e:
+        logger.exception(f"Parcel batch {batch_id} aborted")
+        ParcelBatch.objects.filter(pk=batch_id).update(
+            state='failed',
+            error_message=str(e),
+            finished_at=timezone.now(),
+        )
+        return None
+    finally:
+        connection.close()
+
+
+class RateLimiter:
+    """Spaces out calls from many threads to at most `rate_per_second`."""
+
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second if rate_per_second else 0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _process_item(item_id, batch, service, limiter):
+    # Pool threads each hold their own database connection
+    try:
+        _process_pending_item(item_id, batch, service, limiter)
+    finally:
+        connection.close()
+
+
+def _process_pending_item(item_id, batch, service, limiter):
+    try:
+        item = ParcelBatchItem.objects.select_related('order', 'order__redx_parcel').get(pk=item_id, state='pending')
+    except ParcelBatchItem.DoesNotExist:
+        return
+    try:
+        limiter.wait()
+        state, tracking_id, error = _create_parcel(service, item.order, batch.parcel_weight)
+    except Exception as e:
+        logger.exception(f"Bulk parcel creation failed for order {item.order.order_number}")
+        state, tracking_id, error = 'failed', '', str(e)
+
+    with _db_writes, transaction.atomic():
+        ParcelBatchItem.objects.filter(pk=item_id).update(
+            state=state,
+            tracking_id=tracking_id or '',
+            error_message=error or '',
+            attempts=F('attempts') + 1,
+            updated_at=timezone.now(),
+        )
+        # The item states double as the batch's counter fields
+        ParcelBatch.objects.filter(pk=batch.pk).update(**{state: F(state) + 1})
+
+
+def _create_parcel(service, order, parcel_weight):
+    """Same payload and bookkeeping as the single-order form, with the form's defaults."""
+    existing = getattr(order, 'redx_parcel', None)
+    if existing and existing.tracking_id:
+        return 'skipped', existing.tracking_id, 'Order already has a REDX parcel'
+
+    fields = order_parcel_fields(order)
+    area = service.find_area_by_name(fields['customer_area'], fields['customer_district'])
+    if not area:
+        return 'failed', '', f"Area '{fields['customer_area']}' not found in REDX"
+
+    result = service.create_parcel({
+        "customer_name": fields['customer_name'],
+        "customer_phone": fields['customer_phone'],
+        "customer_address": fields['customer_address'],
+        "delivery_area": area['name'],
+        "delivery_area_id": area['id'],
+        "merchant_invoice_id": order.order_number,
+        "parcel_weight": float(parcel_weight),
+        "cash_collection_amount": float(fields['cash_collection_amount']),
+        "value": float(order.order_total),
+    })
+
+    tracking_id = result.get('tracking_id') if result['success'] else None
+    error = None
+    if not result['success']:
+        error = result.get('error', 'Unknown error')
+    elif not tracking_id:
+        error = 'No tracking ID received from REDX'
+
+    with _db_writes:
+        parcel, _ = REDXParcel.objects.update_or_create(
+            order=order,
+            defaults={
+                **fields,
+                'customer_area': area['name'],
+                'parcel_weight': parcel_weight,
+                'tracking_id': tracking_id,
+                'status': 'created' if tracking_id else 'failed',
+                'error_message': error,
+            },
+        )
+        if tracking_id:
+            record_response(parcel, 'created', f'Parcel created: {tracking_id}', result.get('data'), 'create')
+        else:
+            record_response(parcel, 'failed', error, result.get('data'), 'create')
+    if tracking_id:
+        logger.info(f"REDX parcel created for order {order.order_number}: {tracking_id}")
+        return 'created', tracking_id, ''
+    return 'failed', '', error
+
+
+def order_parcel_fields(order):
+    """Customer details for an order's parcel, as the parcel form pre-fills them."""
+    address_parts = [order.address_line_1, order.address_line_2]
+    return {
+        'customer_name': f"{order.first_name} {order.last_name}".strip(),
+        'customer_phone': order.phone,
+        'customer_address': ', '.join(p for p in address_parts if p),
+        'customer_area': (order.area or '').strip(),
+        'customer_district': (order.state or '').strip() or 'Dhaka',
+        'cash_collection_amount': order.collected_amount,
+    }
@@ -0,0 +1,118 @@
+# courier/events.py
+import logging
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ParcelEvent
+from .services import parcel_status_from
+
+logger = logging.getLogger(__name__)
+
+# Where REDX puts the human-readable part of an update, in order of preference
+MESSAGE_KEYS = ('message_en', 'message', 'remarks', 'location', 'hub_name')
+TIME_KEYS = ('timestamp', 'time', 'updated_at', 'created_at')
+
+
+def record_events(updates, source):
+    """
+    Append what REDX said about parcels to their ParcelEvent history.
+
+    `updates` is a list of (parcel, payload) pairs: a tracking response (optionally
+    with a `tracking` list of steps) or a webhook event. Only news is written: a
+    step older than, or repeating, the parcel's latest event is dropped, so
+    polling an unchanged parcel writes nothing. The newest event of each parcel keeps
+    the raw payload, compressed; older events lose theirs. One query reads the
+    latest events, one bulk insert writes the new ones. Returns how many were written.
+    """
+    received_at = timezone.now()
+    updates = [(parcel, payload) for parcel, payload in updates if payload]
+    if not updates:
+        return 0
+
+    steps = {}
+    for parcel, payload in updates:
+        parcel_steps = steps.setdefault(parcel.pk, (parcel, []))[1]
+        parcel_steps += [(*step, payload) for step in _payload_steps(payload, received_at)]
+
+    last_event = latest_events(steps)
+    new_events, newest_payload = [], {}
+    for parcel_id, (parcel, parcel_steps) in steps.items():
+        for happened_at, raw_status, message, payload in sorted(parcel_steps, key=lambda step: step[0]):
+            last = last_event.get(parcel_id)
+            if last and (happened_at < last.happened_at or (raw_status, message) == (last.raw_status, last.message)):
+                continue
+            event = ParcelEvent(
+                parcel_id=parcel_id,
+                happened_at=happened_at,
+                status=parcel_status_from({'status': raw_status}, last.status if last else parcel.status),
+                raw_status=raw_status,
+                message=message,
+                source=source,
+            )
+            new_events.append(event)
+            last_event[parcel_id] = event
+            newest_payload[parcel_id] = payload
+
+    if not new_events:
+        return 0
+    for event in new_events:
+        if last_event[event.parcel_id] is event:
+            event.payload = ParcelEvent.compress(newest_payload[event.parcel_id])
+
+    with transaction.atomic():
+        ParcelEvent.objects.filter(parcel_id__in=list(newest_payload), payload__isnull=False).update(payload=None)
+        ParcelEvent.objects.bulk_create(new_events)
+    logger.info(f"Recorded {len(new_events)} parcel event(s) from {source}")
+    return len(new_events)
+
+
+def record_response(parcel, raw_status, message, response, source):
+    """
+    Record a REDX answer that is not a tracking step (parcel created, cancelled)
+    as an event; the response becomes that event's compressed payload instead of
+    being written to REDXParcel.redx_response.
+    """
+    return record_events([(parcel, {'status': raw_status, 'message': message, 'response': response})], source)
+
+
+def latest_events(parcel_ids):
+    """{parcel_id: newest event}, without payloads, in one query."""
+    newest = ParcelEvent.objects.filter(parcel=OuterRef('parcel')).order_by('-happened_at', '-id').values('pk')[:1]
+    events = ParcelEvent.objects.filter(parcel_id__in=list(parcel_ids), pk=Subquery(newest)).defer('payload')
+    return {event.parcel_id: event for event in events}
+
+
+def parse_event_time(value, default):
+    """An ISO 8601 string or epoch seconds as an aware datetime; `default` when missing or malformed."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value, tz=dt_timezone.utc)
+    try:
+        parsed = parse_datetime(value) if isinstance(value, str) else None
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        return default
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _payload_steps(payload, default_time):
+    if not isinstance(payload, dict):
+        return
+    steps = payload.get('tracking')
+    if not isinstance(steps, list):
+        steps = [payload]
+    for step in steps:
+        if not isinstance(step, dict):
+            continue
+        raw_status = str(step.get('status') or '')[:50]
+        message = next((str(step[key]) for key in MESSAGE_KEYS if step.get(key)), '')[:255]
+        if not raw_status and not message:
+            continue
+        happened_at = parse_event_time(next((step[key] for key in TIME_KEYS if step.get(key)), None), default_time)
+        yield happened_at, raw_status, message
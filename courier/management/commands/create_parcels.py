@@ -0,0 +1,53 @@
+# courier/management/commands/create_parcels.py
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from courier.bulk import create_parcel_batch, retry_failed_items, run_parcel_batch
+from courier.models import ParcelBatch
+from orders.models import Order
+
+
+class Command(BaseCommand):
+    help = "Create REDX parcels for many orders at once, or retry the failed entries of an earlier batch."
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--orders', nargs='+', metavar='ORDER_NUMBER', help='Order numbers to ship')
+        target.add_argument('--status', help='Ship every placed order in this status that has no parcel yet (e.g. Accept)')
+        target.add_argument('--resume', type=int, metavar='BATCH_ID', help='Retry the failed and unfinished items of a batch')
+        parser.add_argument('--weight', type=Decimal, default=Decimal('0.5'), help='Parcel weight in KG (default 0.5)')
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help=f'REDX calls in flight at once (default {settings.REDX_BULK_CONCURRENCY})')
+        parser.add_argument('--rate', type=float, default=None,
+                            help=f'REDX calls started per second (default {settings.REDX_BULK_RATE_PER_SECOND})')
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            try:
+                batch = ParcelBatch.objects.get(pk=options['resume'])
+            except ParcelBatch.DoesNotExist:
+                raise CommandError(f"Parcel batch {options['resume']} does not exist")
+            requeued = retry_failed_items(batch, background=False)
+            self.stdout.write(f"Retrying batch {batch.pk}: {requeued} failed or unfinished item(s) queued again.")
+        else:
+            if options['orders']:
+                orders = Order.objects.filter(order_number__in=options['orders'])
+                missing = set(options['orders']) - set(orders.values_list('order_number', flat=True))
+                if missing:
+                    raise CommandError(f"Unknown order number(s): {', '.join(sorted(missing))}")
+            else:
+                orders = Order.objects.filter(is_ordered=True, status=options['status'], redx_parcel__isnull=True)
+            batch = create_parcel_batch(orders, parcel_weight=options['weight'], background=False)
+            self.stdout.write(f"Batch {batch.pk}: {batch.total} order(s), {batch.skipped} already shipped.")
+
+        batch = run_parcel_batch(batch.pk, concurrency=options['concurrency'], rate_per_second=options['rate'])
+        if batch is None:
+            raise CommandError("The batch was aborted; see the log for details.")
+        for item in batch.items.filter(state='failed').select_related('order'):
+            self.stdout.write(self.style.WARNING(f"  {item.order.order_number}: {item.error_message}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Batch {batch.pk}: {batch.created} created, {batch.failed} failed, {batch.skipped} skipped."
+            + (f" Retry with --resume {batch.pk}." if batch.failed else '')
+        ))
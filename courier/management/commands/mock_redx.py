@@ -0,0 +1,119 @@
+# courier/management/commands/mock_redx.py
+import json
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courier.mock_redx import MockREDX
+from courier.models import REDXConfiguration
+
+
+# What --configure changes on the active REDX configuration
+CONFIGURED_FIELDS = ('mode', 'sandbox_base_url', 'sandbox_token')
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    # Many clients connecting at once during load tests
+    request_queue_size = 128
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = ("Serve a local stand-in for the REDX API (areas, parcel create/track/cancel) with "
+            "configurable latency, error rate and rate limit, for offline load and integration tests.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency', type=float, default=0.2, help='Seconds added to every call (default 0.2)')
+        parser.add_argument('--jitter', type=float, default=0.05, help='Random +- seconds on top of --latency')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Share of calls (0-1) answered with a 5xx')
+        parser.add_argument('--rate-limit', type=float, default=0, help='Requests per second before 429s (0 = no limit)')
+        parser.add_argument('--burst', type=int, default=None, help='Requests allowed at once above the rate limit')
+        parser.add_argument('--advance-every', type=float, default=60,
+                            help='Seconds a parcel spends in each tracking status (default 60)')
+        parser.add_argument('--seed', type=int, default=None, help='Seed for latency jitter and injected errors')
+        parser.add_argument('--configure', action='store_true',
+                            help='Point the active REDX configuration (sandbox mode) at this server until it stops')
+        parser.add_argument('--keep-configuration', action='store_true',
+                            help='With --configure, leave the configuration pointing here after the server stops')
+        parser.add_argument('--verbose-requests', action='store_true', help='Log every request')
+
+    def handle(self, *args, **options):
+        if not 0 <= options['error_rate'] <= 1:
+            raise CommandError("--error-rate must be between 0 and 1")
+
+        app = MockREDX(
+            latency=options['latency'],
+            jitter=options['jitter'],
+            error_rate=options['error_rate'],
+            rate_limit=options['rate_limit'],
+            burst=options['burst'],
+            advance_every=options['advance_every'],
+            seed=options['seed'],
+        )
+        base_url = f"http://{options['host']}:{options['port']}/v1.0.0-beta"
+
+        # Bind first: a port in use must not leave the configuration pointing at nothing
+        handler = WSGIRequestHandler if options['verbose_requests'] else QuietHandler
+        try:
+            server = make_server(options['host'], options['port'], app,
+                                 server_class=ThreadingWSGIServer, handler_class=handler)
+        except OSError as e:
+            raise CommandError(f"Cannot listen on {options['host']}:{options['port']}: {e}")
+
+        restore = None
+        try:
+            if options['configure']:
+                restore = self._configure(base_url)
+            else:
+                self.stdout.write(f"Set the REDX configuration's sandbox base URL to {base_url} (or pass --configure).")
+            self.stdout.write(self.style.SUCCESS(
+                f"Mock REDX on {base_url} (latency {options['latency']}s, errors {options['error_rate']:.0%}, "
+                f"rate limit {options['rate_limit'] or 'none'}). Counters at /__stats; Ctrl-C to stop."
+            ))
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(json.dumps(app.stats, indent=2))
+            if restore and not options['keep_configuration']:
+                restore()
+
+    def _configure(self, base_url):
+        """Point the active configuration at the mock server; returns a function undoing it."""
+        config = REDXConfiguration.current()
+        if config is None:
+            config = REDXConfiguration(sandbox_token='mock', production_token='')
+            previous = None
+        else:
+            previous = {field: getattr(config, field) for field in CONFIGURED_FIELDS}
+            self.stdout.write(
+                f"REDX configuration #{config.pk} was: mode {previous['mode']}, "
+                f"sandbox base URL {previous['sandbox_base_url']}."
+            )
+        config.mode = 'sandbox'
+        config.sandbox_base_url = base_url
+        config.sandbox_token = config.sandbox_token or 'mock'
+        config.save()
+        self.stdout.write(f"REDX configuration #{config.pk} now uses {base_url} in sandbox mode "
+                          f"until the server stops (--keep-configuration to leave it).")
+        return lambda: self._restore(config, previous)
+
+    def _restore(self, config, previous):
+        if previous is None:
+            pk = config.pk
+            config.delete()
+            self.stdout.write(f"Removed REDX configuration #{pk}, created for the mock server.")
+            return
+        for field, value in previous.items():
+            setattr(config, field, value)
+        config.save(update_fields=[*previous, 'updated_at'])
+        self.stdout.write(f"REDX configuration #{config.pk} restored to {config.get_base_url()} ({config.mode} mode).")
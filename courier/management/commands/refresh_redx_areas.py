@@ -0,0 +1,14 @@
+# courier/management/commands/refresh_redx_areas.py
+from django.core.management.base import BaseCommand, CommandError
+
+from courier.areas import refresh_areas
+
+
+class Command(BaseCommand):
+    help = "Download the REDX delivery-area list into the local REDXArea table."
+
+    def handle(self, *args, **options):
+        stored = refresh_areas()
+        if stored is None:
+            raise CommandError("Could not refresh REDX areas; see the log for details.")
+        self.stdout.write(self.style.SUCCESS(f"Stored {stored} REDX area(s)."))
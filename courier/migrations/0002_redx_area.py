@@ -0,0 +1,34 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courier', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='REDXArea',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('redx_id', models.PositiveIntegerField(unique=True)),
+                ('name', models.CharField(max_length=150)),
+                ('district_name', models.CharField(blank=True, max_length=100)),
+                ('division_name', models.CharField(blank=True, max_length=100)),
+                ('post_code', models.CharField(blank=True, max_length=20)),
+                ('zone_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('name_key', models.CharField(editable=False, max_length=150)),
+                ('district_key', models.CharField(editable=False, max_length=100)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'REDX Area',
+                'verbose_name_plural': 'REDX Areas',
+                'ordering': ['district_name', 'name'],
+                'indexes': [models.Index(fields=['district_key', 'name_key'], name='courier_area_district_name_idx'), models.Index(fields=['name_key'], name='courier_area_name_idx')],
+            },
+        ),
+    ]
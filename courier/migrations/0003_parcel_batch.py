@@ -0,0 +1,58 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courier', '0002_redx_area'),
+        ('orders', '0020_backfill_order_subtotals'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParcelBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('parcel_weight', models.DecimalField(decimal_places=2, default=0.5, help_text='Weight in KG', max_digits=6)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('skipped', models.PositiveIntegerField(default=0)),
+                ('state', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('error_message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Parcel Batch',
+                'verbose_name_plural': 'Parcel Batches',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ParcelBatchItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.CharField(choices=[('pending', 'Pending'), ('created', 'Created'), ('failed', 'Failed'), ('skipped', 'Skipped')], default='pending', max_length=10)),
+                ('tracking_id', models.CharField(blank=True, max_length=100)),
+                ('error_message', models.TextField(blank=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='courier.parcelbatch')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='parcel_batch_items', to='orders.order')),
+            ],
+            options={
+                'verbose_name': 'Parcel Batch Item',
+                'verbose_name_plural': 'Parcel Batch Items',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['batch', 'state'], name='courier_batchitem_state_idx')],
+                'constraints': [models.UniqueConstraint(fields=('batch', 'order'), name='courier_batchitem_batch_order_uniq')],
+            },
+        ),
+    ]
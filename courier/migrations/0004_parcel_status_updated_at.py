@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courier', '0003_parcel_batch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='redxparcel',
+            name='status_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courier', '0004_parcel_status_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParcelEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('happened_at', models.DateTimeField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('created', 'Created'), ('picked', 'Picked Up'), ('in_transit', 'In Transit'), ('delivered', 'Delivered'), ('cancelled', 'Cancelled'), ('failed', 'Failed')], max_length=20)),
+                ('raw_status', models.CharField(blank=True, help_text='Status as REDX sent it', max_length=50)),
+                ('message', models.CharField(blank=True, help_text='Location or message from REDX', max_length=255)),
+                ('source', models.CharField(choices=[('track', 'Manual tracking'), ('poller', 'Status poller'), ('webhook', 'Webhook')], max_length=10)),
+                ('payload', models.BinaryField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('parcel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='courier.redxparcel')),
+            ],
+            options={
+                'verbose_name': 'Parcel Event',
+                'verbose_name_plural': 'Parcel Events',
+                'ordering': ['happened_at', 'id'],
+                'indexes': [models.Index(fields=['parcel', 'happened_at'], name='courier_event_parcel_time_idx')],
+            },
+        ),
+    ]
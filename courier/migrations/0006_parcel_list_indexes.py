@@ -0,0 +1,61 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:40
+
+import re
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def _normalize_phone(value):
+    # Same as REDXParcel.normalize_phone (historical models have no custom methods)
+    digits = re.sub(r'\D+', '', value or '')
+    if digits.startswith('880'):
+        digits = '0' + digits[3:]
+    return digits[:20]
+
+
+def fill_phone_keys(apps, schema_editor):
+    REDXParcel = apps.get_model('courier', 'REDXParcel')
+    batch = []
+    for parcel in REDXParcel.objects.only('id', 'customer_phone').iterator(chunk_size=BATCH_SIZE):
+        parcel.phone_key = _normalize_phone(parcel.customer_phone)
+        batch.append(parcel)
+        if len(batch) >= BATCH_SIZE:
+            REDXParcel.objects.bulk_update(batch, ['phone_key'])
+            batch = []
+    if batch:
+        REDXParcel.objects.bulk_update(batch, ['phone_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courier', '0005_parcel_event'),
+        ('orders', '0020_backfill_order_subtotals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='redxparcel',
+            name='phone_key',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.RunPython(fill_phone_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='redxparcel',
+            index=models.Index(fields=['created_at', 'id'], name='courier_parcel_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='redxparcel',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='courier_parcel_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='redxparcel',
+            index=models.Index(fields=['tracking_id'], name='courier_parcel_tracking_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='redxparcel',
+            index=models.Index(fields=['phone_key'], name='courier_parcel_phone_idx'),
+        ),
+    ]
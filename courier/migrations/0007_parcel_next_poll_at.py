@@ -0,0 +1,22 @@
+# Generated by Django 5.2.3 on 2026-10-19 01:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courier', '0006_parcel_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='redxparcel',
+            name='next_poll_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='redxparcel',
+            index=models.Index(fields=['status', 'next_poll_at'], name='courier_parcel_next_poll_idx'),
+        ),
+    ]
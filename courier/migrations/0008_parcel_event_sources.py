@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 01:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courier', '0007_parcel_next_poll_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='parcelevent',
+            name='source',
+            field=models.CharField(choices=[('track', 'Manual tracking'), ('poller', 'Status poller'), ('webhook', 'Webhook'), ('create', 'Parcel creation'), ('cancel', 'Cancellation')], max_length=10),
+        ),
+    ]
@@ -0,0 +1,196 @@
+# courier/mock_redx.py
+import json
+import random
+import re
+import threading
+import time
+from itertools import count
+
+AREAS = [
+    {'id': 1, 'name': 'Mirpur', 'district_name': 'Dhaka', 'division_name': 'Dhaka', 'post_code': '1216', 'zone_id': 1},
+    {'id': 2, 'name': 'Dhanmondi', 'district_name': 'Dhaka', 'division_name': 'Dhaka', 'post_code': '1205', 'zone_id': 1},
+    {'id': 3, 'name': 'Uttara', 'district_name': 'Dhaka', 'division_name': 'Dhaka', 'post_code': '1230', 'zone_id': 1},
+    {'id': 4, 'name': 'Gulshan', 'district_name': 'Dhaka', 'division_name': 'Dhaka', 'post_code': '1212', 'zone_id': 1},
+    {'id': 5, 'name': 'Tongi', 'district_name': 'Gazipur', 'division_name': 'Dhaka', 'post_code': '1710', 'zone_id': 2},
+    {'id': 6, 'name': 'Agrabad', 'district_name': 'Chattogram', 'division_name': 'Chattogram', 'post_code': '4100', 'zone_id': 3},
+    {'id': 7, 'name': 'Zindabazar', 'district_name': 'Sylhet', 'division_name': 'Sylhet', 'post_code': '3100', 'zone_id': 3},
+]
+
+TRACKING_STEPS = ('pending', 'picked_up', 'in_transit', 'delivered')
+REQUIRED_PARCEL_FIELDS = ('customer_name', 'customer_phone', 'customer_address', 'delivery_area_id', 'merchant_invoice_id')
+
+ROUTES = [
+    ('GET', re.compile(r'/areas/?$'), 'areas'),
+    ('POST', re.compile(r'/parcel/?$'), 'create'),
+    ('GET', re.compile(r'/parcel/track/(?P<tracking_id>[^/]+)/?$'), 'track'),
+    ('POST', re.compile(r'/parcel/cancel/(?P<tracking_id>[^/]+)/?$'), 'cancel'),
+]
+
+HTTP_REASONS = {
+    200: 'OK', 401: 'Unauthorized', 404: 'Not Found', 405: 'Method Not Allowed', 400: 'Bad Request',
+    422: 'Unprocessable Entity', 429: 'Too Many Requests', 500: 'Internal Server Error',
+    502: 'Bad Gateway', 503: 'Service Unavailable',
+}
+
+
+class MockREDX:
+    """
+    Stand-in for the REDX API, for load and integration testing without the sandbox
+    (run it with `manage.py mock_redx`). A plain WSGI app serving the endpoints
+    REDXService calls under any path prefix, so a base URL such as
+    http://127.0.0.1:8765/v1.0.0-beta works as is:
+
+        GET  .../areas                  a fixed list of areas
+        POST .../parcel                 {"tracking_id": ...}, 422 when fields are missing
+        GET  .../parcel/track/<id>      pending -> picked_up -> in_transit -> delivered
+        POST .../parcel/cancel/<id>     refused once delivered
+        GET  /__stats                   request counters, for benchmarks
+
+    latency / jitter: seconds added to every call (uniformly +- jitter).
+    error_rate: share of calls (0-1) answered with a random 500/502/503.
+    rate_limit / burst: requests per second allowed (429 with Retry-After beyond), 0 for no limit.
+    advance_every: seconds a parcel spends in each tracking status.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit=0, burst=None,
+                 advance_every=60, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = burst or max(1, int(rate_limit))
+        self.advance_every = advance_every
+        self.random = random.Random(seed)
+
+        self.parcels = {}
+        self.stats = {'requests': 0, 'in_flight': 0, 'max_in_flight': 0, 'throttled': 0,
+                      'injected_errors': 0, 'by_endpoint': {}}
+        self._lock = threading.Lock()
+        self._ids = count(1)
+        self._tokens = float(self.burst)
+        self._refilled = time.monotonic()
+
+    def __call__(self, environ, start_response):
+        method = environ['REQUEST_METHOD']
+        path = environ.get('PATH_INFO', '')
+        if path.rstrip('/') == '/__stats':
+            with self._lock:
+                snapshot = json.loads(json.dumps(self.stats))
+            return self._respond(start_response, 200, snapshot)
+
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['in_flight'] += 1
+            self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.stats['in_flight'])
+        try:
+            status, body, headers = self._handle(method, path, environ)
+        finally:
+            with self._lock:
+                self.stats['in_flight'] -= 1
+        return self._respond(start_response, status, body, headers)
+
+    def _handle(self, method, path, environ):
+        route = self._route(method, path)
+        if route is None:
+            return 404, {'message': f'No route for {method} {path}'}, []
+        if route == 'method':
+            return 405, {'message': f'{method} not allowed'}, []
+        endpoint, params = route
+        self._count(endpoint)
+
+        if not self._take_token():
+            with self._lock:
+                self.stats['throttled'] += 1
+            return 429, {'message': 'Too many requests'}, [('Retry-After', '1')]
+
+        delay = self.latency + self.random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            with self._lock:
+                self.stats['injected_errors'] += 1
+            return self.random.choice((500, 502, 503)), {'message': 'Injected failure'}, []
+
+        if not environ.get('HTTP_API_ACCESS_TOKEN'):
+            return 401, {'message': 'API-ACCESS-TOKEN header missing'}, []
+
+        return getattr(self, f'_{endpoint}')(environ, **params)
+
+    def _areas(self, environ):
+        return 200, {'areas': AREAS}, []
+
+    def _create(self, environ):
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+            data = json.loads(environ['wsgi.input'].read(length) or b'{}')
+        except ValueError:
+            return 400, {'message': 'Body is not valid JSON'}, []
+        missing = [field for field in REQUIRED_PARCEL_FIELDS if not data.get(field)]
+        if missing:
+            return 422, {'message': 'Validation failed', 'validation_errors': {f: ['required'] for f in missing}}, []
+
+        tracking_id = f"MOCK{next(self._ids):08d}"
+        with self._lock:
+            self.parcels[tracking_id] = {'created': time.time(), 'cancelled': False, 'data': data}
+        return 200, {'tracking_id': tracking_id}, []
+
+    def _track(self, environ, tracking_id):
+        parcel = self.parcels.get(tracking_id)
+        if parcel is None:
+            return 404, {'message': f'Parcel {tracking_id} not found'}, []
+        return 200, {'tracking_id': tracking_id, 'status': self._status(parcel),
+                     'merchant_invoice_id': parcel['data'].get('merchant_invoice_id')}, []
+
+    def _cancel(self, environ, tracking_id):
+        parcel = self.parcels.get(tracking_id)
+        if parcel is None:
+            return 404, {'message': f'Parcel {tracking_id} not found'}, []
+        if self._status(parcel) == 'delivered':
+            return 400, {'message': 'Delivered parcels cannot be cancelled'}, []
+        parcel['cancelled'] = True
+        return 200, {'success': True, 'message': f'Parcel {tracking_id} cancelled'}, []
+
+    def _status(self, parcel):
+        if parcel['cancelled']:
+            return 'cancelled'
+        if not self.advance_every:
+            return TRACKING_STEPS[0]
+        step = int((time.time() - parcel['created']) / self.advance_every)
+        return TRACKING_STEPS[min(step, len(TRACKING_STEPS) - 1)]
+
+    def _route(self, method, path):
+        wrong_method = False
+        for route_method, pattern, endpoint in ROUTES:
+            match = pattern.search(path)
+            if match:
+                if route_method == method:
+                    return endpoint, match.groupdict()
+                wrong_method = True
+        return 'method' if wrong_method else None
+
+    def _count(self, endpoint):
+        with self._lock:
+            self.stats['by_endpoint'][endpoint] = self.stats['by_endpoint'].get(endpoint, 0) + 1
+
+    def _take_token(self):
+        if not self.rate_limit:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate_limit)
+            self._refilled = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    @staticmethod
+    def _respond(start_response, status, body, headers=()):
+        payload = json.dumps(body).encode()
+        start_response(f"{status} {HTTP_REASONS.get(status, '')}".strip(), [
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(payload))),
+            *headers,
+        ])
+        return [payload]
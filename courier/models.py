@@ -1,9 +1,14 @@
 # courier/models.py
+import json
+import re
+import zlib
+
 from django.db import models
 from orders.models import Order
 from django.conf import settings
+from core.singletons import CachedSingletonModel
 
-class REDXConfiguration(models.Model):
+class REDXConfiguration(CachedSingletonModel):
     """Store REDX API configuration"""
     MODE_CHOICES = (
         ('sandbox', 'Sandbox'),
@@ -33,6 +38,10 @@ class REDXConfiguration(models.Model):
     
     def __str__(self):
         return f"REDX Config - {self.mode}"
+
+    @classmethod
+    def singleton_queryset(cls):
+        return cls.objects.filter(is_active=True)
     
     def get_base_url(self):
         """Get the appropriate base URL based on mode"""
@@ -47,6 +56,58 @@ class REDXConfiguration(models.Model):
         return self.sandbox_token
 
 
+_AREA_KEY_RE = re.compile(r'[\W_]+')
+_NON_DIGIT_RE = re.compile(r'\D+')
+
+
+class REDXArea(models.Model):
+    """Local copy of the REDX delivery-area list (see courier.areas.refresh_areas)"""
+    redx_id = models.PositiveIntegerField(unique=True)
+    name = models.CharField(max_length=150)
+    district_name = models.CharField(max_length=100, blank=True)
+    division_name = models.CharField(max_length=100, blank=True)
+    post_code = models.CharField(max_length=20, blank=True)
+    zone_id = models.PositiveIntegerField(null=True, blank=True)
+
+    # Lower-cased, punctuation-free copies used for lookups
+    name_key = models.CharField(max_length=150, editable=False)
+    district_key = models.CharField(max_length=100, editable=False)
+
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'REDX Area'
+        verbose_name_plural = 'REDX Areas'
+        ordering = ['district_name', 'name']
+        indexes = [
+            models.Index(fields=['district_key', 'name_key'], name='courier_area_district_name_idx'),
+            models.Index(fields=['name_key'], name='courier_area_name_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.district_name})"
+
+    @staticmethod
+    def normalize(value):
+        return ' '.join(_AREA_KEY_RE.sub(' ', (value or '').casefold()).split())
+
+    def save(self, *args, **kwargs):
+        self.name_key = self.normalize(self.name)
+        self.district_key = self.normalize(self.district_name)
+        super().save(*args, **kwargs)
+
+    def as_dict(self):
+        """Same shape as an entry of the REDX /areas response."""
+        return {
+            'id': self.redx_id,
+            'name': self.name,
+            'district_name': self.district_name,
+            'division_name': self.division_name,
+            'post_code': self.post_code,
+            'zone_id': self.zone_id,
+        }
+
+
 class REDXParcel(models.Model):
     """Store REDX parcel/shipment information"""
     STATUS_CHOICES = (
@@ -58,6 +119,8 @@ class REDXParcel(models.Model):
         ('cancelled', 'Cancelled'),
         ('failed', 'Failed'),
     )
+    # Statuses REDX can still move a parcel out of
+    ACTIVE_STATUSES = ('pending', 'created', 'picked', 'in_transit')
     
     order = models.OneToOneField(Order, on_delete=models.CASCADE, related_name='redx_parcel')
     tracking_id = models.CharField(max_length=100, blank=True, null=True)
@@ -65,6 +128,8 @@ class REDXParcel(models.Model):
     # Customer Info
     customer_name = models.CharField(max_length=255)
     customer_phone = models.CharField(max_length=20)
+    # Digits-only copy of customer_phone used for search (+880 17.. -> 017..)
+    phone_key = models.CharField(max_length=20, blank=True, editable=False)
     customer_address = models.TextField()
     customer_area = models.CharField(max_length=100)
     customer_district = models.CharField(max_length=100)
@@ -76,6 +141,10 @@ class REDXParcel(models.Model):
     
     # Status
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    # When REDX reported the current status (event time for webhooks, check time otherwise)
+    status_updated_at = models.DateTimeField(blank=True, null=True)
+    # When the status poller checks the parcel next; empty means as soon as it can
+    next_poll_at = models.DateTimeField(blank=True, null=True, editable=False)
     
     # REDX Response Data
     redx_response = models.JSONField(blank=True, null=True)
@@ -88,6 +157,142 @@ class REDXParcel(models.Model):
         verbose_name = 'REDX Parcel'
         verbose_name_plural = 'REDX Parcels'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='courier_parcel_created_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='courier_parcel_status_idx'),
+            models.Index(fields=['tracking_id'], name='courier_parcel_tracking_idx'),
+            models.Index(fields=['phone_key'], name='courier_parcel_phone_idx'),
+            models.Index(fields=['status', 'next_poll_at'], name='courier_parcel_next_poll_idx'),
+        ]
     
     def __str__(self):
-        return f"Parcel #{self.order.order_number} - {self.tracking_id or 'No Tracking'}"
\ No newline at end of file
+        return f"Parcel #{self.order.order_number} - {self.tracking_id or 'No Tracking'}"
+
+    @staticmethod
+    def normalize_phone(value):
+        digits = _NON_DIGIT_RE.sub('', value or '')
+        if digits.startswith('880'):
+            digits = '0' + digits[3:]
+        return digits[:20]
+
+    def save(self, *args, **kwargs):
+        self.phone_key = self.normalize_phone(self.customer_phone)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'customer_phone' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'phone_key'}
+        super().save(*args, **kwargs)
+
+
+class ParcelEvent(models.Model):
+    """
+    One step in a parcel's journey as REDX reported it. Append-only: a row is
+    written only when REDX reports something new (see courier.events).
+    """
+    SOURCE_CHOICES = (
+        ('track', 'Manual tracking'),
+        ('poller', 'Status poller'),
+        ('webhook', 'Webhook'),
+        ('create', 'Parcel creation'),
+        ('cancel', 'Cancellation'),
+    )
+    # Compressed raw payloads larger than this are not kept
+    PAYLOAD_MAX_BYTES = 16 * 1024
+
+    parcel = models.ForeignKey(REDXParcel, on_delete=models.CASCADE, related_name='events')
+    happened_at = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=REDXParcel.STATUS_CHOICES)
+    raw_status = models.CharField(max_length=50, blank=True, help_text='Status as REDX sent it')
+    message = models.CharField(max_length=255, blank=True, help_text='Location or message from REDX')
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES)
+    # zlib-compressed JSON; only the newest event of a parcel keeps it
+    payload = models.BinaryField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Parcel Event'
+        verbose_name_plural = 'Parcel Events'
+        ordering = ['happened_at', 'id']
+        indexes = [
+            models.Index(fields=['parcel', 'happened_at'], name='courier_event_parcel_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.parcel_id} {self.raw_status or self.status} at {self.happened_at:%Y-%m-%d %H:%M}"
+
+    @classmethod
+    def compress(cls, payload):
+        if payload is None:
+            return None
+        packed = zlib.compress(json.dumps(payload, separators=(',', ':'), default=str).encode())
+        return packed if len(packed) <= cls.PAYLOAD_MAX_BYTES else None
+
+    @property
+    def payload_json(self):
+        return json.loads(zlib.decompress(self.payload)) if self.payload else None
+
+
+class ParcelBatch(models.Model):
+    """Parcels requested for many orders at once (admin action or `manage.py create_parcels`)"""
+    STATE_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    parcel_weight = models.DecimalField(max_digits=6, decimal_places=2, default=0.5, help_text='Weight in KG')
+    total = models.PositiveIntegerField(default=0)
+    created = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    state = models.CharField(max_length=10, choices=STATE_CHOICES, default='queued')
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Parcel Batch'
+        verbose_name_plural = 'Parcel Batches'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Parcels for {self.total} order(s) ({self.get_state_display()})"
+
+    @property
+    def progress_percent(self) -> int:
+        if not self.total:
+            return 100
+        return int(((self.created + self.failed + self.skipped) * 100) / self.total)
+
+
+class ParcelBatchItem(models.Model):
+    """Outcome of one order in a ParcelBatch; failed items can be retried"""
+    STATE_CHOICES = (
+        ('pending', 'Pending'),
+        ('created', 'Created'),
+        ('failed', 'Failed'),
+        ('skipped', 'Skipped'),
+    )
+
+    batch = models.ForeignKey(ParcelBatch, on_delete=models.CASCADE, related_name='items')
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='parcel_batch_items')
+    state = models.CharField(max_length=10, choices=STATE_CHOICES, default='pending')
+    tracking_id = models.CharField(max_length=100, blank=True)
+    error_message = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Parcel Batch Item'
+        verbose_name_plural = 'Parcel Batch Items'
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['batch', 'order'], name='courier_batchitem_batch_order_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['batch', 'state'], name='courier_batchitem_state_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.order.order_number}: {self.get_state_display()}"
@@ -0,0 +1,150 @@
+# courier/poller.py
+import asyncio
+import logging
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import breaker
+from .async_client import AsyncREDXService
+from .events import record_events
+from .models import REDXParcel
+from .services import REDXService, parcel_status_from
+
+logger = logging.getLogger(__name__)
+
+# How often a parcel is checked right after its status changed; the wait grows to
+# a quarter of the time the status has stayed the same, up to POLL_MAX_INTERVAL
+POLL_INTERVALS = {
+    'pending': timedelta(minutes=60),
+    'created': timedelta(minutes=30),
+    'picked': timedelta(minutes=15),
+    'in_transit': timedelta(minutes=15),
+}
+POLL_MAX_INTERVAL = timedelta(hours=6)
+# Parcels older than this are probably stuck or forgotten at REDX
+POLL_STALE_AGE = timedelta(days=30)
+POLL_BATCH_SIZE = 200
+
+
+def poll_parcels(concurrency=None, rate_per_second=None):
+    """
+    Refresh the status of parcels REDX may still move (scheduled job). With the
+    webhook receiving pushes, this only fills the gaps: parcels with a recent push
+    are not due (see postpone_polls).
+
+    Each parcel has its own next-check time (REDXParcel.next_poll_at), so every
+    process sees the same schedule. Up to POLL_BATCH_SIZE due
+    parcels are tracked concurrently with AsyncREDXService (REDX_POLL_CONCURRENCY
+    calls in flight, no faster than REDX_BULK_RATE_PER_SECOND), and the ones whose
+    status changed are saved with a single bulk update (new steps also go to the
+    parcel's event history); the next-check times of the rest are saved with
+    another. Returns the number of parcels updated.
+    """
+    concurrency = concurrency or getattr(settings, 'REDX_POLL_CONCURRENCY', 8)
+    rate_per_second = rate_per_second or getattr(settings, 'REDX_BULK_RATE_PER_SECOND', 5)
+
+    if breaker.breaker_state()['state'] == 'open':
+        logger.info("Parcel status poll skipped: REDX circuit breaker is open")
+        return 0
+    parcels = _due_parcels(timezone.now())
+    if not parcels:
+        return 0
+    try:
+        service = REDXService()
+    except Exception as e:
+        logger.warning(f"Parcel status poll skipped: {e}")
+        return 0
+
+    # What the schedule looked like before the calls; see _unchanged_since()
+    read = {p.pk: (p.status_updated_at, p.next_poll_at) for p in parcels}
+    client = AsyncREDXService(service, concurrency)
+    results = asyncio.run(client.track_many([p.tracking_id for p in parcels], rate_per_second=rate_per_second))
+
+    now = timezone.now()
+    changed, unchanged, failed, history = [], [], 0, []
+    for parcel, result in zip(parcels, results):
+        if not result['success']:
+            failed += 1
+            parcel.next_poll_at = now + POLL_INTERVALS[parcel.status]
+            unchanged.append(parcel)
+            continue
+        history.append((parcel, result.get('data')))
+        status = parcel_status_from(result.get('data'), parcel.status)
+        if status != parcel.status:
+            parcel.status = status
+            parcel.status_updated_at = now
+            parcel.updated_at = now  # bulk_update skips auto_now
+            changed.append(parcel)
+        else:
+            unchanged.append(parcel)
+        # Delivered, cancelled, ... parcels are no longer polled at all
+        parcel.next_poll_at = now + next_poll_delay(parcel, now) if status in REDXParcel.ACTIVE_STATUSES else None
+
+    record_events(history, 'poller')
+    with transaction.atomic():
+        untouched = _unchanged_since(read)
+        superseded = len(parcels) - len(untouched)
+        changed = [p for p in changed if p.pk in untouched]
+        unchanged = [p for p in unchanged if p.pk in untouched]
+        if changed:
+            REDXParcel.objects.bulk_update(changed, ['status', 'status_updated_at', 'updated_at', 'next_poll_at'])
+        if unchanged:
+            REDXParcel.objects.bulk_update(unchanged, ['next_poll_at'])
+
+    logger.info(
+        f"Parcel status poll: {len(parcels)} checked, {len(changed)} changed, {failed} failed, "
+        f"{superseded} updated meanwhile"
+    )
+    return len(changed)
+
+
+def _unchanged_since(read):
+    """
+    Ids of the parcels in `read` whose status time and next check are still what
+    the poll started from. The tracking calls take a while; a webhook applied
+    meanwhile has newer news (or postponed the check) and must not be overwritten.
+    Locks the rows until the end of the transaction.
+    """
+    rows = (
+        REDXParcel.objects.select_for_update()
+        .filter(pk__in=list(read))
+        .values_list('pk', 'status_updated_at', 'next_poll_at')
+    )
+    return {pk for pk, status_updated_at, next_poll_at in rows if read[pk] == (status_updated_at, next_poll_at)}
+
+
+def postpone_polls(parcel_ids, delay=POLL_MAX_INTERVAL):
+    """Push back the next check of parcels REDX just sent an update for."""
+    if parcel_ids:
+        REDXParcel.objects.filter(pk__in=list(parcel_ids)).update(next_poll_at=timezone.now() + delay)
+
+
+def next_poll_delay(parcel, now):
+    """
+    Wait before checking `parcel` again: short while it is moving, longer the
+    longer its status stays the same, longest for very old parcels. A little
+    jitter keeps parcels created together from being checked together forever.
+    """
+    if now - parcel.created_at > POLL_STALE_AGE:
+        delay = POLL_MAX_INTERVAL
+    else:
+        base = POLL_INTERVALS.get(parcel.status, POLL_MAX_INTERVAL)
+        unchanged_for = now - (parcel.status_updated_at or parcel.created_at)
+        delay = min(max(base, unchanged_for / 4), POLL_MAX_INTERVAL)
+    return delay * random.uniform(0.9, 1.1)
+
+
+def _due_parcels(now):
+    """Active parcels whose next check is due, longest overdue (or never checked) first."""
+    return list(
+        REDXParcel.objects.filter(status__in=REDXParcel.ACTIVE_STATUSES, tracking_id__isnull=False)
+        .filter(Q(next_poll_at__isnull=True) | Q(next_poll_at__lte=now))
+        .exclude(tracking_id='')
+        .only('id', 'tracking_id', 'status', 'status_updated_at', 'created_at', 'next_poll_at')
+        .order_by(F('next_poll_at').asc(nulls_first=True), 'id')[:POLL_BATCH_SIZE]
+    )
@@ -1,17 +1,37 @@
 # courier/services.py
 import requests
 import logging
-from .models import REDXConfiguration, REDXParcel
+from . import transport
+from .breaker import CircuitOpenError
+from .areas import find_area, refresh_areas
+from .models import REDXArea, REDXConfiguration, REDXParcel
 
 logger = logging.getLogger(__name__)
 
+# REDX tracking status -> REDXParcel.status
+TRACKING_STATUS_MAP = {
+    'pending': 'pending',
+    'picked_up': 'picked',
+    'in_transit': 'in_transit',
+    'delivered': 'delivered',
+    'cancelled': 'cancelled',
+}
+
+
+def parcel_status_from(tracking_data, current):
+    """The REDXParcel status a tracking response reports, or `current` if it names none we know."""
+    status = tracking_data.get('status') if isinstance(tracking_data, dict) else None
+    if not isinstance(status, str):
+        return current
+    return TRACKING_STATUS_MAP.get(status.lower(), current)
+
 
 class REDXService:
     """Service class to interact with REDX API"""
     
     def __init__(self):
         try:
-            self.config = REDXConfiguration.objects.filter(is_active=True).first()
+            self.config = REDXConfiguration.current()
             if not self.config:
                 raise Exception("REDX Configuration not found. Please configure REDX in admin panel.")
             self.base_url = self.config.get_base_url().rstrip('/')
@@ -40,11 +60,7 @@ class REDXService:
         try:
             logger.info("Fetching REDX areas")
             
-            response = requests.get(
-                url,
-                headers=self.get_headers(),
-                timeout=30
-            )
+            response = transport.send('GET', 'areas', url, headers=self.get_headers())
             
             response.raise_for_status()
             data = response.json()
@@ -62,30 +78,15 @@ class REDXService:
             }
     
     def find_area_by_name(self, area_name, district_name='Dhaka'):
-        """Find area ID by name or district"""
-        result = self.get_areas()
-        if not result['success']:
-            return None
-        
-        areas = result['data']
-        
-        # Try exact match first
-        for area in areas:
-            if area['name'].lower() == area_name.lower() and area['district_name'] == district_name:
-                return area
-        
-        # Try partial match
-        for area in areas:
-            if area_name.lower() in area['name'].lower() and area['district_name'] == district_name:
-                return area
-        
-        # Fallback to first area in district
-        for area in areas:
-            if area['district_name'] == district_name:
-                return area
-        
-        # Ultimate fallback
-        return areas[0] if areas else None
+        """
+        Find area by name or district in the local area table (see courier.areas).
+        The table is filled from REDX on first use if it is still empty.
+        """
+        if not REDXArea.objects.exists():
+            refresh_areas(self)
+
+        area = find_area(area_name, district_name)
+        return area.as_dict() if area else None
     
     def create_parcel(self, parcel_data):
         """
@@ -104,12 +105,7 @@ class REDXService:
             logger.debug(f"Request URL: {url}")
             logger.debug(f"Request payload: {parcel_data}")
             
-            response = requests.post(
-                url,
-                json=parcel_data,
-                headers=self.get_headers(),
-                timeout=30
-            )
+            response = transport.send('POST', 'parcel.create', url, json=parcel_data, headers=self.get_headers())
             
             logger.debug(f"Response Status: {response.status_code}")
             logger.debug(f"Response Body: {response.text}")
@@ -148,6 +144,14 @@ class REDXService:
                 'status_code': e.response.status_code if e.response else None
             }
             
+        except CircuitOpenError as e:
+            # Nothing was sent to REDX
+            return {
+                'success': False,
+                'error': str(e),
+                'circuit_open': True
+            }
+            
         except requests.exceptions.RequestException as e:
             logger.error(f"REDX API Request Error: {str(e)}")
             return {
@@ -196,11 +200,7 @@ class REDXService:
         try:
             logger.info(f"Tracking parcel: {tracking_id}")
             
-            response = requests.get(
-                url,
-                headers=self.get_headers(),
-                timeout=30
-            )
+            response = transport.send('GET', 'parcel.track', url, headers=self.get_headers())
             
             logger.debug(f"Track Response Status: {response.status_code}")
             logger.debug(f"Track Response Body: {response.text}")
@@ -237,11 +237,7 @@ class REDXService:
         try:
             logger.info(f"Cancelling parcel: {tracking_id}")
             
-            response = requests.post(
-                url,
-                headers=self.get_headers(),
-                timeout=30
-            )
+            response = transport.send('POST', 'parcel.cancel', url, headers=self.get_headers())
             
             logger.debug(f"Cancel Response Status: {response.status_code}")
             logger.debug(f"Cancel Response Body: {response.text}")
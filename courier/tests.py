@@ -1,3 +1,664 @@
-from django.test import TestCase
+# courier/tests.py
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from functools import partial
+from io import BytesIO, StringIO
+from unittest import mock, skipIf
+from wsgiref.simple_server import WSGIRequestHandler, make_server
 
-# Create your tests here.
+import requests
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.testing import QueryPlanTestMixin, create_customer, create_order
+from courier import breaker, transport
+from courier.areas import find_area
+from courier.async_client import AsyncREDXService
+from courier.bulk import (
+    RateLimiter, create_parcel_batch, resume_stalled_batches, retry_failed_items, run_parcel_batch,
+)
+from courier.events import record_events
+from courier.mock_redx import MockREDX
+from courier.models import ParcelBatch, REDXArea, REDXConfiguration, REDXParcel
+from courier.poller import _due_parcels, next_poll_delay, poll_parcels
+from courier.webhooks import SIGNATURE_HEADER, apply_status_events, sign_payload
+from orders.models import Order
+
+
+class AreaLookupTests(QueryPlanTestMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for redx_id, name, district in [
+            (1, 'Mirpur DOHS', 'Dhaka'),
+            (2, 'Dhanmondi', 'Dhaka'),
+            (3, 'Shah Ali Mirpur', 'Dhaka'),
+            (4, 'Tongi', 'Gazipur'),
+        ]:
+            REDXArea.objects.create(redx_id=redx_id, name=name, district_name=district)
+
+    def test_fallback_order(self):
+        self.assertEqual(find_area('mirpur-dohs', 'DHAKA').redx_id, 1)  # exact
+        self.assertEqual(find_area('Dhan', 'Dhaka').redx_id, 2)  # prefix
+        self.assertEqual(find_area('Ali', 'Dhaka').redx_id, 3)  # partial
+        self.assertEqual(find_area('Board Bazar', 'Gazipur').redx_id, 4)  # district
+        self.assertEqual(find_area('Zindabazar', 'Sylhet').redx_id, 1)  # anything
+
+    def test_lookup_uses_indexes(self):
+        self.assertNoFullScans(find_area, 'Dhan', 'Dhaka')
+
+
+@override_settings(REDX_WEBHOOK_SECRET='test-secret')
+class WebhookTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = create_customer()
+        order = Order.objects.create(user=user, first_name='Test', last_name='Customer',
+                                     phone='01700000000', email='customer@example.com',
+                                     address_line_1='Road 1', state='Dhaka', order_total=500,
+                                     is_ordered=True)
+        cls.parcel = REDXParcel.objects.create(order=order, tracking_id='TRK1', customer_name='Test Customer',
+                                               customer_phone='01700000000', customer_address='Road 1',
+                                               customer_area='Mirpur', customer_district='Dhaka',
+                                               parcel_weight=0.5, cash_collection_amount=500, status='created')
+
+    def post(self, payload, secret='test-secret'):
+        body = json.dumps(payload)
+        return self.client.post(reverse('courier:redx_webhook'), body, content_type='application/json',
+                                headers={SIGNATURE_HEADER: sign_payload(body, secret)})
+
+    def test_rejects_bad_signature(self):
+        response = self.post({'tracking_number': 'TRK1', 'status': 'delivered'}, secret='wrong')
+        self.assertEqual(response.status_code, 403)
+        self.parcel.refresh_from_db()
+        self.assertEqual(self.parcel.status, 'created')
+
+    def test_applies_latest_event_once(self):
+        response = self.post([
+            {'tracking_number': 'TRK1', 'status': 'in_transit', 'timestamp': '2026-10-18T10:00:00+06:00'},
+            {'tracking_number': 'TRK1', 'status': 'picked_up', 'timestamp': '2026-10-18T09:00:00+06:00'},
+            {'tracking_number': 'UNKNOWN', 'status': 'delivered'},
+        ])
+        self.assertEqual(response.json(), {'received': 3, 'applied': 1, 'ignored': 2})
+        self.parcel.refresh_from_db()
+        self.assertEqual(self.parcel.status, 'in_transit')
+
+        # A retried or late delivery changes nothing
+        response = self.post({'tracking_number': 'TRK1', 'status': 'picked_up', 'timestamp': '2026-10-18T09:30:00+06:00'})
+        self.assertEqual(response.json()['applied'], 0)
+        self.parcel.refresh_from_db()
+        self.assertEqual(self.parcel.status, 'in_transit')
+        self.assertEqual(list(self.parcel.events.values_list('status', flat=True)), ['picked', 'in_transit'])
+
+    def test_pushed_parcels_are_not_polled(self):
+        self.assertEqual(_due_parcels(timezone.now()), [self.parcel])
+        self.post({'tracking_number': 'TRK1', 'status': 'picked_up'})
+        self.parcel.refresh_from_db()
+        # Kept in the database, so the scheduler process sees it too
+        self.assertGreater(self.parcel.next_poll_at, timezone.now() + timedelta(hours=5))
+        self.assertEqual(_due_parcels(timezone.now()), [])
+
+    def test_history_only_records_changes(self):
+        for _ in range(3):
+            record_events([(self.parcel, {'status': 'picked_up', 'message_en': 'Picked up from Mirpur hub'})], 'poller')
+        record_events([(self.parcel, {'status': 'in_transit', 'message_en': 'On the way'})], 'poller')
+        events = list(self.parcel.events.all())
+        self.assertEqual([e.raw_status for e in events], ['picked_up', 'in_transit'])
+        # Only the newest event keeps its raw payload
+        self.assertIsNone(events[0].payload)
+        self.assertEqual(events[1].payload_json['message_en'], 'On the way')
+
+
+@override_settings(REDX_BREAKER_FAILURES=3, REDX_BREAKER_COOLDOWN=30, REDX_BREAKER_SLOW_CALL=5)
+class CircuitBreakerTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_opens_after_consecutive_failures(self):
+        breaker.record_failure('ReadTimeout')
+        breaker.record_failure('HTTP 503')
+        breaker.record_success(0.2)  # resets the count
+        breaker.record_failure('ReadTimeout')
+        breaker.record_failure('ReadTimeout')
+        self.assertFalse(breaker.before_call())
+        breaker.record_success(6)  # too slow
+        self.assertEqual(breaker.breaker_state()['state'], 'open')
+        with self.assertRaisesMessage(breaker.CircuitOpenError, 'slow response'):
+            breaker.before_call()
+
+    def test_half_open_lets_one_probe_through(self):
+        with override_settings(REDX_BREAKER_COOLDOWN=0):
+            for _ in range(3):
+                breaker.record_failure('ConnectionError')
+        self.assertTrue(breaker.before_call())
+        with self.assertRaises(breaker.CircuitOpenError):
+            breaker.before_call()  # a second caller while the probe is out
+        breaker.record_success(0.1, probe=True)
+        self.assertEqual(breaker.breaker_state()['state'], 'closed')
+        self.assertFalse(breaker.before_call())
+
+    @skipIf(isinstance(caches['default'], LocMemCache), "needs a shared cache backend (REDIS_URL)")
+    def test_state_is_shared_across_cache_clients(self):
+        # Another web worker, or the scheduler process, has a cache client of its own
+        other_worker = caches.create_connection('default')
+        for _ in range(3):
+            breaker.record_failure('ReadTimeout')
+        with mock.patch('courier.breaker.cache', other_worker):
+            self.assertEqual(breaker.breaker_state()['state'], 'open')
+            breaker.reset()
+        self.assertEqual(breaker.breaker_state()['state'], 'closed')
+
+
+class ParcelListTests(QueryPlanTestMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = create_customer('staff', is_staff=True)
+        for number, (tracking_id, phone, status) in enumerate([
+            ('RX100', '+880 1712-345678', 'delivered'),
+            ('RX200', '01812345678', 'in_transit'),
+        ]):
+            order = Order.objects.create(user=cls.staff, first_name='Test', last_name='Customer',
+                                         phone=phone, email='customer@example.com',
+                                         address_line_1='Road 1', state='Dhaka', order_total=500,
+                                         is_ordered=True)
+            REDXParcel.objects.create(order=order, tracking_id=tracking_id, customer_name='Test Customer',
+                                      customer_phone=phone, customer_address='Road 1', customer_area='Mirpur',
+                                      customer_district='Dhaka', parcel_weight=0.5, cash_collection_amount=500,
+                                      status=status)
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def test_phone_search_ignores_formatting(self):
+        response = self.assertNoFullScans(self.client.get, reverse('courier:parcel_list'), {'q': '01712 345'})
+        self.assertEqual([p.tracking_id for p in response.context['parcels']], ['RX100'])
+        self.assertEqual(response.context['total_count'], 1)
+
+    def test_tracking_id_search_ignores_case(self):
+        response = self.assertNoFullScans(self.client.get, reverse('courier:parcel_list'), {'q': 'rx1'})
+        self.assertEqual([p.tracking_id for p in response.context['parcels']], ['RX100'])
+
+    def test_cancel_keeps_response_in_history(self):
+        parcel = REDXParcel.objects.get(tracking_id='RX200')
+        service = mock.Mock()
+        service.cancel_parcel.return_value = {'success': True, 'data': {'message': 'Parcel cancelled', 'id': 7}}
+        with mock.patch('courier.views.REDXService', return_value=service):
+            self.client.get(reverse('courier:cancel_parcel', args=[parcel.pk]), {'confirm': 'yes'})
+        parcel.refresh_from_db()
+        self.assertEqual((parcel.status, parcel.redx_response), ('cancelled', None))
+        event = parcel.events.get()
+        self.assertEqual((event.source, event.status), ('cancel', 'cancelled'))
+        self.assertEqual(event.payload_json['response'], {'message': 'Parcel cancelled', 'id': 7})
+
+    def test_status_counts_and_pages(self):
+        response = self.client.get(reverse('courier:parcel_list'), {'status': 'in_transit'})
+        counts = {value: count for value, _, count in response.context['status_counts']}
+        self.assertEqual((counts['delivered'], counts['in_transit']), (1, 1))
+        self.assertEqual([p.tracking_id for p in response.context['parcels']], ['RX200'])
+        self.assertIsNone(response.context['next_cursor'])
+
+
+class StubREDX:
+    """Stands in for REDXService in the bulk tests; notes how many parcel calls overlap."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+        self.in_flight = self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def find_area_by_name(self, area, district):
+        return {'id': 1, 'name': 'Mirpur'}
+
+    def create_parcel(self, data):
+        with self._lock:
+            self.calls.append(data['merchant_invoice_id'])
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.05)
+        with self._lock:
+            self.in_flight -= 1
+        if data['merchant_invoice_id'] in self.failing:
+            return {'success': False, 'error': 'Invalid phone number'}
+        return {'success': True, 'tracking_id': f"RX-{data['merchant_invoice_id']}", 'data': {}}
+
+
+class BulkParcelTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = create_customer()
+        cls.orders = [create_order(user, area='Mirpur', order_total=500) for _ in range(5)]
+        REDXParcel.objects.create(order=cls.orders[0], tracking_id='RX-OLD', customer_name='Test Customer',
+                                  customer_phone='01700000000', customer_address='Road 1', customer_area='Mirpur',
+                                  customer_district='Dhaka', parcel_weight=0.5, cash_collection_amount=500,
+                                  status='created')
+        cls.order_ids = [order.pk for order in cls.orders]
+
+    def run_batch(self, batch, service, concurrency=2):
+        with self.worker_threads(service):
+            return run_parcel_batch(batch.pk, concurrency=concurrency, rate_per_second=1000)
+
+    @contextmanager
+    def worker_threads(self, service):
+        # The pool threads share the test's connection (as LiveServerTestCase does) so
+        # they see the rows this test's transaction created
+        conn = connections['default']
+        conn.inc_thread_sharing()
+        share = partial(ThreadPoolExecutor, initializer=lambda: connections.__setitem__('default', conn))
+        try:
+            with mock.patch('courier.bulk.REDXService', return_value=service), \
+                    mock.patch('courier.bulk.ThreadPoolExecutor', share):
+                yield
+        finally:
+            conn.dec_thread_sharing()
+
+    def test_rate_limiter_spaces_calls(self):
+        limiter = RateLimiter(20)
+        with mock.patch('courier.bulk.time.monotonic', return_value=limiter._next), \
+                mock.patch('courier.bulk.time.sleep') as sleep:
+            for _ in range(4):
+                limiter.wait()
+        self.assertEqual([round(call.args[0], 3) for call in sleep.call_args_list], [0.05, 0.1, 0.15])
+
+    def test_batch_counts_and_concurrency(self):
+        service = StubREDX(failing={self.orders[2].order_number})
+        batch = self.run_batch(create_parcel_batch(self.order_ids, background=False), service)
+
+        self.assertEqual((batch.state, batch.total, batch.created, batch.failed, batch.skipped), ('done', 5, 3, 1, 1))
+        self.assertEqual(service.max_in_flight, 2)
+        # The order that already had a parcel never reaches REDX
+        self.assertNotIn(self.orders[0].order_number, service.calls)
+        states = dict(batch.items.values_list('order_id', 'state'))
+        self.assertEqual(states[self.orders[0].pk], 'skipped')
+        self.assertEqual(states[self.orders[2].pk], 'failed')
+        self.assertEqual(REDXParcel.objects.exclude(tracking_id='RX-OLD').filter(status='created').count(), 3)
+        # The create response goes to the parcel's history, not redx_response
+        created = REDXParcel.objects.get(order=self.orders[1])
+        self.assertIsNone(created.redx_response)
+        event = created.events.get()
+        self.assertEqual((event.source, event.status), ('create', 'created'))
+        self.assertEqual(event.payload_json['response'], {})
+
+    def test_resume_retries_only_failed_items(self):
+        failing = self.orders[2].order_number
+        batch = self.run_batch(create_parcel_batch(self.order_ids, background=False), StubREDX(failing={failing}))
+
+        self.assertEqual(retry_failed_items(batch, background=False), 1)
+        service = StubREDX()
+        batch = self.run_batch(batch, service)
+        self.assertEqual(service.calls, [failing])
+        self.assertEqual((batch.state, batch.created, batch.failed, batch.skipped), ('done', 4, 0, 1))
+        self.assertEqual(batch.items.get(order=self.orders[2]).attempts, 2)
+
+    def test_retry_restarts_batch_stuck_after_restart(self):
+        batch = create_parcel_batch(self.order_ids, background=False)
+        # The worker died with the process: still `running`, nothing failed, items pending
+        ParcelBatch.objects.filter(pk=batch.pk).update(state='running')
+
+        with mock.patch('courier.bulk.start_parcel_worker') as start_worker, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(retry_failed_items(batch), 4)
+        start_worker.assert_called_once_with(batch.pk)
+        batch.refresh_from_db()
+        self.assertEqual(batch.state, 'queued')
+
+        batch = self.run_batch(batch, StubREDX())
+        self.assertEqual((batch.state, batch.created, batch.failed, batch.skipped), ('done', 4, 0, 1))
+        self.assertEqual(retry_failed_items(batch, background=False), 0)
+
+    def test_scheduler_resumes_stalled_batches(self):
+        stalled = create_parcel_batch(self.order_ids[:3], background=False)
+        recent = create_parcel_batch(self.order_ids[3:], background=False)
+        long_ago = timezone.now() - timedelta(hours=1)
+        # The worker of `stalled` died with its process: still running, items pending for an hour
+        ParcelBatch.objects.filter(pk=stalled.pk).update(state='running', created_at=long_ago)
+        stalled.items.update(updated_at=long_ago)
+
+        service = StubREDX()
+        with self.worker_threads(service):
+            self.assertEqual(resume_stalled_batches(), 1)
+            self.assertEqual(resume_stalled_batches(), 0)
+        stalled.refresh_from_db()
+        self.assertEqual((stalled.state, stalled.created, stalled.skipped), ('done', 2, 1))
+        self.assertEqual(recent.items.filter(state='pending').count(), 2)  # still being handled
+
+        # Retrying by hand marks the batch as handled, so the scheduler leaves it alone
+        ParcelBatch.objects.filter(pk=recent.pk).update(state='running', created_at=long_ago)
+        recent.items.update(updated_at=long_ago)
+        with mock.patch('courier.bulk.start_parcel_worker'):
+            retry_failed_items(recent)
+        self.assertEqual(resume_stalled_batches(), 0)
+
+
+class StubTracker:
+    """Synchronous REDXService stand-in for the async client; 'BAD' IDs raise."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.in_flight = self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _call(self, value):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        if value == 'BAD':
+            raise ConnectionError('connection reset')
+        return {'success': True, 'data': {'value': value}}
+
+    def track_parcel(self, tracking_id):
+        return self._call(tracking_id)
+
+    def create_parcel(self, parcel_data):
+        return self._call(parcel_data['merchant_invoice_id'])
+
+
+class AsyncClientTests(SimpleTestCase):
+
+    def test_gather_caps_concurrency_and_keeps_order(self):
+        service = StubTracker()
+        client = AsyncREDXService(service, concurrency=2)
+        tracking_ids = ['TRK1', 'TRK2', 'BAD', 'TRK3', 'TRK4']
+        results = asyncio.run(client.gather([client.track_parcel(t) for t in tracking_ids]))
+        self.assertEqual(service.max_in_flight, 2)
+        self.assertEqual([r['data']['value'] for r in results if isinstance(r, dict)], ['TRK1', 'TRK2', 'TRK3', 'TRK4'])
+        self.assertIsInstance(results[2], ConnectionError)
+
+    def test_gather_spaces_out_starts(self):
+        client = AsyncREDXService(StubTracker(delay=0), concurrency=4)
+
+        async def started():
+            return asyncio.get_running_loop().time()
+
+        starts = asyncio.run(client.gather([started() for _ in range(4)], rate_per_second=20))
+        # Start times follow a fixed schedule (one late start doesn't push back the rest)
+        offsets = [start - starts[0] for start in starts]
+        self.assertTrue(all(offset >= 0.05 * n - 0.005 for n, offset in enumerate(offsets)), offsets)
+
+    def test_track_many_keeps_repeated_ids(self):
+        client = AsyncREDXService(StubTracker(), concurrency=3)
+        results = asyncio.run(client.track_many(['TRK1', 'TRK1', 'BAD', 'TRK2']))
+        self.assertEqual(len(results), 4)
+        self.assertEqual([r['data']['value'] for r in results if r['success']], ['TRK1', 'TRK1', 'TRK2'])
+        self.assertEqual(results[2], {'success': False, 'error': 'connection reset'})
+
+    def test_create_many_in_payload_order(self):
+        client = AsyncREDXService(StubTracker(), concurrency=3)
+        payloads = [{'merchant_invoice_id': number} for number in ('1001', 'BAD', '1002')]
+        results = asyncio.run(client.create_many(payloads))
+        self.assertEqual([r['success'] for r in results], [True, False, True])
+        self.assertEqual(results[2]['data']['value'], '1002')
+
+
+class StatusPollerTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = create_customer()
+        now = timezone.now()
+        cls.parcels = {}
+        for tracking_id, status, next_poll_at in [
+            ('NEW', 'created', None),
+            ('DUE', 'picked', now - timedelta(minutes=5)),
+            ('LATER', 'in_transit', now + timedelta(hours=1)),
+            ('DONE', 'delivered', None),
+            ('', 'pending', None),
+        ]:
+            parcel = REDXParcel.objects.create(order=create_order(user), tracking_id=tracking_id,
+                                               customer_name='Test Customer', customer_phone='01700000000',
+                                               customer_address='Road 1', customer_area='Mirpur',
+                                               customer_district='Dhaka', parcel_weight=0.5,
+                                               cash_collection_amount=500, status=status,
+                                               status_updated_at=now - timedelta(hours=2))
+            REDXParcel.objects.filter(pk=parcel.pk).update(next_poll_at=next_poll_at)
+            cls.parcels[tracking_id] = parcel
+
+    def setUp(self):
+        cache.clear()
+
+    def poll(self, statuses):
+        service = mock.Mock()
+        service.track_parcel.side_effect = lambda tracking_id: {'success': True, 'data': {'status': statuses[tracking_id]}}
+        with mock.patch('courier.poller.REDXService', return_value=service), \
+                CaptureQueriesContext(connection) as queries:
+            updated = poll_parcels(rate_per_second=1000)
+        self.assertCountEqual([call.args[0] for call in service.track_parcel.call_args_list], statuses)
+        return updated, [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "courier_redxparcel"')]
+
+    def test_due_selection(self):
+        due = _due_parcels(timezone.now())
+        self.assertEqual([p.tracking_id for p in due], ['NEW', 'DUE'])  # never checked first
+
+    def test_only_changed_parcels_get_new_status(self):
+        updated, updates = self.poll({'NEW': 'picked_up', 'DUE': 'picked_up'})
+        self.assertEqual(updated, 1)
+        status_updates = [sql for sql in updates if '"status" =' in sql]
+        self.assertEqual(len(status_updates), 1)
+        self.assertIn(f'"id" = {self.parcels["NEW"].pk}', status_updates[0])
+        self.assertNotIn(f'"id" = {self.parcels["DUE"].pk}', status_updates[0])
+
+        new, due = REDXParcel.objects.get(tracking_id='NEW'), REDXParcel.objects.get(tracking_id='DUE')
+        self.assertEqual((new.status, due.status), ('picked', 'picked'))
+        self.assertEqual(due.status_updated_at, self.parcels['DUE'].status_updated_at)
+        self.assertGreater(due.next_poll_at, timezone.now())
+        self.assertEqual(_due_parcels(timezone.now()), [])
+
+    def test_terminal_parcels_drop_out(self):
+        self.poll({'NEW': 'delivered', 'DUE': 'in_transit'})
+        new = REDXParcel.objects.get(tracking_id='NEW')
+        self.assertEqual((new.status, new.next_poll_at), ('delivered', None))
+        later = [p.tracking_id for p in _due_parcels(timezone.now() + timedelta(days=1))]
+        self.assertEqual(later, ['DUE', 'LATER'])
+
+    def test_webhook_during_poll_wins(self):
+        pushed_at = timezone.now()
+
+        def track_while_webhook_arrives(coroutine):
+            coroutine.close()
+            apply_status_events([{'tracking_number': 'DUE', 'status': 'delivered', 'timestamp': pushed_at.isoformat()}])
+            return [{'success': True, 'data': {'status': 'picked_up'}},  # NEW
+                    {'success': True, 'data': {'status': 'in_transit'}}]  # DUE, checked before the push
+
+        with mock.patch('courier.poller.REDXService'), \
+                mock.patch('courier.poller.asyncio.run', side_effect=track_while_webhook_arrives):
+            self.assertEqual(poll_parcels(), 1)
+
+        due = REDXParcel.objects.get(tracking_id='DUE')
+        self.assertEqual((due.status, due.status_updated_at), ('delivered', pushed_at))
+        self.assertGreater(due.next_poll_at, pushed_at + timedelta(hours=5))  # as the webhook postponed it
+        self.assertEqual(REDXParcel.objects.get(tracking_id='NEW').status, 'picked')
+
+    def test_backoff_follows_time_in_status(self):
+        now = timezone.now()
+        parcel = self.parcels['LATER']
+        parcel.updated_at = now  # touched for other reasons, status unchanged for 8 hours
+        parcel.status_updated_at = now - timedelta(hours=8)
+        with mock.patch('courier.poller.random.uniform', return_value=1):
+            self.assertEqual(next_poll_delay(parcel, now), timedelta(hours=2))
+            parcel.status_updated_at = now - timedelta(minutes=10)
+            self.assertEqual(next_poll_delay(parcel, now), timedelta(minutes=15))
+
+
+class MockREDXTests(SimpleTestCase):
+
+    def call(self, app, method, path, body=None, token='mock'):
+        payload = json.dumps(body).encode() if body is not None else b''
+        environ = {'REQUEST_METHOD': method, 'PATH_INFO': path, 'CONTENT_LENGTH': str(len(payload)),
+                   'wsgi.input': BytesIO(payload)}
+        if token:
+            environ['HTTP_API_ACCESS_TOKEN'] = token
+        response = {}
+
+        def start_response(status, headers):
+            response.update(status=int(status.split()[0]), headers=dict(headers))
+
+        body = json.loads(b''.join(app(environ, start_response)))
+        return response['status'], body, response['headers']
+
+    def test_routes(self):
+        app = MockREDX()
+        prefix = '/v1.0.0-beta'
+        self.assertEqual(self.call(app, 'GET', f'{prefix}/areas')[0], 200)
+        self.assertEqual(self.call(app, 'GET', f'{prefix}/areas', token='')[0], 401)
+        self.assertEqual(self.call(app, 'GET', f'{prefix}/parcel')[0], 405)
+        self.assertEqual(self.call(app, 'GET', f'{prefix}/nowhere')[0], 404)
+        self.assertEqual(self.call(app, 'POST', f'{prefix}/parcel', {'customer_name': 'Test'})[0], 422)
+
+        status, body, _ = self.call(app, 'POST', f'{prefix}/parcel', {
+            'customer_name': 'Test Customer', 'customer_phone': '01700000000', 'customer_address': 'Road 1',
+            'delivery_area_id': 1, 'merchant_invoice_id': '202610190001',
+        })
+        self.assertEqual(status, 200)
+        status, tracked, _ = self.call(app, 'GET', f"{prefix}/parcel/track/{body['tracking_id']}")
+        self.assertEqual((status, tracked['merchant_invoice_id']), (200, '202610190001'))
+        self.assertEqual(self.call(app, 'POST', f"{prefix}/parcel/cancel/{body['tracking_id']}")[0], 200)
+        self.assertEqual(self.call(app, 'GET', f"{prefix}/parcel/track/{body['tracking_id']}")[1]['status'], 'cancelled')
+        self.assertEqual(self.call(app, 'GET', f'{prefix}/parcel/track/MISSING')[0], 404)
+        self.assertEqual(app.stats['by_endpoint'], {'areas': 2, 'create': 2, 'track': 3, 'cancel': 1})
+
+    def test_rate_limit_token_bucket(self):
+        clock = [100.0]
+        with mock.patch('courier.mock_redx.time.monotonic', side_effect=lambda: clock[0]):
+            app = MockREDX(rate_limit=2, burst=3)
+            statuses = [self.call(app, 'GET', '/areas')[0] for _ in range(4)]
+            self.assertEqual(statuses, [200, 200, 200, 429])
+            self.assertEqual(self.call(app, 'GET', '/areas')[2]['Retry-After'], '1')
+            clock[0] += 0.5  # one token back
+            self.assertEqual([self.call(app, 'GET', '/areas')[0] for _ in range(2)], [200, 429])
+        self.assertEqual(app.stats['throttled'], 3)
+
+    def test_tracking_status_progression(self):
+        clock = [1000.0]
+        with mock.patch('courier.mock_redx.time.time', side_effect=lambda: clock[0]):
+            app = MockREDX(advance_every=60)
+            tracking_id = self.call(app, 'POST', '/parcel', {
+                'customer_name': 'Test Customer', 'customer_phone': '01700000000', 'customer_address': 'Road 1',
+                'delivery_area_id': 1, 'merchant_invoice_id': '202610190001',
+            })[1]['tracking_id']
+            statuses = []
+            for _ in range(5):
+                statuses.append(self.call(app, 'GET', f'/parcel/track/{tracking_id}')[1]['status'])
+                clock[0] += 60
+            self.assertEqual(statuses, ['pending', 'picked_up', 'in_transit', 'delivered', 'delivered'])
+            self.assertEqual(self.call(app, 'POST', f'/parcel/cancel/{tracking_id}')[0], 400)
+
+
+class MockREDXCommandTests(TestCase):
+
+    def run_server(self, *args):
+        out = StringIO()
+        server = mock.Mock()
+        server.serve_forever.side_effect = KeyboardInterrupt
+        with mock.patch('courier.management.commands.mock_redx.make_server', return_value=server):
+            call_command('mock_redx', '--configure', *args, stdout=out)
+        return out.getvalue()
+
+    def test_configure_is_undone_when_the_server_stops(self):
+        config = REDXConfiguration.objects.create(mode='production', sandbox_token='sandbox-token',
+                                                  production_token='live-token')
+        out = self.run_server()
+        self.assertIn('was: mode production, sandbox base URL https://sandbox.redx.com.bd/v1.0.0-beta', out)
+        config.refresh_from_db()
+        self.assertEqual((config.mode, config.sandbox_base_url, config.sandbox_token),
+                         ('production', 'https://sandbox.redx.com.bd/v1.0.0-beta', 'sandbox-token'))
+
+        self.run_server('--keep-configuration')
+        config.refresh_from_db()
+        self.assertEqual((config.mode, config.sandbox_base_url), ('sandbox', 'http://127.0.0.1:8765/v1.0.0-beta'))
+
+    def test_port_in_use_leaves_configuration_alone(self):
+        config = REDXConfiguration.objects.create(mode='production', sandbox_token='sandbox-token',
+                                                  production_token='live-token')
+        with mock.patch('courier.management.commands.mock_redx.make_server',
+                        side_effect=OSError(98, 'Address already in use')), \
+                self.assertRaisesMessage(CommandError, 'Cannot listen on 127.0.0.1:8765'):
+            call_command('mock_redx', '--configure', stdout=StringIO())
+        config.refresh_from_db()
+        self.assertEqual((config.mode, config.sandbox_base_url),
+                         ('production', 'https://sandbox.redx.com.bd/v1.0.0-beta'))
+
+    def test_configuration_created_for_the_mock_is_removed(self):
+        self.run_server()
+        self.assertFalse(REDXConfiguration.objects.exists())
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@override_settings(REDX_MAX_RETRIES=2, REDX_CONNECT_TIMEOUT=1, REDX_LOOKUP_READ_TIMEOUT=0.3, REDX_READ_TIMEOUT=2)
+class TransportTests(SimpleTestCase):
+    """The REDX session against a local server answering with whatever the test queues up."""
+
+    def setUp(self):
+        cache.clear()
+        self.answers, self.requests = [], []
+
+        def app(environ, start_response):
+            self.requests.append(environ['REQUEST_METHOD'])
+            status, delay = self.answers.pop(0) if self.answers else (200, 0)
+            time.sleep(delay)
+            start_response(f'{status} X', [('Content-Type', 'application/json')])
+            return [b'{}']
+
+        self.server = make_server('127.0.0.1', 0, app, handler_class=QuietHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/parcel'
+        session = transport._build_session()
+        self.addCleanup(session.close)
+        patcher = mock.patch('courier.transport.get_session', return_value=session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_timeouts(self):
+        self.assertEqual(transport.default_timeout('GET'), (1, 0.3))
+        self.assertEqual(transport.default_timeout('POST'), (1, 2))
+        with mock.patch.object(transport.get_session(), 'request') as request:
+            transport.send('POST', 'parcel.create', self.url, json={})
+        self.assertEqual(request.call_args.kwargs['timeout'], (1, 2))
+
+    def test_server_errors_retried_for_lookups_only(self):
+        self.answers = [(503, 0), (502, 0)]
+        self.assertEqual(transport.send('GET', 'parcel.track', self.url).status_code, 200)
+        self.assertEqual(self.requests, ['GET'] * 3)
+
+        self.requests, self.answers = [], [(503, 0)]
+        self.assertEqual(transport.send('POST', 'parcel.create', self.url).status_code, 503)
+        self.assertEqual(self.requests, ['POST'])
+
+    def test_read_timeout_is_not_retried(self):
+        self.answers = [(200, 0.6)]
+        started = time.monotonic()
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            transport.send('GET', 'parcel.track', self.url)
+        self.assertLess(time.monotonic() - started, 0.6)
+        self.assertEqual(self.requests, ['GET'])
+        self.assertEqual(breaker.breaker_state()['failures'], 1)
+
+    def test_breaker_times_each_attempt(self):
+        self.answers = [(503, 0.2), (200, 0.2)]
+        with override_settings(REDX_BREAKER_SLOW_CALL=0.3), \
+                mock.patch('courier.transport.breaker.record_success') as record_success:
+            transport.send('GET', 'parcel.track', self.url)
+        self.assertLess(record_success.call_args.args[0], 0.3)
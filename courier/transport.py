@@ -0,0 +1,108 @@
+# courier/transport.py
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import breaker
+
+logger = logging.getLogger(__name__)
+
+# Only these are retried after REDX answered with 429/5xx; connection failures
+# (nothing was sent yet) are retried for every method. A read timeout is never
+# retried: it already cost the whole read timeout once.
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """The process-wide REDX session; its connections are kept alive and reused."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def _build_session():
+    retries = getattr(settings, 'REDX_MAX_RETRIES', 3)
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=retries,
+        backoff_factor=0.5,
+        backoff_jitter=0.5,
+        backoff_max=8,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=IDEMPOTENT_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=2,
+        pool_maxsize=getattr(settings, 'REDX_POOL_SIZE', 10),
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def default_timeout(method='GET'):
+    """
+    (connect, read) timeouts in seconds: lookups (tracking, areas) give up after
+    REDX_LOOKUP_READ_TIMEOUT, parcel creation and cancellation wait REDX_READ_TIMEOUT.
+    """
+    if method in IDEMPOTENT_METHODS:
+        read_timeout = getattr(settings, 'REDX_LOOKUP_READ_TIMEOUT', 5)
+    else:
+        read_timeout = getattr(settings, 'REDX_READ_TIMEOUT', 20)
+    return (getattr(settings, 'REDX_CONNECT_TIMEOUT', 3.05), read_timeout)
+
+
+def send(method, endpoint, url, **kwargs):
+    """
+    Send a request through the shared session and log how long it took under
+    `endpoint` (e.g. 'parcel.track'), retries included.
+
+    Calls go through the circuit breaker (courier.breaker): while REDX keeps failing
+    this raises breaker.CircuitOpenError at once instead of waiting on timeouts.
+    """
+    kwargs.setdefault('timeout', default_timeout(method))
+    try:
+        probe = breaker.before_call()
+    except breaker.CircuitOpenError:
+        logger.info(f"REDX {endpoint} {method} short-circuited (breaker open)")
+        raise
+
+    started = time.monotonic()
+    outcome = 'error'
+    try:
+        response = get_session().request(method, url, **kwargs)
+    except requests.exceptions.RequestException as e:
+        outcome = type(e).__name__
+        breaker.record_failure(outcome, probe)
+        raise
+    else:
+        outcome = response.status_code
+        if response.status_code in RETRY_STATUSES:
+            breaker.record_failure(f"HTTP {response.status_code}", probe)
+        else:
+            # Judge speed per attempt, so retries and their backoff don't make it "slow"
+            retries = getattr(response.raw, 'retries', None)
+            attempts = len(retries.history) + 1 if retries else 1
+            breaker.record_success((time.monotonic() - started) / attempts, probe)
+        return response
+    finally:
+        elapsed_ms = (time.monotonic() - started) * 1000
+        logger.info(f"REDX {endpoint} {method} {outcome} in {elapsed_ms:.0f} ms")
@@ -13,4 +13,10 @@ urlpatterns = [
     
     # Cancel parcel
     path('redx/cancel/<int:parcel_id>/', views.cancel_parcel, name='cancel_parcel'),
+    
+    # All parcels, searchable
+    path('redx/parcels/', views.parcel_list, name='parcel_list'),
+    
+    # Status pushes from REDX
+    path('redx/webhook/', views.redx_webhook, name='redx_webhook'),
 ]
\ No newline at end of file
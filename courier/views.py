@@ -2,15 +2,25 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Count, Q
 from django.http import JsonResponse
-from django.views.decorators.http import require_http_methods
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods, require_POST
+from core.pagination import keyset_paginate
 from orders.models import Order
 from .models import REDXConfiguration, REDXParcel
-from .services import REDXService
+from .events import record_events, record_response
+from .services import REDXService, parcel_status_from
+from .webhooks import SIGNATURE_HEADER, apply_status_events, verify_signature
+import json
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+_LETTERS_RE = re.compile(r'[^\W\d_]')
+
 
 @staff_member_required
 def create_redx_parcel(request, order_id):
@@ -88,7 +98,7 @@ def _handle_parcel_creation(request, order):
                 messages.error(request, "⚠️ Parcel created but no tracking ID received.")
                 
                 # Save as failed parcel for review
-                REDXParcel.objects.create(
+                parcel = REDXParcel.objects.create(
                     order=order,
                     customer_name=customer_name,
                     customer_phone=customer_phone,
@@ -99,8 +109,8 @@ def _handle_parcel_creation(request, order):
                     cash_collection_amount=cash_collection_amount,
                     status='failed',
                     error_message='No tracking ID received from REDX',
-                    redx_response=response_data
                 )
+                record_response(parcel, 'failed', 'No tracking ID received from REDX', response_data, 'create')
                 return redirect('admin:orders_order_change', order.id)
             
             # Save parcel information with tracking ID
@@ -115,12 +125,16 @@ def _handle_parcel_creation(request, order):
                 parcel_weight=parcel_weight,
                 cash_collection_amount=cash_collection_amount,
                 status='created',
-                redx_response=response_data
             )
+            record_response(parcel, 'created', f'Parcel created: {tracking_id}', response_data, 'create')
             
             logger.info(f"REDX parcel created successfully for order {order.order_number}: {tracking_id}")
             messages.success(request, f"✅ REDX parcel created successfully! Tracking ID: {tracking_id}")
             return redirect('admin:orders_order_change', order.id)
+        elif result.get('circuit_open'):
+            # REDX was not called, so there is no failed parcel to record; the form can be resubmitted
+            messages.error(request, f"⏸️ {result['error']}")
+            return redirect('courier:create_redx_parcel', order_id=order.id)
         else:
             # Save failed parcel for debugging
             error_message = result.get('error', 'Unknown error')
@@ -152,7 +166,7 @@ def _render_parcel_form(request, order):
     """Render the parcel creation form with pre-filled data"""
     try:
         # Get REDX configuration
-        config = REDXConfiguration.objects.filter(is_active=True).first()
+        config = REDXConfiguration.current()
         if not config:
             messages.error(request, "REDX is not configured. Please configure it in admin panel first.")
             return redirect('admin:orders_order_change', order.id)
@@ -220,28 +234,20 @@ def track_parcel(request, parcel_id):
         if result['success']:
             tracking_data = result.get('data', {})
             
-            # Update parcel with latest tracking info
-            parcel.redx_response = tracking_data
-            
-            # Update status if available in tracking data
-            if 'status' in tracking_data:
-                status_mapping = {
-                    'pending': 'pending',
-                    'picked_up': 'picked',
-                    'in_transit': 'in_transit',
-                    'delivered': 'delivered',
-                    'cancelled': 'cancelled',
-                }
-                new_status = status_mapping.get(tracking_data['status'].lower(), parcel.status)
-                if new_status != parcel.status:
-                    parcel.status = new_status
+            # New steps go to the parcel's history; the parcel row only changes with its status
+            record_events([(parcel, tracking_data)], 'track')
             
-            parcel.save()
+            new_status = parcel_status_from(tracking_data, parcel.status)
+            if new_status != parcel.status:
+                parcel.status = new_status
+                parcel.status_updated_at = timezone.now()
+                parcel.save(update_fields=['status', 'status_updated_at', 'updated_at'])
             
             context = {
                 'parcel': parcel,
                 'tracking_data': tracking_data,
                 'order': parcel.order,
+                'events': parcel.events.defer('payload'),
             }
             
             return render(request, 'courier/track_parcel.html', context)
@@ -282,8 +288,9 @@ def cancel_parcel(request, parcel_id):
         
         if result['success']:
             parcel.status = 'cancelled'
-            parcel.redx_response = result.get('data', parcel.redx_response)
-            parcel.save()
+            parcel.status_updated_at = timezone.now()
+            parcel.save(update_fields=['status', 'status_updated_at', 'updated_at'])
+            record_response(parcel, 'cancelled', 'Cancelled from the admin', result.get('data'), 'cancel')
             
             logger.info(f"Parcel {parcel.tracking_id} cancelled successfully")
             messages.success(request, f"Parcel {parcel.tracking_id} cancelled successfully.")
@@ -300,33 +307,84 @@ def cancel_parcel(request, parcel_id):
         return redirect('admin:courier_redxparcel_change', parcel_id)
 
 
+PARCEL_PAGE_SIZE = 25
+
+
 @staff_member_required
 def parcel_list(request):
-    """List all REDX parcels with filters"""
-    parcels = REDXParcel.objects.select_related('order').all()
+    """List REDX parcels, newest first, with status filter, search and keyset pages"""
+    parcels = REDXParcel.objects.all()
     
-    # Apply filters
-    status_filter = request.GET.get('status')
+    search_query = (request.GET.get('q') or '').strip()
+    if search_query:
+        parcels = parcels.filter(_parcel_search(search_query))
+    
+    # Counts per status for the current search, in one grouped query
+    counts = dict(parcels.order_by().values_list('status').annotate(total=Count('id')))
+    status_counts = [(value, label, counts.get(value, 0)) for value, label in REDXParcel.STATUS_CHOICES]
+    
+    status_filter = request.GET.get('status') or ''
     if status_filter:
         parcels = parcels.filter(status=status_filter)
     
-    search_query = request.GET.get('q')
-    if search_query:
-        parcels = parcels.filter(
-            tracking_id__icontains=search_query
-        ) | parcels.filter(
-            customer_name__icontains=search_query
-        ) | parcels.filter(
-            customer_phone__icontains=search_query
-        ) | parcels.filter(
-            order__order_number__icontains=search_query
-        )
+    page, next_cursor = keyset_paginate(
+        parcels.select_related('order').only(
+            'id', 'tracking_id', 'customer_name', 'customer_phone', 'status',
+            'cash_collection_amount', 'created_at', 'order__id', 'order__order_number',
+        ),
+        cursor=request.GET.get('cursor'),
+        page_size=PARCEL_PAGE_SIZE,
+    )
     
     context = {
-        'parcels': parcels,
-        'status_choices': REDXParcel.STATUS_CHOICES,
+        'parcels': page,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('cursor'),
+        'status_counts': status_counts,
+        'total_count': sum(counts.values()),
         'current_status': status_filter,
         'search_query': search_query,
     }
     
-    return render(request, 'courier/parcel_list.html', context)
\ No newline at end of file
+    return render(request, 'courier/parcel_list.html', context)
+
+
+def _parcel_search(query):
+    """
+    One condition over indexed columns: tracking ID, order number and phone number
+    by prefix (phones compared digits-only). Only text without digits, which cannot
+    be one of those, is matched against customer names.
+
+    The prefix ranges compare case-sensitively, so tracking IDs (upper case from
+    REDX) are also looked up with the query upper-cased: "rx100" finds RX100.
+    """
+    condition = (
+        Q(tracking_id__gte=query, tracking_id__lt=query + '\uffff')
+        | Q(order_id__in=Order.objects.filter(order_number__gte=query, order_number__lt=query + '\uffff').values('id'))
+    )
+    if query.upper() != query:
+        condition |= Q(tracking_id__gte=query.upper(), tracking_id__lt=query.upper() + '\uffff')
+    phone = REDXParcel.normalize_phone(query)
+    if not phone:
+        condition |= Q(customer_name__icontains=query)
+    elif len(phone) >= 3 and not _LETTERS_RE.search(query):
+        condition |= Q(phone_key__gte=phone, phone_key__lt=phone + '\uffff')
+    return condition
+
+
+@csrf_exempt
+@require_POST
+def redx_webhook(request):
+    """Status pushes from REDX: one event object or a list of them, signed with REDX_WEBHOOK_SECRET"""
+    if not verify_signature(request.body, request.headers.get(SIGNATURE_HEADER)):
+        logger.warning("REDX webhook rejected: bad or missing signature")
+        return JsonResponse({'error': 'Invalid signature'}, status=403)
+
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+
+    events = payload if isinstance(payload, list) else [payload]
+    applied, ignored = apply_status_events(events)
+    return JsonResponse({'received': len(events), 'applied': applied, 'ignored': ignored})
@@ -0,0 +1,90 @@
+# courier/webhooks.py
+import hashlib
+import hmac
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .events import parse_event_time, record_events
+from .models import REDXParcel
+from .poller import postpone_polls
+from .services import parcel_status_from
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = 'X-REDX-Signature'
+
+
+def sign_payload(body, secret=None):
+    """Hex HMAC-SHA256 of the raw request body, as sent in the X-REDX-Signature header."""
+    secret = secret if secret is not None else getattr(settings, 'REDX_WEBHOOK_SECRET', '')
+    if isinstance(body, str):
+        body = body.encode()
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body, signature):
+    """False for a missing or wrong signature, and always while no secret is configured."""
+    secret = getattr(settings, 'REDX_WEBHOOK_SECRET', '')
+    if not secret or not signature:
+        return False
+    if signature.startswith('sha256='):
+        signature = signature[len('sha256='):]
+    return hmac.compare_digest(sign_payload(body, secret), signature.strip().lower())
+
+
+def apply_status_events(events):
+    """
+    Apply REDX status pushes, given as a list of dicts with a tracking ID
+    (`tracking_id` or `tracking_number`), a `status` and optionally a `timestamp`
+    (ISO 8601 or epoch seconds; the time of receipt when missing).
+
+    An event only moves a parcel forward in time: duplicates and events older than
+    the parcel's status_updated_at are ignored, so deliveries can be retried or
+    arrive out of order. All events are applied with one read and one bulk update.
+    Returns (applied, ignored).
+    """
+    received_at = timezone.now()
+    latest, by_tracking_id = {}, {}
+    for event in events:
+        tracking_id = _tracking_id(event)
+        if not tracking_id:
+            continue
+        by_tracking_id.setdefault(tracking_id, []).append(event)
+        happened_at = parse_event_time(event.get('timestamp'), received_at)
+        if tracking_id not in latest or happened_at > latest[tracking_id][0]:
+            latest[tracking_id] = (happened_at, event)
+
+    with transaction.atomic():
+        parcels = REDXParcel.objects.select_for_update().filter(tracking_id__in=list(latest))
+        changed, history = [], []
+        for parcel in parcels:
+            history += [(parcel, event) for event in by_tracking_id[parcel.tracking_id]]
+            happened_at, event = latest[parcel.tracking_id]
+            if parcel.status_updated_at and happened_at <= parcel.status_updated_at:
+                continue
+            status = parcel_status_from(event, parcel.status)
+            if status == parcel.status and parcel.status_updated_at:
+                continue
+            parcel.status = status
+            parcel.status_updated_at = happened_at
+            parcel.updated_at = received_at  # bulk_update skips auto_now
+            changed.append(parcel)
+        record_events(history, 'webhook')
+        if changed:
+            REDXParcel.objects.bulk_update(changed, ['status', 'status_updated_at', 'updated_at'])
+
+    # REDX is pushing updates for these, so the poller can leave them be for a while
+    postpone_polls([parcel.pk for parcel in changed])
+
+    ignored = len(events) - len(changed)
+    logger.info(f"REDX webhook: {len(events)} events, {len(changed)} applied, {ignored} ignored")
+    return len(changed), ignored
+
+
+def _tracking_id(event):
+    if not isinstance(event, dict):
+        return ''
+    return str(event.get('tracking_id') or event.get('tracking_number') or '').strip()
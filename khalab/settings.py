@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'store',
     'carts',
     'courier',
+    'analytics',
 ]
 
 MIDDLEWARE = [
@@ -165,8 +166,12 @@ EMAIL_USE_TLS = config('EMAIL_USE_TLS', cast=bool)
 DEFAULT_FROM_EMAIL=EMAIL_HOST_USER
 
 
-# development email backend
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Email backend. For load testing point it at a local stand-in instead of SMTP, e.g.
+#   EMAIL_BACKEND=django.core.mail.backends.filebased.EmailBackend  (writes to EMAIL_FILE_PATH)
+#   EMAIL_BACKEND=django.core.mail.backends.console.EmailBackend
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = config('EMAIL_FILE_PATH', default=str(BASE_DIR / 'sent_emails'))
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
 
 CONTACT_EMAIL = config('CONTACT_EMAIL')
 CONTACT_PHONE = config('CONTACT_PHONE')
@@ -217,4 +222,57 @@ LOGOUT_REDIRECT_URL = reverse_lazy('admin:login')
 
 
 ADMIN_SITE_HEADER = "Khalab Store Admin"
-ADMIN_SITE_TITLE = "Khalab Admin Portal"
\ No newline at end of file
+ADMIN_SITE_TITLE = "Khalab Admin Portal"
+
+
+# Cache. The default is per process (LocMem), which is all a single web process needs.
+# With several workers plus `run_scheduler`, give them one shared cache so the REDX
+# circuit breaker and the configuration singletons look the same to all of them:
+#   REDIS_URL=redis://127.0.0.1:6379/1
+# or any other backend through CACHE_BACKEND / CACHE_LOCATION.
+REDIS_URL = config('REDIS_URL', default='')
+CACHES = {
+    'default': {
+        'BACKEND': config(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.redis.RedisCache' if REDIS_URL
+            else 'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': config('CACHE_LOCATION', default=REDIS_URL),
+    }
+}
+
+
+# Background jobs run by `python manage.py run_scheduler`
+SCHEDULED_JOBS = [
+    {'func': 'analytics.services.refresh_rollups', 'seconds': 15 * 60},
+    {'func': 'orders.archive.archive_orders', 'seconds': 24 * 60 * 60},
+    {'func': 'courier.areas.refresh_areas', 'seconds': 24 * 60 * 60},
+    {'func': 'courier.poller.poll_parcels', 'seconds': 5 * 60},
+    {'func': 'courier.bulk.resume_stalled_batches', 'seconds': 5 * 60},
+]
+
+# REDX courier HTTP client: (connect, read) timeouts in seconds (lookups such as
+# tracking and areas use the shorter read timeout), retry budget for connection
+# errors and 429/5xx answers, and keep-alive connections per host
+REDX_CONNECT_TIMEOUT = config('REDX_CONNECT_TIMEOUT', default=3.05, cast=float)
+REDX_READ_TIMEOUT = config('REDX_READ_TIMEOUT', default=20, cast=float)
+REDX_LOOKUP_READ_TIMEOUT = config('REDX_LOOKUP_READ_TIMEOUT', default=5, cast=float)
+REDX_MAX_RETRIES = config('REDX_MAX_RETRIES', default=3, cast=int)
+REDX_POOL_SIZE = config('REDX_POOL_SIZE', default=10, cast=int)
+# Circuit breaker: failed (or slower than REDX_BREAKER_SLOW_CALL seconds) calls in a row
+# before REDX calls fail fast, and seconds to wait before letting one probe call through
+REDX_BREAKER_FAILURES = config('REDX_BREAKER_FAILURES', default=5, cast=int)
+REDX_BREAKER_SLOW_CALL = config('REDX_BREAKER_SLOW_CALL', default=10, cast=float)
+REDX_BREAKER_COOLDOWN = config('REDX_BREAKER_COOLDOWN', default=30, cast=int)
+
+# Bulk parcel creation: REDX calls in flight at once, and calls started per second
+REDX_BULK_CONCURRENCY = config('REDX_BULK_CONCURRENCY', default=4, cast=int)
+REDX_BULK_RATE_PER_SECOND = config('REDX_BULK_RATE_PER_SECOND', default=5, cast=float)
+# Parcel status poller: tracking calls in flight at once (same rate limit as above)
+REDX_POLL_CONCURRENCY = config('REDX_POLL_CONCURRENCY', default=8, cast=int)
+# Shared secret REDX signs webhook bodies with (HMAC-SHA256); the webhook refuses everything while empty
+REDX_WEBHOOK_SECRET = config('REDX_WEBHOOK_SECRET', default='')
+
+# Completed/Cancelled orders untouched for this many days are moved to the archive tables
+ORDER_ARCHIVE_AFTER_DAYS = config('ORDER_ARCHIVE_AFTER_DAYS', default=180, cast=int)
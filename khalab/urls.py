@@ -18,6 +18,7 @@ urlpatterns = [
     #orders
     path('orders/',include('orders.urls')),
     path('courier/', include('courier.urls')),
+    path('analytics/', include('analytics.urls')),
 ] + static(settings.MEDIA_URL, document_root = settings.MEDIA_ROOT)
 
 
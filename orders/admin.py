@@ -1,9 +1,16 @@
 # orders/admin.py
 from django.contrib import admin
 from django.urls import reverse
+from django.template.loader import render_to_string
 from django.utils.html import format_html
 from django import forms
-from .models import Payment, Order, OrderProduct, PaymentSettings, DeliveryCharge
+from .models import (
+    Payment, Order, OrderProduct, PaymentSettings, DeliveryCharge,
+    OrderStatusJob, OrderStatusHistory, StatementImport, StatementLine, ArchivedOrder,
+)
+from .exports import export_response, orders_for_export
+from .services import bulk_transition, resume_notification_job
+from courier.bulk import create_parcel_batch
 
 
 @admin.register(DeliveryCharge)
@@ -75,6 +82,99 @@ class OrderProductInline(admin.TabularInline):
     extra = 0
 
 
+class OrderStatusHistoryInline(admin.TabularInline):
+    model = OrderStatusHistory
+    fields = ('from_status', 'to_status', 'changed_by', 'job', 'notified', 'created_at')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(OrderStatusJob)
+class OrderStatusJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'target_status', 'requested_by', 'progress_bar', 'sent', 'failed', 'state', 'created_at', 'finished_at')
+    list_filter = ('state', 'target_status', 'created_at')
+    readonly_fields = ('target_status', 'requested_by', 'total', 'sent', 'failed', 'state', 'error_message', 'created_at', 'finished_at')
+    actions = ['resume_notifications']
+
+    def progress_bar(self, obj):
+        percent = obj.progress_percent
+        return format_html(
+            '<div style="width:120px;background:#e5e7eb;border-radius:4px;">'
+            '<div style="width:{}%;background:#10b981;color:white;font-size:11px;padding:2px 4px;border-radius:4px;white-space:nowrap;">{}%</div>'
+            '</div>',
+            percent,
+            percent,
+        )
+    progress_bar.short_description = 'Progress'
+
+    def resume_notifications(self, request, queryset):
+        remaining = sum(resume_notification_job(job) for job in queryset.exclude(state='done'))
+        self.message_user(request, f"{remaining} unsent notification(s) queued again.")
+    resume_notifications.short_description = "Resume unsent notifications (jobs stuck after a restart)"
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(StatementImport)
+class StatementImportAdmin(admin.ModelAdmin):
+    list_display = (
+        'id', 'provider', 'file_name', 'total_rows', 'approved', 'amount_mismatches',
+        'duplicates', 'unmatched', 'uploaded_by', 'created_at', 'lines_link',
+    )
+    list_filter = ('provider', 'created_at')
+    readonly_fields = (
+        'provider', 'file_name', 'uploaded_by', 'approve_matches', 'total_rows', 'matched', 'approved',
+        'amount_mismatches', 'duplicates', 'unmatched', 'created_at', 'lines_link',
+    )
+    change_list_template = 'admin/orders/statementimport/change_list.html'
+
+    def lines_link(self, obj):
+        url = reverse('admin:orders_statementline_changelist')
+        return format_html(
+            '<a href="{}?statement__id__exact={}&result__exact=amount_mismatch">Mismatches</a> · '
+            '<a href="{}?statement__id__exact={}&result__exact=duplicate">Duplicates</a> · '
+            '<a href="{}?statement__id__exact={}">All rows</a>',
+            url, obj.pk, url, obj.pk, url, obj.pk,
+        )
+    lines_link.short_description = 'Review'
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(StatementLine)
+class StatementLineAdmin(admin.ModelAdmin):
+    list_display = ('statement', 'row_number', 'transaction_id', 'amount', 'result_badge', 'payment', 'note')
+    list_filter = ('result', 'statement__provider', 'statement')
+    search_fields = ('transaction_id', 'payment__payment_id')
+    list_select_related = ('statement', 'payment')
+    readonly_fields = ('statement', 'row_number', 'transaction_id', 'amount', 'payment', 'result', 'note')
+
+    def result_badge(self, obj):
+        colors = {
+            'matched': '#10b981',
+            'already_approved': '#6b7280',
+            'amount_mismatch': '#f59e0b',
+            'duplicate': '#ef4444',
+            'unmatched': '#3b82f6',
+            'invalid': '#9ca3af',
+        }
+        return format_html(
+            '<span style="background:{};color:white;padding:2px 8px;border-radius:10px;font-size:11px;">{}</span>',
+            colors.get(obj.result, '#6b7280'),
+            obj.get_result_display(),
+        )
+    result_badge.short_description = 'Result'
+
+    def has_add_permission(self, request):
+        return False
+
+
 class OrderAdminForm(forms.ModelForm):
     TRANSACTION_STATUS_CHOICES = [
         ('Paid', 'Paid'),
@@ -115,8 +215,11 @@ class OrderAdminForm(forms.ModelForm):
 # ✅ Final OrderAdmin with redx_parcel_button integrated
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    actions = ['mark_status_new', 'mark_status_accept', 'mark_status_completed', 'mark_status_cancelled']
-    inlines = [OrderProductInline]
+    actions = [
+        'mark_status_new', 'mark_status_accept', 'mark_status_completed', 'mark_status_cancelled',
+        'export_orders_csv', 'export_orders_xlsx', 'create_redx_parcels',
+    ]
+    inlines = [OrderProductInline, OrderStatusHistoryInline]
 
     list_display = (
         'order_number',
@@ -124,6 +227,7 @@ class OrderAdmin(admin.ModelAdmin):
         'phone',
         'email',
         'order_total',
+        'item_count',
         'collected_amount',
         'status',
         'is_ordered',
@@ -133,7 +237,7 @@ class OrderAdmin(admin.ModelAdmin):
     list_filter = ['status', 'is_ordered', 'created_at']
     search_fields = ['order_number', 'first_name', 'last_name', 'phone', 'email']
     list_per_page = 20
-    readonly_fields = ('collected_amount',)
+    readonly_fields = ('collected_amount', 'subtotal', 'item_count')
 
     # ✅ Add REDX courier button (create or track)
     def redx_parcel_button(self, obj):
@@ -173,15 +277,24 @@ class OrderAdmin(admin.ModelAdmin):
                 obj.payment.status = desired
                 obj.payment.save(update_fields=['status'])
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Lines may have been removed or edited through the inline.
+        if any(formset.model is OrderProduct and formset.has_changed() for formset in formsets):
+            form.instance.refresh_item_totals()
+
     def _bulk_set_status(self, request, queryset, status_value, human_label):
-        count = 0
-        for order in queryset:
-            old = order.status
-            if old != status_value:
-                order.status = status_value
-                order.save(update_fields=['status', 'updated_at'])
-                count += 1
-        self.message_user(request, f"{count} order(s) marked as {human_label} and customers notified.")
+        job = bulk_transition(queryset, status_value, user=request.user)
+        if job is None:
+            self.message_user(request, f"0 order(s) marked as {human_label}.")
+            return
+        job_url = reverse('admin:orders_orderstatusjob_change', args=[job.pk])
+        self.message_user(request, format_html(
+            '{} order(s) marked as {}. Customer emails are being sent in the background — <a href="{}">view progress</a>.',
+            job.total,
+            human_label,
+            job_url,
+        ))
 
     def mark_status_new(self, request, queryset):
         self._bulk_set_status(request, queryset, 'New', 'New')
@@ -198,3 +311,57 @@ class OrderAdmin(admin.ModelAdmin):
     def mark_status_cancelled(self, request, queryset):
         self._bulk_set_status(request, queryset, 'Cancelled', 'Cancelled')
     mark_status_cancelled.short_description = "Set status to Cancelled (sends email)"
+
+    def export_orders_csv(self, request, queryset):
+        return export_response(orders_for_export(queryset=queryset), 'csv')
+    export_orders_csv.short_description = "Export selected orders with lines (CSV)"
+
+    def export_orders_xlsx(self, request, queryset):
+        return export_response(orders_for_export(queryset=queryset), 'xlsx')
+    export_orders_xlsx.short_description = "Export selected orders with lines (Excel)"
+
+    def create_redx_parcels(self, request, queryset):
+        batch = create_parcel_batch(queryset, user=request.user)
+        batch_url = reverse('admin:courier_parcelbatch_change', args=[batch.pk])
+        self.message_user(request, format_html(
+            'Creating REDX parcels for {} order(s) in the background ({} already had one) — <a href="{}">view progress</a>.',
+            batch.total - batch.skipped,
+            batch.skipped,
+            batch_url,
+        ))
+    create_redx_parcels.short_description = "Create REDX parcels for selected orders"
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = ('order_number', 'full_name', 'phone', 'email', 'order_total', 'status', 'payment_method', 'created_at', 'archived_at')
+    list_filter = ('status', 'payment_method', 'created_at', 'archived_at')
+    search_fields = ['order_number', 'first_name', 'last_name', 'phone', 'email']
+    date_hierarchy = 'created_at'
+    list_per_page = 50
+    fields = ('order_number', 'user', 'status', 'order_total', 'created_at', 'archived_at', 'invoice', 'courier')
+    readonly_fields = fields
+
+    def invoice(self, obj):
+        order = obj.as_order()
+        return render_to_string('includes/order_invoice.html', {
+            'order': order,
+            'order_detail': obj.as_order_lines(),
+            'subtotal': order.subtotal,
+        })
+    invoice.short_description = 'Order'
+
+    def courier(self, obj):
+        parcel = obj.data.get('redx_parcel')
+        if not parcel:
+            return '—'
+        fields = parcel['fields']
+        return f"{fields.get('tracking_id') or 'No tracking ID'} ({fields.get('status')})"
+    courier.short_description = 'REDX parcel'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
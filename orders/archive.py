@@ -0,0 +1,126 @@
+# orders/archive.py
+import datetime
+import logging
+
+from django.conf import settings
+from django.core import serializers
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedPurchase, Order, OrderProduct, Payment
+from .services import TERMINAL_STATUSES
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BATCH_SIZE = 200
+
+
+def archive_orders(older_than_days=None, batch_size=ARCHIVE_BATCH_SIZE, limit=None):
+    """
+    Move orders that have sat in a terminal status (Completed/Cancelled) for longer
+    than `older_than_days` (default settings.ORDER_ARCHIVE_AFTER_DAYS) into ArchivedOrder.
+
+    Each batch is one transaction: snapshot, insert the archive rows and the
+    ArchivedPurchase rows product reviews check, then delete the orders (their
+    lines, status history and courier parcel go with them) and any payment no
+    live order still points at. Returns the number of orders moved.
+    """
+    if older_than_days is None:
+        older_than_days = getattr(settings, 'ORDER_ARCHIVE_AFTER_DAYS', 180)
+    cutoff = timezone.now() - datetime.timedelta(days=older_than_days)
+    candidates = Order.objects.filter(
+        is_ordered=True,
+        status__in=TERMINAL_STATUSES,
+        updated_at__lt=cutoff,
+    ).order_by('id')
+
+    moved = 0
+    while limit is None or moved < limit:
+        size = batch_size if limit is None else min(batch_size, limit - moved)
+        ids = list(candidates.values_list('id', flat=True)[:size])
+        if not ids:
+            break
+        moved += archive_batch(ids)
+
+    if moved:
+        logger.info(f"Archived {moved} order(s) finished before {cutoff:%Y-%m-%d}")
+    return moved
+
+
+@transaction.atomic
+def archive_batch(order_ids):
+    orders = list(
+        Order.objects.filter(pk__in=order_ids)
+        .select_related('payment', 'redx_parcel')
+        .prefetch_related(
+            Prefetch(
+                'orderproduct_set',
+                queryset=OrderProduct.objects.select_related('product').prefetch_related('variations').order_by('id'),
+            ),
+            'status_history',
+        )
+    )
+    if not orders:
+        return 0
+
+    archived, purchases, payment_ids = [], [], set()
+    for order in orders:
+        lines = list(order.orderproduct_set.all())
+        purchases.append({(line.user_id or order.user_id, line.product_id) for line in lines})
+        payment_ids.update(pid for pid in [order.payment_id] + [line.payment_id for line in lines] if pid)
+        archived.append(ArchivedOrder(
+            original_id=order.pk,
+            order_number=order.order_number,
+            user_id=order.user_id,
+            status=order.status,
+            first_name=order.first_name,
+            last_name=order.last_name,
+            phone=order.phone,
+            email=order.email,
+            state=order.state,
+            payment_method=order.payment.payment_method if order.payment else '',
+            order_total=order.order_total,
+            created_at=order.created_at,
+            data=snapshot_order(order, lines),
+        ))
+
+    ArchivedOrder.objects.bulk_create(archived)
+    ArchivedPurchase.objects.bulk_create([
+        ArchivedPurchase(archived_order=entry, user_id=user_id, product_id=product_id)
+        for entry, bought in zip(archived, purchases)
+        for user_id, product_id in bought
+        if user_id and product_id
+    ])
+    Order.objects.filter(pk__in=[order.pk for order in orders]).delete()
+    Payment.objects.filter(pk__in=payment_ids, order__isnull=True, orderproduct__isnull=True).delete()
+    return len(orders)
+
+
+def snapshot_order(order, lines):
+    """Everything needed to show the order again, as JSON-serialisable data."""
+    parcel = getattr(order, 'redx_parcel', None)
+    return {
+        'order': _serialize(order),
+        'payment': _serialize(order.payment) if order.payment else None,
+        'lines': [
+            {
+                'row': _serialize(line),
+                'product_name': getattr(line.product, 'product_name', ''),
+                'variations': [
+                    {'id': v.pk, 'variation_category': v.variation_category, 'variation_value': v.variation_value}
+                    for v in line.variations.all()
+                ],
+            }
+            for line in lines
+        ],
+        'status_history': [
+            {'from_status': h.from_status, 'to_status': h.to_status, 'changed_by_id': h.changed_by_id, 'created_at': h.created_at}
+            for h in order.status_history.all()
+        ],
+        'redx_parcel': _serialize(parcel) if parcel else None,
+    }
+
+
+def _serialize(obj):
+    return serializers.serialize('python', [obj])[0]
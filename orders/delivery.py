@@ -0,0 +1,55 @@
+# orders/delivery.py
+import hashlib
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .models import DeliveryCharge
+
+# Used when neither the district nor a default row exists in DeliveryCharge
+FALLBACK_DELIVERY_CHARGE = Decimal("150.00")
+
+DELIVERY_TABLE_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def delivery_charge_version():
+    """
+    Short fingerprint of the DeliveryCharge table. Any add, edit or delete changes
+    it, so it can be used in URLs, cache keys and ETags.
+    """
+    stats = DeliveryCharge.objects.aggregate(count=Count('id'), last_change=Max('updated_at'))
+    raw = f"{stats['count']}:{stats['last_change'].isoformat() if stats['last_change'] else ''}"
+    return hashlib.md5(raw.encode()).hexdigest()[:12]
+
+
+def delivery_charge_table(version=None):
+    """
+    The whole district -> charge table as JSON-ready data:
+    {'version': ..., 'default': '150.00', 'charges': {'Dhaka': '70.00', ...}}.
+    Built once per table version and kept in the cache backend.
+    """
+    version = version or delivery_charge_version()
+    key = f"delivery-charges:{version}"
+    table = cache.get(key)
+    if table is None:
+        default = FALLBACK_DELIVERY_CHARGE
+        charges = {}
+        for district, charge, is_default in DeliveryCharge.objects.values_list('district', 'charge', 'is_default'):
+            if is_default:
+                default = charge
+            else:
+                charges[district] = str(charge)
+        table = {'version': version, 'default': str(default), 'charges': charges}
+        cache.set(key, table, DELIVERY_TABLE_CACHE_TIMEOUT)
+    return table
+
+
+def charge_for_district(district, table=None):
+    """Delivery charge for `district` (case-insensitive), else the default charge."""
+    table = table or delivery_charge_table()
+    district_norm = (district or "").strip().lower()
+    for name, charge in table['charges'].items():
+        if name.lower() == district_norm:
+            return Decimal(charge)
+    return Decimal(table['default'])
@@ -0,0 +1,118 @@
+# orders/exports.py
+import datetime
+
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from core.streaming import stream_csv, stream_xlsx
+from .models import Order, OrderProduct
+
+EXPORT_CHUNK_SIZE = 500
+
+EXPORT_HEADER = [
+    'Order number', 'Order date', 'Order status', 'Customer', 'Phone', 'Email',
+    'District', 'Area', 'Address',
+    'Payment ID', 'Payment method', 'Payment type', 'Transaction ID', 'Payment status',
+    'Amount paid', 'Payment approved',
+    'Delivery charge', 'Order total', 'Collected amount',
+    'Courier tracking ID', 'Courier status',
+    'Product', 'Variations', 'Quantity', 'Unit price', 'Line total',
+]
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
+
+
+def orders_for_export(start=None, end=None, queryset=None):
+    """
+    Placed orders created between `start` and `end` (local dates, both inclusive),
+    with everything the export needs fetched alongside them.
+    """
+    queryset = Order.objects.all() if queryset is None else queryset
+    queryset = queryset.filter(is_ordered=True)
+    if start:
+        queryset = queryset.filter(created_at__gte=_start_of_day(start))
+    if end:
+        queryset = queryset.filter(created_at__lt=_start_of_day(end + datetime.timedelta(days=1)))
+    return (
+        queryset
+        .select_related('payment', 'redx_parcel')
+        .prefetch_related(Prefetch(
+            'orderproduct_set',
+            queryset=OrderProduct.objects.select_related('product').prefetch_related('variations').order_by('id'),
+        ))
+        .order_by('created_at', 'id')
+    )
+
+
+def iter_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    One row per order line (orders without lines get a single row).
+    Orders are read `chunk_size` at a time and their lines are prefetched per
+    chunk, so memory stays flat however many orders are exported.
+    """
+    for order in queryset.iterator(chunk_size=chunk_size):
+        order_columns = _order_columns(order)
+        lines = list(order.orderproduct_set.all())
+        if not lines:
+            yield order_columns + [None] * 5
+            continue
+        for line in lines:
+            yield order_columns + [
+                getattr(line.product, 'product_name', 'Deleted product'),
+                ', '.join(f'{v.variation_category}: {v.variation_value}' for v in line.variations.all()),
+                line.quantity,
+                line.product_price,
+                line.line_total,
+            ]
+
+
+def export_response(queryset, fmt='csv', filename=None):
+    """StreamingHttpResponse with the export of `queryset` (see orders_for_export)."""
+    content_type, extension = EXPORT_FORMATS[fmt]
+    filename = filename or f"orders-{timezone.localdate():%Y%m%d}.{extension}"
+    response = StreamingHttpResponse(stream_export(queryset, fmt), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def stream_export(queryset, fmt='csv'):
+    rows = iter_export_rows(queryset)
+    if fmt == 'xlsx':
+        return stream_xlsx(EXPORT_HEADER, rows, sheet_name='Orders')
+    return stream_csv(EXPORT_HEADER, rows)
+
+
+def _order_columns(order):
+    payment = order.payment
+    parcel = getattr(order, 'redx_parcel', None)
+    return [
+        order.order_number,
+        timezone.localtime(order.created_at).replace(tzinfo=None, microsecond=0),
+        order.status,
+        order.full_name(),
+        order.phone,
+        order.email,
+        order.state,
+        order.area,
+        order.full_address(),
+        payment.payment_id if payment else None,
+        payment.get_payment_method_display() if payment else None,
+        payment.get_payment_type_display() if payment else None,
+        payment.transaction_id if payment else None,
+        payment.status if payment else None,
+        payment.amount_paid if payment else None,
+        payment.is_approved if payment else None,
+        order.delivery_charge,
+        order.order_total,
+        order.collected_amount,
+        parcel.tracking_id if parcel else None,
+        parcel.get_status_display() if parcel else None,
+    ]
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
@@ -1,6 +1,6 @@
 # orders/forms.py
 from django import forms
-from .models import Order, Payment
+from .models import Order, Payment, StatementImport
 
 # Bangladesh districts list
 BANGLADESH_DISTRICTS = [
@@ -208,4 +208,14 @@ class PaymentForm(forms.Form):
             if not transaction_id:
                 raise forms.ValidationError("Transaction ID is required for online payments.")
         
-        return cleaned_data
\ No newline at end of file
+        return cleaned_data
+
+
+class StatementUploadForm(forms.Form):
+    provider = forms.ChoiceField(choices=StatementImport.PROVIDER_CHOICES)
+    statement = forms.FileField(help_text="CSV export of the merchant statement")
+    approve_matches = forms.BooleanField(
+        required=False,
+        initial=True,
+        help_text="Approve payments whose transaction ID and amount both match",
+    )
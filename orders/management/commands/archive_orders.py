@@ -0,0 +1,23 @@
+# orders/management/commands/archive_orders.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from orders.archive import ARCHIVE_BATCH_SIZE, archive_orders
+
+
+class Command(BaseCommand):
+    help = "Move Completed/Cancelled orders older than ORDER_ARCHIVE_AFTER_DAYS into the archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=None,
+                            help=f'Override ORDER_ARCHIVE_AFTER_DAYS (currently {settings.ORDER_ARCHIVE_AFTER_DAYS})')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help='Orders moved per transaction')
+        parser.add_argument('--limit', type=int, default=None, help='Stop after this many orders')
+
+    def handle(self, *args, **options):
+        moved = archive_orders(
+            older_than_days=options['older_than_days'],
+            batch_size=max(1, options['batch_size']),
+            limit=options['limit'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} order(s)."))
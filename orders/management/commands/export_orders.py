@@ -0,0 +1,41 @@
+# orders/management/commands/export_orders.py
+import argparse
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.exports import EXPORT_FORMATS, orders_for_export, stream_export
+
+
+def _date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = "Export placed orders with their lines, payment and courier status for a date range."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', type=_date, help='First order date (YYYY-MM-DD, inclusive)')
+        parser.add_argument('--to', dest='end', type=_date, help='Last order date (YYYY-MM-DD, inclusive)')
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help='File to write (default: stdout, CSV only)')
+
+    def handle(self, *args, **options):
+        fmt = options['format']
+        if fmt == 'xlsx' and not options['output']:
+            raise CommandError("--output is required for xlsx exports")
+
+        chunks = stream_export(orders_for_export(options['start'], options['end']), fmt)
+        if options['output']:
+            mode = 'wb' if fmt == 'xlsx' else 'w'
+            encoding = None if fmt == 'xlsx' else 'utf-8'
+            with open(options['output'], mode, encoding=encoding, newline='' if encoding else None) as fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Orders exported to {options['output']}"))
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,33 @@
+# orders/management/commands/reconcile_statement.py
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.models import StatementImport
+from orders.reconciliation import StatementFormatError, reconcile_statement
+
+
+class Command(BaseCommand):
+    help = "Reconcile a bKash/Nagad/Rocket statement CSV against wallet payments."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Statement CSV file')
+        parser.add_argument('--provider', required=True, type=str.upper,
+                            choices=[value for value, _ in StatementImport.PROVIDER_CHOICES])
+        parser.add_argument('--dry-run', action='store_true', help='Record the results without approving payments')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as fh:
+                statement = reconcile_statement(
+                    fh,
+                    options['provider'],
+                    file_name=options['path'],
+                    approve=not options['dry_run'],
+                )
+        except (OSError, StatementFormatError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Import #{statement.pk}: {statement.total_rows} rows, {statement.matched} matched, "
+            f"{statement.approved} approved, {statement.amount_mismatches} amount mismatches, "
+            f"{statement.duplicates} duplicates, {statement.unmatched} unmatched."
+        ))
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:44
+
+import datetime
+import re
+
+from django.db import migrations
+from django.utils import timezone
+
+
+ORDER_NUMBER_RE = re.compile(r'^(\d{8})(\d+)$')
+
+
+def backfill_order_numbers(apps, schema_editor):
+    """
+    Seed the per-day counters from existing order numbers and renumber rows that
+    would violate the upcoming unique index (placeholders and duplicates).
+    """
+    Order = apps.get_model('orders', 'Order')
+    OrderNumberSequence = apps.get_model('orders', 'OrderNumberSequence')
+
+    counters = {}
+    seen = set()
+    needs_number = []
+
+    for order in Order.objects.order_by('id').only('id', 'order_number', 'created_at').iterator():
+        number = (order.order_number or '').strip()
+        match = ORDER_NUMBER_RE.match(number)
+        if match and number not in seen:
+            seen.add(number)
+            day = match.group(1)
+            counters[day] = max(counters.get(day, 0), int(match.group(2)))
+        else:
+            needs_number.append(order)
+
+    for order in needs_number:
+        created = order.created_at or timezone.now()
+        day = timezone.localtime(created).strftime('%Y%m%d')
+        counters[day] = counters.get(day, 0) + 1
+        number = f"{day}{counters[day]:04d}"
+        while number in seen:
+            counters[day] += 1
+            number = f"{day}{counters[day]:04d}"
+        seen.add(number)
+        Order.objects.filter(pk=order.pk).update(order_number=number)
+
+    for day, value in counters.items():
+        try:
+            parsed = datetime.datetime.strptime(day, '%Y%m%d').date()
+        except ValueError:
+            continue
+        OrderNumberSequence.objects.update_or_create(day=parsed, defaults={'last_value': value})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0010_ordernumbersequence'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_order_numbers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0013_orderstatusjob_orderstatushistory'),
+        ('store', '0008_delete_banner'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['updated_at'], name='orders_order_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderproduct',
+            index=models.Index(fields=['updated_at'], name='orders_op_updated_at_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0015_lookup_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='transaction_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=100),
+        ),
+        migrations.CreateModel(
+            name='StatementImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(choices=[('BKASH', 'Bkash'), ('NAGAD', 'Nagad'), ('ROCKET', 'Rocket')], max_length=10)),
+                ('file_name', models.CharField(blank=True, max_length=255)),
+                ('approve_matches', models.BooleanField(default=True)),
+                ('total_rows', models.PositiveIntegerField(default=0)),
+                ('matched', models.PositiveIntegerField(default=0)),
+                ('approved', models.PositiveIntegerField(default=0)),
+                ('amount_mismatches', models.PositiveIntegerField(default=0)),
+                ('duplicates', models.PositiveIntegerField(default=0)),
+                ('unmatched', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Statement Import',
+                'verbose_name_plural': 'Statement Imports',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StatementLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row_number', models.PositiveIntegerField()),
+                ('transaction_id', models.CharField(blank=True, max_length=100)),
+                ('amount', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('result', models.CharField(choices=[('matched', 'Matched'), ('already_approved', 'Already approved'), ('amount_mismatch', 'Amount mismatch'), ('duplicate', 'Duplicate'), ('unmatched', 'No matching payment'), ('invalid', 'Unreadable row')], max_length=20)),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('payment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='orders.payment')),
+                ('statement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='orders.statementimport')),
+            ],
+            options={
+                'verbose_name': 'Statement Line',
+                'verbose_name_plural': 'Statement Lines',
+                'ordering': ['statement', 'row_number'],
+                'indexes': [models.Index(fields=['statement', 'result'], name='orders_stline_result_idx')],
+            },
+        ),
+    ]
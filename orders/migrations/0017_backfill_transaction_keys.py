@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:00
+
+import re
+
+from django.db import migrations
+
+
+TRANSACTION_KEY_RE = re.compile(r'[^0-9A-Za-z]')
+
+
+def backfill_transaction_keys(apps, schema_editor):
+    Payment = apps.get_model('orders', 'Payment')
+    batch = []
+    for payment in Payment.objects.exclude(transaction_id__isnull=True).exclude(transaction_id='').only('id', 'transaction_id').iterator():
+        payment.transaction_key = TRANSACTION_KEY_RE.sub('', payment.transaction_id).upper()
+        batch.append(payment)
+        if len(batch) >= 500:
+            Payment.objects.bulk_update(batch, ['transaction_key'])
+            batch = []
+    if batch:
+        Payment.objects.bulk_update(batch, ['transaction_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0016_statement_reconciliation'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_transaction_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.3 on 2026-10-18 23:05
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def backfill_order_subtotals(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderProduct = apps.get_model('orders', 'OrderProduct')
+
+    totals = (
+        OrderProduct.objects.values('order_id')
+        .annotate(
+            subtotal=models.Sum(
+                models.F('product_price') * models.F('quantity'),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2),
+            ),
+            item_count=models.Sum('quantity'),
+        )
+    )
+    batch = []
+    for row in totals.iterator():
+        batch.append(Order(
+            pk=row['order_id'],
+            subtotal=row['subtotal'] or Decimal("0.00"),
+            item_count=row['item_count'] or 0,
+        ))
+        if len(batch) >= 500:
+            Order.objects.bulk_update(batch, ['subtotal', 'item_count'])
+            batch = []
+    if batch:
+        Order.objects.bulk_update(batch, ['subtotal', 'item_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0019_order_subtotal_item_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_order_subtotals, migrations.RunPython.noop),
+    ]
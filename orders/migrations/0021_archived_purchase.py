@@ -0,0 +1,52 @@
+# Generated by Django 5.2.3 on 2026-10-19 01:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_purchases(apps, schema_editor):
+    """Purchases of orders archived before this table existed, from their snapshots."""
+    ArchivedOrder = apps.get_model('orders', 'ArchivedOrder')
+    ArchivedPurchase = apps.get_model('orders', 'ArchivedPurchase')
+    Product = apps.get_model('store', 'Product')
+    Account = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+
+    bought = []
+    for entry in ArchivedOrder.objects.only('id', 'user_id', 'data').iterator():
+        rows = [line['row']['fields'] for line in entry.data.get('lines', [])]
+        bought += [(entry.pk, row.get('user') or entry.user_id, row.get('product')) for row in rows]
+    products = set(Product.objects.filter(pk__in={p for _, _, p in bought}).values_list('pk', flat=True))
+    users = set(Account.objects.filter(pk__in={u for _, u, _ in bought}).values_list('pk', flat=True))
+    ArchivedPurchase.objects.bulk_create([
+        ArchivedPurchase(archived_order_id=order_id, user_id=user_id, product_id=product_id)
+        for order_id, user_id, product_id in set(bought)
+        if user_id in users and product_id in products
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0020_backfill_order_subtotals'),
+        ('store', '0009_lookup_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPurchase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('archived_order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='purchases', to='orders.archivedorder')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='store.product')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Purchase',
+                'verbose_name_plural': 'Archived Purchases',
+                'indexes': [models.Index(fields=['user', 'product'], name='orders_archpurch_user_prod_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_purchases, migrations.RunPython.noop),
+    ]
@@ -1,14 +1,18 @@
 # orders/models.py
+import re
+from dataclasses import dataclass, field
 from decimal import Decimal
 from django.db import models
 from accounts.models import Account
 from store.models import Product, Variation
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
 from django.conf import settings
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 from django.db import models, transaction
+from core.email_templates import render_email
+from core.mail import build_email, send_email
+from core.singletons import CachedSingletonModel
 
 
 class DeliveryCharge(models.Model):
@@ -36,7 +40,7 @@ class DeliveryCharge(models.Model):
         super().save(*args, **kwargs)
 
 
-class PaymentSettings(models.Model):
+class PaymentSettings(CachedSingletonModel):
     bkash_number = models.CharField(max_length=20, default="01XXXXXXXXX")
     nagad_number = models.CharField(max_length=20, default="01XXXXXXXXX")
     rocket_number = models.CharField(max_length=20, default="01XXXXXXXXX")
@@ -54,6 +58,14 @@ class PaymentSettings(models.Model):
             raise ValueError("Only one PaymentSettings instance is allowed")
         super().save(*args, **kwargs)
 
+    @classmethod
+    def singleton_default(cls):
+        # Placeholder numbers until the shop saves its own in the admin
+        return cls()
+
+
+_TRANSACTION_KEY_RE = re.compile(r'[^0-9A-Za-z]')
+
 
 class Payment(models.Model):
     
@@ -80,10 +92,12 @@ class Payment(models.Model):
     ]
 
     user = models.ForeignKey(Account, on_delete=models.CASCADE, null=True, blank=True)
-    payment_id = models.CharField(max_length=100)
+    payment_id = models.CharField(max_length=100, db_index=True)
     payment_method = models.CharField(max_length=100, choices=PAYMENT_METHOD_CHOICES)
     payment_type = models.CharField(max_length=10, choices=PAYMENT_TYPE_CHOICES, default='FULL')
     transaction_id = models.CharField(max_length=100, blank=True, null=True)
+    # transaction_id upper-cased with separators removed; what statement reconciliation matches on
+    transaction_key = models.CharField(max_length=100, blank=True, db_index=True, editable=False)
     amount_paid = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal("0.00"))
     status = models.CharField(max_length=100, choices=STATUS_CHOICES, default='Pending')
     is_approved = models.BooleanField(default=False)
@@ -104,8 +118,48 @@ class Payment(models.Model):
             # Auto-set status for COD if not already set
             if not self.pk and not self.status:
                 self.status = 'Unpaid'
+        self.transaction_key = self.normalize_transaction_id(self.transaction_id)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'transaction_id' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'transaction_key'}
         super().save(*args, **kwargs)
 
+    @staticmethod
+    def normalize_transaction_id(value) -> str:
+        """'trx-8ab 12cd' and 'TRX8AB12CD' are the same wallet transaction."""
+        return _TRANSACTION_KEY_RE.sub('', value or '').upper()
+
+
+class OrderNumberSequence(models.Model):
+    """Per-day counter used to hand out order numbers before the Order row is inserted."""
+    day = models.DateField(unique=True)
+    last_value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Order Number Sequence"
+        verbose_name_plural = "Order Number Sequences"
+
+    def __str__(self):
+        return f"{self.day:%Y%m%d} → {self.last_value}"
+
+    @staticmethod
+    def format_number(day, value):
+        return f"{day:%Y%m%d}{value:04d}"
+
+    @classmethod
+    def allocate(cls, day=None):
+        """
+        Reserve the next order number for `day` (defaults to today, local time).
+        The counter is bumped with a single UPDATE so concurrent checkouts never
+        receive the same value.
+        """
+        day = day or timezone.localdate()
+        with transaction.atomic():
+            cls.objects.get_or_create(day=day)
+            cls.objects.filter(day=day).update(last_value=models.F('last_value') + 1)
+            value = cls.objects.filter(day=day).values_list('last_value', flat=True).get()
+        return cls.format_number(day, value)
+
 
 class Order(models.Model):
     STATUS = (
@@ -124,7 +178,7 @@ class Order(models.Model):
 
     user = models.ForeignKey(Account, on_delete=models.SET_NULL, null=True)
     payment = models.ForeignKey(Payment, on_delete=models.SET_NULL, blank=True, null=True)
-    order_number = models.CharField(max_length=20)
+    order_number = models.CharField(max_length=20, unique=True, blank=True)
     first_name = models.CharField(max_length=50)
     last_name = models.CharField(max_length=50)
     phone = models.CharField(max_length=15)
@@ -137,6 +191,9 @@ class Order(models.Model):
     order_note = models.CharField(max_length=100, blank=True)
 
     order_total = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal("0.00"))
+    # Sum of the order lines, stored so listings and invoices don't have to read OrderProduct
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal("0.00"))
+    item_count = models.PositiveIntegerField(default=0, help_text="Total quantity across all lines")
     delivery_charge = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal("0.00"))
     collected_amount = models.DecimalField(
         max_digits=10, 
@@ -161,6 +218,14 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Used by the incremental sales rollup refresh
+            models.Index(fields=['updated_at'], name='orders_order_updated_at_idx'),
+            # Customer order history / latest-order lookups
+            models.Index(fields=['user', 'is_ordered', 'created_at'], name='orders_order_user_ordered_idx'),
+        ]
+
     def full_name(self):
         return f'{self.first_name} {self.last_name}'
 
@@ -169,22 +234,31 @@ class Order(models.Model):
         return ' '.join(p.strip() for p in parts if p and p.strip())
 
     def items_subtotal(self):
-        total = Decimal("0.00")
-        for op in self.orderproduct_set.all():
-            total += (op.product_price or Decimal("0.00")) * Decimal(op.quantity or 0)
-        return total
+        return self.subtotal
+
+    def refresh_item_totals(self, commit=True):
+        """Recompute subtotal/item_count from the order lines (one aggregate query)."""
+        totals = self.orderproduct_set.aggregate(
+            subtotal=models.Sum(
+                models.F('product_price') * models.F('quantity'),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2),
+            ),
+            item_count=models.Sum('quantity'),
+        )
+        self.subtotal = totals['subtotal'] or Decimal("0.00")
+        self.item_count = totals['item_count'] or 0
+        if commit:
+            Order.objects.filter(pk=self.pk).update(
+                subtotal=self.subtotal,
+                item_count=self.item_count,
+                updated_at=timezone.now(),
+            )
+        return self.subtotal
 
     def get_delivery_charge(self):
         """Calculate delivery charge based on district (state field)."""
-        try:
-            dc = DeliveryCharge.objects.get(district__iexact=(self.state or "").strip())
-            return dc.charge
-        except DeliveryCharge.DoesNotExist:
-            try:
-                default_dc = DeliveryCharge.objects.get(is_default=True)
-                return default_dc.charge
-            except DeliveryCharge.DoesNotExist:
-                return Decimal("150.00")
+        from .delivery import charge_for_district
+        return charge_for_district(self.state)
 
     def calculate_collected_amount(self):
         if not self.payment:
@@ -203,14 +277,15 @@ class Order(models.Model):
 
     def update_totals(self, commit=True):
         self.delivery_charge = self.get_delivery_charge()
-        sub_total = self.items_subtotal()
-        self.order_total = (sub_total + (self.delivery_charge or Decimal("0.00")))
+        self.order_total = (self.subtotal + (self.delivery_charge or Decimal("0.00")))
         self.collected_amount = self.calculate_collected_amount()
         if commit:
             self.save(update_fields=["delivery_charge", "order_total", "collected_amount"])
         return self.order_total
 
     def save(self, *args, **kwargs):
+        if not self.order_number:
+            self.order_number = OrderNumberSequence.allocate()
         self.delivery_charge = self.get_delivery_charge()
         district_norm = (self.state or "").strip().lower()
         self.requires_advance = bool(district_norm and district_norm != 'dhaka')
@@ -234,11 +309,17 @@ class Order(models.Model):
             self.collected_amount = new_collected
             Order.objects.filter(pk=self.pk).update(collected_amount=new_collected)
 
-        # Send email AFTER successful save if status changed
+        # Record the transition and send email AFTER successful save if status changed
         if status_changed:
+            OrderStatusHistory.objects.create(
+                order=self,
+                from_status=old.status,
+                to_status=self.status,
+                notified=True,
+            )
             self.send_status_update_email()
             
-    def send_status_update_email(self):
+    def build_status_update_email(self):
         subject = f'Order {self.order_number} Status Update'
         context = {
             'order': self,
@@ -246,17 +327,17 @@ class Order(models.Model):
             'domain': getattr(settings, 'SITE_URL', 'https://yourdomain.com'),
             'now': timezone.now(),
         }
-        html_body = render_to_string('orders/order_status_email.html', context)
-        text_body = strip_tags(html_body)
+        html_body, text_body = render_email('orders/order_status_email', context)
 
-        msg = EmailMultiAlternatives(
+        return build_email(
             subject=subject,
-            body=text_body,
+            html_body=html_body,
+            text_body=text_body,
             to=[self.email],
-            from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', None),
         )
-        msg.attach_alternative(html_body, "text/html")
-        msg.send()
+
+    def send_status_update_email(self):
+        send_email(self.build_status_update_email())
 
     def __str__(self):
         return f"Order {self.order_number} ({self.full_name()})"
@@ -365,4 +446,239 @@ class OrderProduct(models.Model):
     
     class Meta:
         verbose_name = 'Order Product'
-        verbose_name_plural = 'Order Products'
\ No newline at end of file
+        verbose_name_plural = 'Order Products'
+        indexes = [
+            models.Index(fields=['updated_at'], name='orders_op_updated_at_idx'),
+            # product_detail's "has this user purchased it" check
+            models.Index(fields=['user', 'product'], name='orders_op_user_product_idx'),
+        ]
+
+
+class OrderStatusJob(models.Model):
+    """A bulk status change requested from the admin; notifications are sent in the background."""
+    STATE_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    target_status = models.CharField(max_length=10)
+    requested_by = models.ForeignKey(Account, on_delete=models.SET_NULL, null=True, blank=True)
+    total = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    state = models.CharField(max_length=10, choices=STATE_CHOICES, default='queued')
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Order Status Job'
+        verbose_name_plural = 'Order Status Jobs'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Set {self.total} order(s) to {self.target_status} ({self.get_state_display()})"
+
+    @property
+    def progress_percent(self) -> int:
+        if not self.total:
+            return 100
+        return int(((self.sent + self.failed) * 100) / self.total)
+
+
+class OrderStatusHistory(models.Model):
+    """Append-only log of order status transitions."""
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='status_history')
+    job = models.ForeignKey(OrderStatusJob, on_delete=models.SET_NULL, null=True, blank=True, related_name='transitions')
+    from_status = models.CharField(max_length=10, blank=True)
+    to_status = models.CharField(max_length=10)
+    changed_by = models.ForeignKey(Account, on_delete=models.SET_NULL, null=True, blank=True)
+    notified = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Order Status History'
+        verbose_name_plural = 'Order Status History'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['order', 'created_at'], name='orders_hist_order_created_idx'),
+            models.Index(fields=['job', 'notified'], name='orders_hist_job_notified_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.order.order_number}: {self.from_status or '—'} → {self.to_status}"
+
+
+class StatementImport(models.Model):
+    """One uploaded bKash/Nagad/Rocket statement and the outcome of reconciling it."""
+    PROVIDER_CHOICES = (
+        ('BKASH', 'Bkash'),
+        ('NAGAD', 'Nagad'),
+        ('ROCKET', 'Rocket'),
+    )
+
+    provider = models.CharField(max_length=10, choices=PROVIDER_CHOICES)
+    file_name = models.CharField(max_length=255, blank=True)
+    uploaded_by = models.ForeignKey(Account, on_delete=models.SET_NULL, null=True, blank=True)
+    approve_matches = models.BooleanField(default=True)
+    total_rows = models.PositiveIntegerField(default=0)
+    matched = models.PositiveIntegerField(default=0)
+    approved = models.PositiveIntegerField(default=0)
+    amount_mismatches = models.PositiveIntegerField(default=0)
+    duplicates = models.PositiveIntegerField(default=0)
+    unmatched = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Statement Import'
+        verbose_name_plural = 'Statement Imports'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_provider_display()} statement {self.file_name or self.pk}"
+
+
+class StatementLine(models.Model):
+    """A single statement row and what it was matched to."""
+    RESULT_CHOICES = (
+        ('matched', 'Matched'),
+        ('already_approved', 'Already approved'),
+        ('amount_mismatch', 'Amount mismatch'),
+        ('duplicate', 'Duplicate'),
+        ('unmatched', 'No matching payment'),
+        ('invalid', 'Unreadable row'),
+    )
+
+    statement = models.ForeignKey(StatementImport, on_delete=models.CASCADE, related_name='lines')
+    row_number = models.PositiveIntegerField()
+    transaction_id = models.CharField(max_length=100, blank=True)
+    amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    payment = models.ForeignKey(Payment, on_delete=models.SET_NULL, null=True, blank=True)
+    result = models.CharField(max_length=20, choices=RESULT_CHOICES)
+    note = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        verbose_name = 'Statement Line'
+        verbose_name_plural = 'Statement Lines'
+        ordering = ['statement', 'row_number']
+        indexes = [
+            models.Index(fields=['statement', 'result'], name='orders_stline_result_idx'),
+        ]
+
+    def __str__(self):
+        return f"Row {self.row_number}: {self.transaction_id or '—'} ({self.get_result_display()})"
+
+
+@dataclass
+class OrderLine:
+    """
+    One line of an invoice as the order pages show it; built from a live
+    OrderProduct or from an archived order's snapshot.
+    `variations` holds {'variation_category': ..., 'variation_value': ...} dicts.
+    """
+    product_name: str
+    quantity: int
+    product_price: Decimal
+    variations: list = field(default_factory=list)
+
+    @classmethod
+    def from_order_product(cls, line):
+        """From an OrderProduct loaded with its product and (prefetched) variations."""
+        return cls(
+            product_name=line.product.product_name if line.product_id else '',
+            quantity=line.quantity,
+            product_price=line.product_price,
+            variations=[
+                {'variation_category': v.variation_category, 'variation_value': v.variation_value}
+                for v in line.variations.all()
+            ],
+        )
+
+
+class ArchivedOrder(models.Model):
+    """
+    A finished order moved out of the live Order/OrderProduct/Payment tables by
+    orders.archive. The full rows are kept in `data`; the columns are what the
+    customer history, the admin and the sales rollups filter on.
+    """
+    original_id = models.PositiveIntegerField(unique=True)
+    order_number = models.CharField(max_length=20, unique=True)
+    user = models.ForeignKey(Account, on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.CharField(max_length=10)
+    first_name = models.CharField(max_length=50)
+    last_name = models.CharField(max_length=50)
+    phone = models.CharField(max_length=15)
+    email = models.CharField(max_length=50)
+    state = models.CharField(max_length=50)
+    payment_method = models.CharField(max_length=100, blank=True)
+    order_total = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal("0.00"))
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+
+    class Meta:
+        verbose_name = 'Archived Order'
+        verbose_name_plural = 'Archived Orders'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='orders_arch_user_created_idx'),
+            models.Index(fields=['created_at'], name='orders_arch_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.order_number} (archived)"
+
+    def full_name(self):
+        return f'{self.first_name} {self.last_name}'
+
+    def as_order(self):
+        """Unsaved Order (with its payment attached) rebuilt from the snapshot."""
+        order = _restore(Order, self.data['order'])
+        order.payment = _restore(Payment, self.data['payment']) if self.data.get('payment') else None
+        return order
+
+    def as_order_lines(self):
+        """The order's lines as OrderLine entries, from the snapshot; no queries."""
+        lines = []
+        for entry in self.data.get('lines', []):
+            row = entry['row']['fields']
+            lines.append(OrderLine(
+                product_name=entry.get('product_name', ''),
+                quantity=row['quantity'],
+                product_price=Decimal(str(row['product_price'])),
+                variations=[
+                    {'variation_category': v['variation_category'], 'variation_value': v['variation_value']}
+                    for v in entry.get('variations', [])
+                ],
+            ))
+        return lines
+
+
+class ArchivedPurchase(models.Model):
+    """
+    Which products a customer bought in an archived order, so "has this customer
+    bought it" (product reviews) stays an indexed lookup once OrderProduct rows are gone.
+    """
+    archived_order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='purchases')
+    user = models.ForeignKey(Account, on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+
+    class Meta:
+        verbose_name = 'Archived Purchase'
+        verbose_name_plural = 'Archived Purchases'
+        indexes = [
+            models.Index(fields=['user', 'product'], name='orders_archpurch_user_prod_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} bought {self.product_id} ({self.archived_order_id})"
+
+
+def _restore(model, record):
+    obj = next(serializers.deserialize('python', [record], ignorenonexistent=True)).object
+    if not isinstance(obj, model):
+        raise ValueError(f"Archived record is a {type(obj).__name__}, expected {model.__name__}")
+    return obj
+
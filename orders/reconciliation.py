@@ -0,0 +1,180 @@
+# orders/reconciliation.py
+import csv
+import io
+import logging
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from .models import Payment, StatementImport, StatementLine
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_BATCH_SIZE = 500
+
+# Header spellings seen in bKash / Nagad / Rocket merchant statements, normalized
+# (lower-case, letters and digits only).
+TRANSACTION_ID_HEADERS = ('trxid', 'transactionid', 'txnid', 'trxnid', 'txid', 'transactionno', 'trxno')
+AMOUNT_HEADERS = ('amount', 'transactionamount', 'amountbdt', 'amounttk', 'creditamount', 'credit', 'receivedamount')
+
+_HEADER_RE = re.compile(r'[^a-z0-9]')
+_AMOUNT_RE = re.compile(r'-?\d[\d,]*(?:\.\d+)?')
+
+
+class StatementFormatError(ValueError):
+    """The uploaded file has no recognisable transaction ID / amount columns."""
+
+
+def reconcile_statement(fileobj, provider, *, user=None, file_name='', approve=True,
+                        batch_size=RECONCILE_BATCH_SIZE):
+    """
+    Match a provider statement CSV against wallet payments and record the outcome.
+
+    The file is read row by row and looked up `batch_size` rows at a time through
+    the indexed Payment.transaction_key column, so each batch costs one SELECT and
+    one INSERT. Rows are classified as matched, already approved, amount mismatch,
+    duplicate (repeated in the statement, or shared by several payments),
+    unmatched or invalid. When `approve` is set, every matched payment is approved
+    with a single UPDATE at the end.
+    Returns the StatementImport.
+    """
+    rows = _iter_statement_rows(_as_text(fileobj))
+
+    with transaction.atomic():
+        statement = StatementImport.objects.create(
+            provider=provider,
+            file_name=file_name[:255],
+            uploaded_by=user if getattr(user, 'is_authenticated', False) else None,
+            approve_matches=approve,
+        )
+        counts = {result: 0 for result, _ in StatementLine.RESULT_CHOICES}
+        seen_keys = set()
+
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                _reconcile_batch(statement, provider, batch, seen_keys, counts)
+                batch = []
+        if batch:
+            _reconcile_batch(statement, provider, batch, seen_keys, counts)
+
+        approved = 0
+        if approve and counts['matched']:
+            matched_payments = StatementLine.objects.filter(
+                statement=statement, result='matched',
+            ).values('payment_id')
+            approved = Payment.objects.filter(pk__in=matched_payments).update(
+                is_approved=True,
+                status='Approved',
+            )
+
+        statement.total_rows = sum(counts.values())
+        statement.matched = counts['matched']
+        statement.approved = approved
+        statement.amount_mismatches = counts['amount_mismatch']
+        statement.duplicates = counts['duplicate']
+        statement.unmatched = counts['unmatched'] + counts['invalid']
+        statement.save()
+
+    logger.info(
+        f"Reconciled {statement.total_rows} {provider} statement rows: "
+        f"{statement.matched} matched, {approved} approved, {statement.amount_mismatches} amount mismatches, "
+        f"{statement.duplicates} duplicates, {statement.unmatched} unmatched"
+    )
+    return statement
+
+
+def _reconcile_batch(statement, provider, batch, seen_keys, counts):
+    keys = {key for _, _, key, _ in batch if key}
+    payments_by_key = {}
+    for payment in (
+        Payment.objects
+        .filter(transaction_key__in=keys, payment_method=provider)
+        .only('id', 'transaction_key', 'amount_paid', 'is_approved')
+    ):
+        payments_by_key.setdefault(payment.transaction_key, []).append(payment)
+
+    lines = []
+    for row_number, raw_id, key, amount in batch:
+        line = StatementLine(statement=statement, row_number=row_number, transaction_id=raw_id[:100], amount=amount)
+        candidates = payments_by_key.get(key, [])
+
+        if not key or amount is None:
+            line.result, line.note = 'invalid', 'Missing transaction ID or amount'
+        elif key in seen_keys:
+            line.result, line.note = 'duplicate', 'Transaction ID appears more than once in the statement'
+        elif not candidates:
+            line.result = 'unmatched'
+        elif len(candidates) > 1:
+            line.result = 'duplicate'
+            line.note = f"{len(candidates)} payments use this transaction ID: " + ', '.join(str(p.pk) for p in candidates)
+        else:
+            payment = candidates[0]
+            line.payment = payment
+            if payment.amount_paid != amount:
+                line.result = 'amount_mismatch'
+                line.note = f"Statement {amount}, payment {payment.amount_paid}"
+            elif payment.is_approved:
+                line.result = 'already_approved'
+            else:
+                line.result = 'matched'
+
+        if key:
+            seen_keys.add(key)
+        counts[line.result] += 1
+        lines.append(line)
+
+    StatementLine.objects.bulk_create(lines)
+
+
+def _as_text(fileobj):
+    """Text view of an uploaded or opened file without reading it into memory."""
+    if isinstance(fileobj, io.TextIOBase):
+        return fileobj
+    raw = getattr(fileobj, 'file', fileobj)  # Django UploadedFile wraps the real file
+    return io.TextIOWrapper(raw, encoding='utf-8-sig', errors='replace', newline='')
+
+
+def _iter_statement_rows(text):
+    """
+    Yield (row_number, raw_transaction_id, transaction_key, amount) per data row.
+    Statements often start with a few lines of account details; everything before
+    the first row containing both a transaction ID and an amount header is skipped.
+    """
+    reader = csv.reader(text)
+    id_col = amount_col = None
+    for row in reader:
+        headers = [_HEADER_RE.sub('', cell.lower()) for cell in row]
+        id_col = _find_column(headers, TRANSACTION_ID_HEADERS)
+        amount_col = _find_column(headers, AMOUNT_HEADERS)
+        if id_col is not None and amount_col is not None:
+            break
+    else:
+        raise StatementFormatError("Could not find a transaction ID and amount column in the statement")
+
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        raw_id = row[id_col].strip() if id_col < len(row) else ''
+        raw_amount = row[amount_col] if amount_col < len(row) else ''
+        yield reader.line_num, raw_id, Payment.normalize_transaction_id(raw_id), _parse_amount(raw_amount)
+
+
+def _find_column(headers, candidates):
+    for candidate in candidates:
+        if candidate in headers:
+            return headers.index(candidate)
+    return None
+
+
+def _parse_amount(value):
+    # "৳1,250.00", "Tk. 500", "500 BDT"
+    match = _AMOUNT_RE.search(value or '')
+    if not match:
+        return None
+    try:
+        return Decimal(match.group(0).replace(',', '')).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        return None
@@ -0,0 +1,226 @@
+# orders/services.py
+import hashlib
+import logging
+import threading
+
+from django.core.cache import cache
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from core.mail import send_bulk
+from core.pagination import decode_cursor, encode_cursor, keyset_paginate
+from .models import ArchivedOrder, ArchivedPurchase, Order, OrderLine, OrderProduct, OrderStatusHistory, OrderStatusJob
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_BATCH_SIZE = 50
+
+# Orders in these states never change again, so their rendered pages can be cached.
+TERMINAL_STATUSES = ('Completed', 'Cancelled')
+ORDER_RENDER_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+# Payment fields shown on cached order pages
+RENDERED_PAYMENT_FIELDS = ('status', 'is_approved', 'payment_method', 'payment_type', 'transaction_id', 'amount_paid')
+
+
+def bulk_transition(queryset, status_value, user=None):
+    """
+    Move every order in `queryset` to `status_value`.
+
+    Status is written with a single UPDATE, each transition is recorded in
+    OrderStatusHistory, and customer emails are handed to a background sender.
+    Returns the OrderStatusJob tracking the notifications (or None if nothing changed).
+    """
+    with transaction.atomic():
+        changes = list(
+            queryset.exclude(status=status_value).values_list('id', 'status')
+        )
+        if not changes:
+            return None
+
+        order_ids = [order_id for order_id, _ in changes]
+        Order.objects.filter(pk__in=order_ids).update(
+            status=status_value,
+            updated_at=timezone.now(),
+        )
+
+        job = OrderStatusJob.objects.create(
+            target_status=status_value,
+            requested_by=user if getattr(user, 'is_authenticated', False) else None,
+            total=len(changes),
+        )
+        OrderStatusHistory.objects.bulk_create([
+            OrderStatusHistory(
+                order_id=order_id,
+                job=job,
+                from_status=old_status or '',
+                to_status=status_value,
+                changed_by=job.requested_by,
+            )
+            for order_id, old_status in changes
+        ])
+
+        transaction.on_commit(lambda: start_notification_worker(job.pk))
+
+    return job
+
+
+def resume_notification_job(job, background=True):
+    """
+    Send the notifications a job has not sent yet, e.g. after a restart killed
+    its worker thread and left it queued or running. Returns how many are left
+    to send; 0 (nothing started) for a job that has none.
+    """
+    remaining = OrderStatusHistory.objects.filter(job=job, notified=False).count()
+    if not remaining:
+        if job.state != 'done':
+            OrderStatusJob.objects.filter(pk=job.pk).update(state='done', finished_at=timezone.now())
+        return 0
+    with transaction.atomic():
+        OrderStatusJob.objects.filter(pk=job.pk).update(state='queued', error_message='', finished_at=None)
+        if background:
+            transaction.on_commit(lambda: start_notification_worker(job.pk))
+    return remaining
+
+
+def start_notification_worker(job_id):
+    """Send a job's status emails on a daemon thread so the admin request returns immediately."""
+    worker = threading.Thread(
+        target=send_job_notifications,
+        args=(job_id,),
+        name=f'order-status-job-{job_id}',
+        daemon=True,
+    )
+    worker.start()
+    return worker
+
+
+def send_job_notifications(job_id, batch_size=NOTIFICATION_BATCH_SIZE):
+    """Drain the pending notifications of a job in batches, updating its progress counters."""
+    close_old_connections()
+    try:
+        OrderStatusJob.objects.filter(pk=job_id).update(state='running')
+        pending = OrderStatusHistory.objects.filter(job_id=job_id, notified=False)
+
+        while True:
+            batch = list(pending.select_related('order').order_by('id')[:batch_size])
+            if not batch:
+                break
+
+            sent, failed, outgoing = [], [], []
+            for entry in batch:
+                try:
+                    outgoing.append((entry.pk, entry.order.build_status_update_email()))
+                except Exception:
+                    logger.exception(f"Could not render status email for order {entry.order.order_number}")
+                    failed.append(entry.pk)
+
+            # One mail connection per batch instead of one per order.
+            failures = send_bulk([msg for _, msg in outgoing], fail_silently=True)
+            failed_messages = {id(msg) for msg, _ in failures}
+            for entry_pk, msg in outgoing:
+                (failed if id(msg) in failed_messages else sent).append(entry_pk)
+
+            # Failed rows are marked as handled too; they are counted on the job instead of retried.
+            OrderStatusHistory.objects.filter(pk__in=sent + failed).update(notified=True)
+            OrderStatusJob.objects.filter(pk=job_id).update(
+                sent=F('sent') + len(sent),
+                failed=F('failed') + len(failed),
+            )
+
+        OrderStatusJob.objects.filter(pk=job_id).update(state='done', finished_at=timezone.now())
+    except Exception as e:
+        logger.exception(f"Order status job {job_id} aborted")
+        OrderStatusJob.objects.filter(pk=job_id).update(
+            state='failed',
+            error_message=str(e),
+            finished_at=timezone.now(),
+        )
+    finally:
+        connection.close()
+
+
+# ---------------------------
+# Customer order history
+# ---------------------------
+def paginate_orders(queryset, cursor=None, page_size=10):
+    """Orders newest first, one keyset page at a time (see core.pagination)."""
+    return keyset_paginate(queryset, cursor=cursor, page_size=page_size)
+
+
+def paginate_customer_orders(user, cursor=None, page_size=10):
+    """
+    A customer's placed orders, live and archived, newest first.
+    Both tables are read with the same keyset window and merged, so archived
+    orders appear in history exactly where they used to. Archived entries are
+    returned as unsaved Order instances.
+    """
+    live, live_cursor = paginate_orders(
+        Order.objects.filter(user=user, is_ordered=True).select_related('payment'),
+        cursor=cursor,
+        page_size=page_size,
+    )
+    archived = ArchivedOrder.objects.filter(user=user).order_by('-created_at', '-original_id')
+    position = decode_cursor(cursor)
+    if position:
+        created_at, pk = position
+        archived = archived.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, original_id__lt=pk))
+    archived = [entry.as_order() for entry in archived[:page_size + 1]]
+
+    if not archived:
+        return live, live_cursor
+
+    # live_cursor only tells us whether there were more live rows than the page.
+    merged = sorted(live + archived, key=lambda o: (o.created_at, o.pk), reverse=True)
+    has_more = live_cursor is not None or len(merged) > page_size
+    page = merged[:page_size]
+    return page, encode_cursor(page[-1]) if has_more and page else None
+
+
+def has_purchased(user, product_id):
+    """Whether `user` has ordered the product, in a live or an archived order."""
+    return (
+        OrderProduct.objects.filter(user=user, product_id=product_id).exists()
+        or ArchivedPurchase.objects.filter(user=user, product_id=product_id).exists()
+    )
+
+
+def load_order_lines(order):
+    """The order's lines as OrderLine entries: two queries however many lines there are."""
+    return [
+        OrderLine.from_order_product(line)
+        for line in OrderProduct.objects.filter(order=order)
+        .select_related('product')
+        .prefetch_related('variations')
+        .order_by('id')
+    ]
+
+
+def order_render_cache_key(order, fragment):
+    """
+    Changes when the order is saved and when anything the page shows about its
+    payment changes: approving or refunding a payment only writes the Payment row.
+    """
+    payment = order.payment if order.payment_id else None
+    payment_state = '|'.join(str(getattr(payment, field)) for field in RENDERED_PAYMENT_FIELDS) if payment else ''
+    payment_version = hashlib.md5(payment_state.encode()).hexdigest()[:12]
+    return f"order-render:{fragment}:{order.pk}:{int(order.updated_at.timestamp())}:{payment_version}"
+
+
+def render_order_fragment(order, template_name, build_context):
+    """
+    Render `template_name` for an order. Completed/Cancelled orders are served from
+    the cache, so `build_context` (which loads the lines) only runs on a miss.
+    """
+    if order.status not in TERMINAL_STATUSES:
+        return render_to_string(template_name, build_context())
+
+    key = order_render_cache_key(order, template_name)
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string(template_name, build_context())
+        cache.set(key, str(html), ORDER_RENDER_CACHE_TIMEOUT)
+    return mark_safe(html)
+
@@ -1,3 +1,478 @@
-from django.test import TestCase
+# orders/tests.py
+import csv
+import io
+from datetime import date, datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.address_book import remember_address
+from carts import pricing
+from carts.models import CartItem
+from core.mail import send_bulk
+from core.testing import QueryPlanTestMixin, create_customer, create_order, create_product
+from orders.archive import archive_batch
+from orders.delivery import charge_for_district, delivery_charge_version
+from orders.models import (
+    ArchivedOrder, DeliveryCharge, Order, OrderNumberSequence, OrderProduct, OrderStatusJob, Payment, PaymentSettings,
+)
+from orders.reconciliation import StatementFormatError, reconcile_statement
+from orders.services import (
+    bulk_transition, has_purchased, load_order_lines, paginate_customer_orders, resume_notification_job,
+    send_job_notifications,
+)
+from store.models import Product
+
+
+class CheckoutQueryPlanTests(QueryPlanTestMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_customer()
+        cls.product = create_product()
+        cls.payment = Payment.objects.create(user=cls.user, payment_id='PAY-1', payment_method='COD',
+                                             status='Pending')
+        cls.order = Order.objects.create(user=cls.user, payment=cls.payment, first_name='Test',
+                                         last_name='Customer', phone='01700000000',
+                                         email='customer@example.com', address_line_1='Road 1',
+                                         country='Bangladesh', state='Dhaka', order_total=650,
+                                         delivery_charge=150, is_ordered=True)
+        OrderProduct.objects.create(order=cls.order, payment=cls.payment, user=cls.user,
+                                    product=cls.product, quantity=1, product_price=500, ordered=True)
+
+    def setUp(self):
+        CartItem.objects.create(user=self.user, product=self.product, quantity=1)
+        self.client.force_login(self.user)
+
+    def test_checkout(self):
+        response = self.assertNoFullScans(self.client.get, reverse('orders:checkout'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_payments_page(self):
+        session = self.client.session
+        session['checkout_data'] = {
+            'first_name': 'Test', 'last_name': 'Customer', 'phone': '01700000000',
+            'email': 'customer@example.com', 'address_line_1': 'Road 1', 'country': 'Bangladesh',
+            'state': 'Dhaka', 'area': '', 'address_line_2': '', 'order_note': '',
+        }
+        session.save()
+        response = self.assertNoFullScans(self.client.get, reverse('orders:payments'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_order_complete(self):
+        session = self.client.session
+        session['order_number'] = self.order.order_number
+        session['payment_id'] = self.payment.payment_id
+        session.save()
+        response = self.assertNoFullScans(self.client.get, reverse('orders:order_complete'))
+        self.assertEqual(response.status_code, 200)
+
+
+class OrderNumberTests(TestCase):
+
+    def test_allocate_counts_per_day(self):
+        day = date(2026, 10, 18)
+        self.assertEqual([OrderNumberSequence.allocate(day) for _ in range(3)],
+                         ['202610180001', '202610180002', '202610180003'])
+        self.assertEqual(OrderNumberSequence.allocate(day + timedelta(days=1)), '202610190001')
+        self.assertEqual(OrderNumberSequence.allocate(day), '202610180004')
+
+    def test_new_orders_roll_over_at_midnight(self):
+        with mock.patch('orders.models.timezone.localdate', return_value=date(2026, 10, 18)):
+            first = create_order()
+            second = create_order()
+        with mock.patch('orders.models.timezone.localdate', return_value=date(2026, 10, 19)):
+            third = create_order()
+        self.assertEqual([first.order_number, second.order_number, third.order_number],
+                         ['202610180001', '202610180002', '202610190001'])
+
+
+class OrderNumberBackfillTests(TransactionTestCase):
+    migrate_from = [('orders', '0010_ordernumbersequence')]
+    migrate_to = [('orders', '0012_alter_order_order_number')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_backfill_renumbers_duplicates_before_unique_index(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        OldOrder = executor.loader.project_state(self.migrate_from).apps.get_model('orders', 'Order')
+
+        def old_order(number, created):
+            order = OldOrder.objects.create(order_number=number, first_name='Test', last_name='Customer',
+                                            phone='01700000000', email='customer@example.com',
+                                            address_line_1='Road 1', country='Bangladesh', state='Dhaka')
+            OldOrder.objects.filter(pk=order.pk).update(created_at=created)
+            return order.pk
+
+        oct_18 = timezone.make_aware(datetime(2026, 10, 18, 12))
+        ids = [
+            old_order('202610180007', oct_18),
+            old_order('202610180007', oct_18),  # duplicate
+            old_order('', oct_18),  # placeholder
+            old_order('ORD-1', oct_18 - timedelta(days=1)),  # not a dated number
+        ]
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+        numbers = dict(Order.objects.values_list('pk', 'order_number'))
+        self.assertEqual([numbers[pk] for pk in ids],
+                         ['202610180007', '202610180008', '202610180009', '202610170001'])
+        # New orders continue after the backfilled numbers
+        self.assertEqual(OrderNumberSequence.allocate(date(2026, 10, 18)), '202610180010')
+        self.assertEqual(OrderNumberSequence.allocate(date(2026, 10, 17)), '202610170002')
+
+
+class BulkTransitionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = create_customer('staff', is_staff=True)
+        cls.orders = [create_order(status=status) for status in ('New', 'New', 'Accept', 'Completed')]
+
+    def test_single_update_and_history(self):
+        with CaptureQueriesContext(connection) as queries:
+            job = bulk_transition(Order.objects.all(), 'Completed', user=self.staff)
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "orders_order"')]
+        self.assertEqual(len(updates), 1)
+
+        self.assertEqual((job.total, job.state, job.requested_by), (3, 'queued', self.staff))
+        self.assertEqual(set(Order.objects.values_list('status', flat=True)), {'Completed'})
+        history = job.transitions.order_by('order_id').values_list('order_id', 'from_status', 'to_status', 'notified')
+        self.assertEqual(list(history), [(order.pk, order.status, 'Completed', False) for order in self.orders[:3]])
+        self.assertIsNone(bulk_transition(Order.objects.all(), 'Completed'))
+
+    def test_notifications_are_sent_in_batches(self):
+        job = bulk_transition(Order.objects.all(), 'Cancelled')
+        with mock.patch('orders.services.send_bulk', wraps=send_bulk) as sender:
+            send_job_notifications(job.pk, batch_size=3)
+        self.assertEqual([len(call.args[0]) for call in sender.call_args_list], [3, 1])
+        self.assertEqual(len(mail.outbox), 4)
+        job.refresh_from_db()
+        self.assertEqual((job.sent, job.failed, job.state), (4, 0, 'done'))
+        self.assertFalse(job.transitions.filter(notified=False).exists())
+
+    def test_resume_stuck_job(self):
+        job = bulk_transition(Order.objects.all(), 'Cancelled')
+        # The worker sent one batch, then the process restarted
+        OrderStatusJob.objects.filter(pk=job.pk).update(state='running')
+        job.transitions.filter(pk__in=job.transitions.order_by('id').values('pk')[:2]).update(notified=True)
+
+        with mock.patch('orders.services.start_notification_worker') as start:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(resume_notification_job(job), 2)
+        start.assert_called_once_with(job.pk)
+        send_job_notifications(job.pk)
+        self.assertEqual(len(mail.outbox), 2)
+        job.refresh_from_db()
+        self.assertEqual(job.state, 'done')
+        self.assertEqual(resume_notification_job(job), 0)
+
+
+class OrderPageCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_customer()
+        cls.payment = Payment.objects.create(user=cls.user, payment_id='PAY-1', payment_method='BKASH',
+                                             payment_type='FULL', transaction_id='TRX1', status='Unpaid')
+        cls.order = create_order(cls.user, payment=cls.payment, status='Completed', order_total=650)
+
+    def test_payment_change_refreshes_cached_invoice(self):
+        self.client.force_login(self.user)
+        url = reverse('order_detail', args=[self.order.order_number])
+        self.assertContains(self.client.get(url), 'Unpaid')
+
+        # The admin's approve action only updates the payment row
+        Payment.objects.filter(pk=self.payment.pk).update(status='Paid (Full)', is_approved=True)
+        response = self.client.get(url)
+        self.assertContains(response, 'Paid (Full)')
+        self.assertNotContains(response, 'Unpaid')
+
+
+class DeliveryChargeTableTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dhaka = DeliveryCharge.objects.create(district='Dhaka', charge=70)
+        DeliveryCharge.objects.create(district='Default', charge=130, is_default=True)
+
+    def test_versioned_url_is_immutable(self):
+        version = delivery_charge_version()
+        response = self.client.get(reverse('orders:delivery_charges', args=[version]))
+        self.assertEqual(response.json(), {'version': version, 'default': '130.00', 'charges': {'Dhaka': '70.00'}})
+        self.assertEqual(response['ETag'], f'"{version}"')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+
+        latest = self.client.get(reverse('orders:delivery_charges_latest'))
+        self.assertEqual(latest.json()['version'], version)
+        self.assertNotIn('immutable', latest['Cache-Control'])
+
+    def test_matching_etag_is_not_modified(self):
+        version = delivery_charge_version()
+        for url in (reverse('orders:delivery_charges', args=[version]), reverse('orders:delivery_charges_latest')):
+            with self.subTest(url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=f'"{version}"')
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], f'"{version}"')
+                self.assertEqual(response.content, b'')
+        self.assertEqual(self.client.get(reverse('orders:delivery_charges_latest'),
+                                         HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_edit_changes_version_and_old_url_redirects(self):
+        old = delivery_charge_version()
+        self.dhaka.charge = 80
+        self.dhaka.save()
+        new = delivery_charge_version()
+        self.assertNotEqual(new, old)
+
+        response = self.client.get(reverse('orders:delivery_charges', args=[old]))
+        self.assertRedirects(response, reverse('orders:delivery_charges', args=[new]))
+        self.assertEqual(self.client.get(response['Location']).json()['charges'], {'Dhaka': '80.00'})
+        self.assertEqual(charge_for_district(' dhaka '), 80)
+        self.assertEqual(charge_for_district('Sylhet'), 130)
+
+
+class ExportOrdersCommandTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = create_customer()
+        product = create_product()
+        for number, created in [('202610140001', datetime(2026, 10, 14, 23)), ('202610150001', datetime(2026, 10, 15, 23))]:
+            order = create_order(user, order_number=number, status='Completed')
+            OrderProduct.objects.create(order=order, user=user, product=product, quantity=2,
+                                        product_price=500, ordered=True)
+            Order.objects.filter(pk=order.pk).update(created_at=timezone.make_aware(created))
+
+    def test_csv_to_stdout(self):
+        out = io.StringIO()
+        call_command('export_orders', '--from', '2026-10-15', '--to', '2026-10-15', stdout=out)
+        rows = list(csv.DictReader(io.StringIO(out.getvalue().lstrip('\ufeff'))))
+        self.assertEqual([(row['Order number'], row['Product'], row['Quantity']) for row in rows],
+                         [('202610150001', 'Test Shirt', '2')])
+
+    def test_bad_date_is_a_usage_error(self):
+        with self.assertRaisesMessage(CommandError, "argument --from: invalid date '15-10-2026'"):
+            call_command('export_orders', '--from', '15-10-2026')
+
+
+class StatementReconciliationTests(TestCase):
+    STATEMENT = (
+        'Merchant statement,Khalab\n'
+        'Period,01/10/2026 - 18/10/2026\n'
+        'Date,TrxID,Amount (BDT)\n'
+        '2026-10-02,trx-aa11,"1,250.00"\n'  # matches TRXAA11
+        '2026-10-02,TRXBB22,৳ 500\n'  # wrong amount
+        '2026-10-03,TRXCC33,650\n'  # already approved
+        '2026-10-03,TRXDD44,300\n'  # two payments claim it
+        '2026-10-04,TRXAA11,1250\n'  # repeated in the statement
+        '2026-10-04,TRXZZ99,100\n'  # no such payment
+        '2026-10-05,,100\n'
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        user = create_customer()
+
+        def payment(transaction_id, amount, method='BKASH', **extra):
+            return Payment.objects.create(user=user, payment_id=f'PAY-{transaction_id}-{method}', payment_method=method,
+                                          transaction_id=transaction_id, amount_paid=amount, **extra)
+
+        cls.match = payment('TRXAA11', 1250)
+        cls.mismatch = payment('TRXBB22', 550)
+        cls.approved = payment('TRXCC33', 650, is_approved=True, status='Approved')
+        cls.twins = [payment('TRXDD44', 300), payment('trx dd44', 300)]
+        cls.other_provider = payment('TRXZZ99', 100, method='NAGAD')
+
+    def reconcile(self, **kwargs):
+        return reconcile_statement(io.StringIO(self.STATEMENT), 'BKASH', file_name='statement.csv', **kwargs)
+
+    def test_classifies_every_row(self):
+        statement = self.reconcile(approve=False, batch_size=3)
+        results = list(statement.lines.values_list('row_number', 'result', 'payment_id'))
+        self.assertEqual(results, [
+            (4, 'matched', self.match.pk),
+            (5, 'amount_mismatch', self.mismatch.pk),
+            (6, 'already_approved', self.approved.pk),
+            (7, 'duplicate', None),
+            (8, 'duplicate', None),
+            (9, 'unmatched', None),
+            (10, 'invalid', None),
+        ])
+        self.assertEqual(
+            (statement.total_rows, statement.matched, statement.approved, statement.amount_mismatches,
+             statement.duplicates, statement.unmatched),
+            (7, 1, 0, 1, 2, 2),
+        )
+        self.match.refresh_from_db()
+        self.assertFalse(self.match.is_approved)
+
+    def test_approves_matched_payments_only(self):
+        statement = self.reconcile()
+        self.assertEqual(statement.approved, 1)
+        approved = set(Payment.objects.filter(is_approved=True).values_list('pk', flat=True))
+        self.assertEqual(approved, {self.match.pk, self.approved.pk})
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.status, 'Approved')
+
+    def test_rejects_file_without_columns(self):
+        with self.assertRaises(StatementFormatError):
+            reconcile_statement(io.StringIO('Date,Reference\n2026-10-02,X\n'), 'BKASH')
+
+
+class OrderArchiveTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_customer()
+        cls.product = create_product()
+        cls.orders = []
+        for day in range(1, 6):
+            payment = Payment.objects.create(user=cls.user, payment_id=f'PAY-{day}', payment_method='BKASH',
+                                             transaction_id=f'TRX{day}', amount_paid=1150, status='Paid (Full)')
+            order = create_order(cls.user, payment=payment, status='Completed')
+            line = OrderProduct.objects.create(order=order, payment=payment, user=cls.user, product=cls.product,
+                                               quantity=2, product_price=500, ordered=True)
+            line.variations.set(cls.product.variation_set.all())
+            order.refresh_item_totals()
+            order.update_totals()
+            Order.objects.filter(pk=order.pk).update(created_at=timezone.make_aware(datetime(2026, 10, day, 12)))
+            order.refresh_from_db()
+            cls.orders.append(order)
+
+    def test_archive_batch_moves_order_out(self):
+        order = self.orders[0]
+        self.assertEqual(archive_batch([order.pk]), 1)
+        self.assertFalse(Order.objects.filter(pk=order.pk).exists())
+        self.assertFalse(OrderProduct.objects.filter(order_id=order.pk).exists())
+        self.assertFalse(Payment.objects.filter(pk=order.payment_id).exists())
+
+        archived = ArchivedOrder.objects.get(original_id=order.pk)
+        self.assertEqual((archived.order_number, archived.payment_method, archived.order_total),
+                         (order.order_number, 'BKASH', order.order_total))
+        self.assertEqual(list(archived.purchases.values_list('user_id', 'product_id')), [(self.user.pk, self.product.pk)])
+
+    def test_restored_order_and_lines(self):
+        order = self.orders[0]
+        live_lines = load_order_lines(order)
+        archive_batch([order.pk])
+        archived = ArchivedOrder.objects.get(original_id=order.pk)
+        with self.assertNumQueries(0):
+            restored = archived.as_order()
+            lines = archived.as_order_lines()
+        self.assertEqual((restored.pk, restored.order_number, restored.created_at), (order.pk, order.order_number, order.created_at))
+        self.assertEqual((restored.subtotal, restored.item_count, restored.order_total), (1000, 2, order.order_total))
+        self.assertEqual((restored.payment.transaction_id, restored.payment.amount_paid), ('TRX1', 1150))
+        self.assertEqual([(line.product_name, line.quantity, line.product_price) for line in lines],
+                         [('Test Shirt', 2, 500)])
+        self.assertCountEqual([v['variation_value'] for v in lines[0].variations], ['red', 'M'])
+        self.assertEqual(lines, live_lines)  # the invoice shows the same as before archiving
+
+    def test_archived_order_page_shows_its_lines(self):
+        order = self.orders[0]
+        archive_batch([order.pk])
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('order_detail', args=[order.order_number]))
+        self.assertContains(response, 'Test Shirt')
+        self.assertContains(response, 'Color: Red')
+
+    def test_history_merges_live_and_archived(self):
+        archive_batch([self.orders[1].pk, self.orders[3].pk])
+        seen, cursor = [], None
+        while True:
+            page, cursor = paginate_customer_orders(self.user, cursor=cursor, page_size=2)
+            seen.append([order.order_number for order in page])
+            if cursor is None:
+                break
+        newest_first = [order.order_number for order in reversed(self.orders)]
+        self.assertEqual(seen, [newest_first[0:2], newest_first[2:4], newest_first[4:]])
+
+    def test_archived_buyers_can_still_review(self):
+        archive_batch([order.pk for order in self.orders])
+        self.assertFalse(OrderProduct.objects.filter(user=self.user).exists())
+        self.assertTrue(has_purchased(self.user, self.product.pk))
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('product_detail', args=[self.product.category.slug, self.product.slug]))
+        self.assertTrue(response.context['orderproduct'])
+        self.assertFalse(has_purchased(create_customer('other'), self.product.pk))
+
+
+class CheckoutPrefillTests(TestCase):
+
+    def test_saved_address_cannot_break_out_of_the_script(self):
+        user = create_customer()
+        CartItem.objects.create(user=user, product=create_product(), quantity=1)
+        remember_address(user, address_line_1='Road 1</script><script>alert(1)</script>', state='Dhaka')
+        self.client.force_login(user)
+        response = self.client.get(reverse('orders:checkout'))
+        self.assertNotContains(response, '<script>alert(1)')
+        self.assertContains(response, 'Road 1\\u003C/script\\u003E\\u003Cscript\\u003Ealert(1)')
+
+
+class PlaceOrderTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_customer()
+        cls.product = create_product(price=500)
+
+    def test_charges_current_prices_not_the_memoized_total(self):
+        CartItem.objects.create(user=self.user, product=self.product, quantity=2)
+        self.assertEqual(pricing.cart_pricing(self.user).subtotal, 1000)  # memoized for display
+        # A price change the memoized total has not seen (another worker, a queryset update)
+        Product.objects.filter(pk=self.product.pk).update(price=600)
+
+        self.client.force_login(self.user)
+        session = self.client.session
+        session['checkout_data'] = {
+            'first_name': 'Test', 'last_name': 'Customer', 'phone': '01700000000',
+            'email': 'customer@example.com', 'address_line_1': 'Road 1', 'country': 'Bangladesh',
+            'state': 'Dhaka', 'area': '', 'address_line_2': '', 'order_note': '',
+        }
+        session.save()
+        response = self.client.post(reverse('orders:payments'), {'payment_method': 'COD', 'payment_type': 'FULL'})
+        self.assertRedirects(response, reverse('orders:order_complete'), fetch_redirect_response=False)
+
+        order = Order.objects.get(user=self.user)
+        line = order.orderproduct_set.get()
+        self.assertEqual((line.product_price, line.quantity), (600, 2))
+        self.assertEqual((order.subtotal, order.item_count), (1200, 2))
+        self.assertEqual(order.order_total, 1200 + order.delivery_charge)
+        self.assertEqual(order.payment.amount_paid, order.order_total)
+
+
+class PaymentSettingsCacheTests(TestCase):
+
+    def test_saving_invalidates_every_worker(self):
+        other_worker = caches.create_connection('default')
+        self.assertEqual(PaymentSettings.current().bkash_number, '01XXXXXXXXX')  # placeholder, cached
+        row = PaymentSettings.objects.create(bkash_number='01711111111')
+        with mock.patch('core.singletons.cache', other_worker):
+            self.assertEqual(PaymentSettings.current().bkash_number, '01711111111')
+
+        row.bkash_number = '01722222222'
+        row.save()
+        with mock.patch('core.singletons.cache', other_worker):
+            self.assertEqual(PaymentSettings.current().bkash_number, '01722222222')
+
+        # A queryset update has to clear the cached copy itself
+        PaymentSettings.objects.update(bkash_number='01733333333')
+        self.assertEqual(PaymentSettings.current().bkash_number, '01722222222')
+        PaymentSettings.clear_singleton_cache()
+        self.assertEqual(PaymentSettings.current().bkash_number, '01733333333')
+
+        row.delete()
+        with mock.patch('core.singletons.cache', other_worker):
+            self.assertEqual(PaymentSettings.current().bkash_number, '01XXXXXXXXX')
@@ -6,9 +6,12 @@ app_name = 'orders'
 
 urlpatterns = [
     path('checkout/', views.checkout, name='checkout'),
+    path('delivery-charges.json', views.delivery_charges, name='delivery_charges_latest'),
+    path('delivery-charges/<str:version>.json', views.delivery_charges, name='delivery_charges'),
     path('place_order/', views.place_order, name='place_order'),
     path('payments/',views.payments,name="payments"),
     path('order_complete/',views.order_complete,name='order_complete'),
+    path('reconcile/', views.reconcile_statement, name='reconcile_statement'),
 ]
 
 
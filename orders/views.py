@@ -4,24 +4,27 @@ from django.shortcuts import render, redirect
 from django.http import HttpResponse, JsonResponse
 from django.db import transaction
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.utils import timezone
 from django.db.models import Q
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from core.email_templates import render_email
+from core.mail import build_email, send_email
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 from .forms import OrderForm, PaymentForm, BANGLADESH_DISTRICTS
-import datetime
 import uuid
-import json
 
 from carts.models import Cart, CartItem
-from carts.views import _cart_id
-from .forms import OrderForm, PaymentForm
-from .models import Order, Payment, OrderProduct, PaymentSettings, DeliveryCharge
+from carts import pricing
+from carts.views import _cart_id, _cart_owner
+from .forms import OrderForm, PaymentForm, StatementUploadForm
+from .models import Order, Payment, OrderProduct, PaymentSettings, OrderNumberSequence
 from store.models import Product
-from accounts.models import UserProfile
+from accounts.address_book import get_address_book, remember_order_address
+from .delivery import delivery_charge_table
+from .reconciliation import StatementFormatError, reconcile_statement as run_reconciliation
 
 
 def _d(val) -> Decimal:
@@ -33,18 +36,16 @@ def _d(val) -> Decimal:
     return x.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
 
-def _compute_delivery_charge_by_district(district: str) -> Decimal:
-    """Calculate delivery charge based on district."""
-    district_norm = (district or "").strip()
-    try:
-        dc = DeliveryCharge.objects.get(district__iexact=district_norm)
-        return dc.charge
-    except DeliveryCharge.DoesNotExist:
-        try:
-            default_dc = DeliveryCharge.objects.get(is_default=True)
-            return default_dc.charge
-        except DeliveryCharge.DoesNotExist:
-            return Decimal("150.00")
+def _claim_session_cart(request):
+    """Move rows added before signing in onto the user's cart."""
+    if not request.user.is_authenticated:
+        return
+    claimed = CartItem.objects.filter(
+        cart__cart_id=_cart_id(request),
+        user__isnull=True
+    ).update(user=request.user)
+    if claimed:
+        pricing.bump_cart_version(user_id=request.user.pk)
 
 
 def _client_ip(request) -> str:
@@ -85,30 +86,12 @@ class _PreviewOrder:
 def checkout(request, total=0, quantity=0, cart_items=None):
     """Display checkout page with billing form."""
     districts = BANGLADESH_DISTRICTS
-    try:
-        delivery_charge = Decimal("0.00")
-        grand_total = Decimal("0.00")
-
-        if request.user.is_authenticated:
-            cart_items = CartItem.objects.filter(user=request.user, is_active=True)
-        else:
-            cart = Cart.objects.get(cart_id=_cart_id(request))
-            cart_items = CartItem.objects.filter(cart=cart, is_active=True)
-
-        for cart_item in cart_items:
-            total += (cart_item.product.price * cart_item.quantity)
-            quantity += cart_item.quantity
-
-        # Calculate delivery charge (default, will update based on district selection)
-        delivery_charge = Decimal("150.00")
-        grand_total = _d(total) + delivery_charge
-
-    except ObjectDoesNotExist:
-        pass
-
+    user, session_cart = _cart_owner(request)
+    cart_items = pricing.with_line_totals(pricing.cart_items(user, session_cart))
 
     # Prepare user data for auto-fill
     user_data = {}
+    saved_addresses = []
     if request.user.is_authenticated:
         user_data = {
             'first_name': request.user.first_name,
@@ -117,64 +100,70 @@ def checkout(request, total=0, quantity=0, cart_items=None):
             'phone': getattr(request.user, 'phone_number', ''),
         }
 
-        # Try to get data from user profile
-        try:
-            profile = UserProfile.objects.get(user=request.user)
+        # Saved address book (kept up to date on order placement and profile edits,
+        # cached per user), most recently used first
+        saved_addresses = get_address_book(request.user)
+        if saved_addresses:
+            latest = saved_addresses[0]
             user_data.update({
-                'address_line_1': profile.address_line_1 or '',
-                'address_line_2': profile.address_line_2 or '',
-                'area': profile.area or '',
-                'state': profile.city or '',
-                'country': profile.country or 'Bangladesh',
+                field: latest[field]
+                for field in ('address_line_1', 'address_line_2', 'area', 'state', 'country')
             })
-        except UserProfile.DoesNotExist:
-            pass
+            user_data['phone'] = user_data['phone'] or latest['phone']
 
-        # Try to get data from last order (override profile data)
-        try:
-            last_order = Order.objects.filter(
-                user=request.user,
-                is_ordered=True
-            ).order_by('-created_at').first()
-
-            if last_order:
-                user_data.update({
-                    'address_line_1': last_order.address_line_1 or user_data.get('address_line_1', ''),
-                    'address_line_2': last_order.address_line_2 or user_data.get('address_line_2', ''),
-                    'area': last_order.area or user_data.get('area', ''),
-                    'state': last_order.state or user_data.get('state', ''),
-                    'country': last_order.country or user_data.get('country', 'Bangladesh'),
-                })
-        except Exception:
-            pass
+    # Charge for the district the form will open with; the page re-prices on its own
+    # from the cached delivery-charge table when the district changes.
+    form_data = request.session.get('checkout_data', {})
+    delivery_table = delivery_charge_table()
+    district = form_data.get('state') or user_data.get('state', '')
+    cart_pricing = pricing.cart_pricing(user, session_cart).with_delivery(district, delivery_table)
 
     context = {
-        'total': _d(total),
-        'quantity': quantity,
+        'total': cart_pricing.subtotal,
+        'quantity': cart_pricing.item_count,
         'cart_items': cart_items,
-        'delivery_charge': delivery_charge,
-        'grand_total': grand_total,
+        'delivery_charge': cart_pricing.delivery_charge,
+        'grand_total': cart_pricing.grand_total,
         'districts': districts, 
-        'user_data': json.dumps(user_data),
-        'form_data': request.session.get('checkout_data', {}),
+        'user_data': user_data,
+        'saved_addresses': saved_addresses,
+        'delivery_charges_url': reverse('orders:delivery_charges', args=[delivery_table['version']]),
+        'form_data': form_data,
     }
     return render(request, 'store/checkout.html', context) 
 
 
+DELIVERY_CHARGES_MAX_AGE = 60 * 60 * 24 * 365
+
+
+def delivery_charges(request, version=None):
+    """
+    District -> delivery charge table as JSON, for pricing the checkout page in the browser.
+    The versioned URL never changes content and is cached for a year; the bare URL is
+    revalidated with its ETag.
+    """
+    table = delivery_charge_table()
+    if version and version != table['version']:
+        return redirect('orders:delivery_charges', table['version'])
+
+    etag = f'"{table["version"]}"'
+    response = get_conditional_response(request, etag=etag) or JsonResponse(table)
+    response['ETag'] = etag
+    if version:
+        patch_cache_control(response, public=True, max_age=DELIVERY_CHARGES_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=300)
+    return response
+
+
 @transaction.atomic
 def place_order(request, total=0, quantity=0):
     """Validate form and store in session, then redirect to payments."""
     # Merge anonymous cart with user cart if logged in
-    if request.user.is_authenticated:
-        CartItem.objects.filter(
-            cart__cart_id=_cart_id(request),
-            user__isnull=True
-        ).update(user=request.user)
+    _claim_session_cart(request)
 
     # Get cart items
-    cart_items = CartItem.objects.filter(
-        Q(user=request.user) | Q(cart__cart_id=_cart_id(request))
-    ).distinct()
+    cart_items = pricing.cart_items(*_cart_owner(request))
 
     if not cart_items.exists():
         messages.error(request, 'Your cart is empty.')
@@ -217,11 +206,7 @@ def place_order(request, total=0, quantity=0):
 def payments(request):
     """GET: show payment page. POST: create Order and Payment."""
     # Merge anonymous cart with user cart if logged in
-    if request.user.is_authenticated:
-        CartItem.objects.filter(
-            cart__cart_id=_cart_id(request),
-            user__isnull=True
-        ).update(user=request.user)
+    _claim_session_cart(request)
 
     checkout_data = request.session.get('checkout_data')
 
@@ -232,43 +217,29 @@ def payments(request):
 
         preview = _PreviewOrder(checkout_data)
 
-        cart_items = CartItem.objects.filter(
-            Q(user=request.user) | Q(cart__cart_id=_cart_id(request))
-        ).distinct()
+        user, session_cart = _cart_owner(request)
+        cart_items = pricing.cart_items(user, session_cart)
 
         if not cart_items.exists():
             messages.error(request, 'Your cart is empty.')
             return redirect('store')
 
-        total = Decimal("0.00")
-        for item in cart_items.select_related('product'):
-            if not item.product:
-                continue
-            total += _d(item.product.price) * Decimal(item.quantity or 0)
-
-        delivery_charge = _compute_delivery_charge_by_district(preview.state)
-        grand_total = _d(total) + _d(delivery_charge)
+        cart_pricing = pricing.cart_pricing(user, session_cart, district=preview.state)
 
-        preview.delivery_charge = _d(delivery_charge)
-        preview.order_total = _d(grand_total)
+        preview.delivery_charge = cart_pricing.delivery_charge
+        preview.order_total = cart_pricing.grand_total
 
         state_norm = (preview.state or '').strip().lower()
         preview.requires_advance = bool(state_norm and state_norm != 'dhaka')
 
-        payment_settings, _ = PaymentSettings.objects.get_or_create(
-            defaults={
-                'bkash_number': '01XXXXXXXXX',
-                'nagad_number': '01XXXXXXXXX',
-                'rocket_number': '01XXXXXXXXX'
-            }
-        )
+        payment_settings = PaymentSettings.current()
 
         context = {
             'order': preview,
-            'cart_items': cart_items,
-            'total': _d(total),
-            'delivery_charge': _d(delivery_charge),
-            'grand_total': _d(grand_total),
+            'cart_items': pricing.with_line_totals(cart_items),
+            'total': cart_pricing.subtotal,
+            'delivery_charge': cart_pricing.delivery_charge,
+            'grand_total': cart_pricing.grand_total,
             'payment_settings': payment_settings,
         }
         return render(request, 'orders/payments.html', context)
@@ -306,22 +277,21 @@ def payments(request):
 
     final_payment_method = 'COD' if payment_method == 'COD' else online_payment_method
 
-    cart_items = CartItem.objects.filter(
-        Q(user=request.user) | Q(cart__cart_id=_cart_id(request))
-    ).distinct()
+    user, session_cart = _cart_owner(request)
+    cart_items = pricing.cart_items(user, session_cart)
 
     if not cart_items.exists():
         messages.error(request, 'Your cart is empty.')
         return redirect('store')
 
-    items_subtotal = Decimal("0.00")
-    for item in cart_items.select_related('product'):
-        if not item.product:
-            continue
-        items_subtotal += _d(item.product.price) * Decimal(item.quantity or 0)
-
-    delivery_charge = _compute_delivery_charge_by_district(checkout_data.get('state'))
-    grand_total = _d(items_subtotal) + _d(delivery_charge)
+    # Charge what the order lines will say: totals from these rows at the current
+    # prices, not the memoized display total
+    items = list(cart_items.select_related('product').prefetch_related('variations'))
+    cart_pricing = pricing.CartPricing.from_items(items).with_delivery(checkout_data.get('state', ''))
+    items_subtotal = cart_pricing.subtotal
+    item_count = cart_pricing.item_count
+    delivery_charge = cart_pricing.delivery_charge
+    grand_total = cart_pricing.grand_total
 
     amount_paid = grand_total if payment_type == 'FULL' else _d(delivery_charge)
     amount_paid = _d(amount_paid)
@@ -353,19 +323,16 @@ def payments(request):
         country=checkout_data.get('country', ''),
         state=checkout_data.get('state', ''),
         order_note=checkout_data.get('order_note', ''),
-        order_number=datetime.date.today().strftime("%Y%m%d"),
+        order_number=OrderNumberSequence.allocate(),
         order_total=_d(grand_total),
+        subtotal=_d(items_subtotal),
+        item_count=item_count,
         delivery_charge=_d(delivery_charge),
         payment_status=payment_status,
         is_ordered=False,
         ip=_client_ip(request)[:45],
     )
 
-    # Generate proper order number
-    current_date = datetime.date.today().strftime("%Y%m%d")
-    order.order_number = f"{current_date}{order.id}"
-    order.save(update_fields=['order_number'])
-
     # Create Payment with proper status
     payment = Payment.objects.create(
         user=request.user if request.user.is_authenticated else None,
@@ -383,7 +350,7 @@ def payments(request):
     order.save(update_fields=['payment', 'is_ordered'])
 
     # Move cart items to OrderProduct
-    for item in cart_items.select_related('product'):
+    for item in items:
         if not item.product:
             continue
 
@@ -408,35 +375,32 @@ def payments(request):
     # Clear cart
     cart_items.delete()
 
+    # Offer this address again next time
+    if order.user_id:
+        remember_order_address(order)
+
     # Send confirmation email
     try:
         subject = 'Order Confirmation - Thanks for your order!'
         ordered_products = order.orderproduct_set.select_related('product').prefetch_related('variations')
-        subtotal_val = sum(
-            (op.product_price or 0) * (op.quantity or 0)
-            for op in ordered_products
-        )
 
         context = {
             'order': order,
             'payment': payment,
             'ordered_products': ordered_products,
-            'subtotal': subtotal_val,
+            'subtotal': order.subtotal,
             'domain': getattr(settings, 'SITE_URL', 'https://yourdomain.com'),
             'now': timezone.now(),
         }
 
-        html_body = render_to_string('orders/order_received_email.html', context)
-        text_body = strip_tags(html_body)
+        html_body, text_body = render_email('orders/order_received_email', context)
 
-        msg = EmailMultiAlternatives(
+        send_email(build_email(
             subject=subject,
-            body=text_body,
+            html_body=html_body,
+            text_body=text_body,
             to=[order.email],
-            from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', None),
-        )
-        msg.attach_alternative(html_body, "text/html")
-        msg.send()
+        ))
     except Exception as e:
         print(f"Email sending failed: {e}")
 
@@ -457,11 +421,6 @@ def order_complete(request):
     try:
         order = Order.objects.get(order_number=order_number, is_ordered=True)
         ordered_products = OrderProduct.objects.filter(order_id=order.id)
-
-        subtotal = Decimal("0.00")
-        for item in ordered_products:
-            subtotal += _d(item.product_price) * Decimal(item.quantity or 0)
-
         payment = Payment.objects.get(payment_id=payment_id)
 
         context = {
@@ -470,9 +429,41 @@ def order_complete(request):
             'order_number': order.order_number,
             'payment_id': payment.payment_id,
             'payment': payment,
-            'subtotal': subtotal,
+            'subtotal': order.subtotal,
         }
         return render(request, 'orders/order_complete.html', context)
     except (Payment.DoesNotExist, Order.DoesNotExist):
         return redirect('home')
-    
\ No newline at end of file
+    
+
+
+@staff_member_required
+def reconcile_statement(request):
+    """Upload a bKash/Nagad/Rocket statement CSV and reconcile it against wallet payments."""
+    form = StatementUploadForm(request.POST or None, request.FILES or None)
+    if request.method == 'POST' and form.is_valid():
+        upload = form.cleaned_data['statement']
+        try:
+            statement = run_reconciliation(
+                upload,
+                form.cleaned_data['provider'],
+                user=request.user,
+                file_name=upload.name,
+                approve=form.cleaned_data['approve_matches'],
+            )
+        except StatementFormatError as e:
+            form.add_error('statement', str(e))
+        else:
+            messages.success(
+                request,
+                f"{statement.total_rows} rows reconciled: {statement.approved} payment(s) approved, "
+                f"{statement.amount_mismatches} amount mismatch(es), {statement.duplicates} duplicate(s), "
+                f"{statement.unmatched} unmatched.",
+            )
+            return redirect('admin:orders_statementimport_change', statement.pk)
+
+    return render(request, 'orders/reconcile_statement.html', {
+        'title': 'Reconcile wallet statement',
+        'form': form,
+    })
+
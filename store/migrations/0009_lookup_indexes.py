@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0008_delete_banner'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reviewrating',
+            index=models.Index(fields=['product', 'status'], name='store_review_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='variation',
+            index=models.Index(fields=['product', 'variation_category', 'is_active'], name='store_var_product_cat_idx'),
+        ),
+    ]
@@ -65,6 +65,11 @@ class Variation(models.Model):
     
     objects = VariationManager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'variation_category', 'is_active'], name='store_var_product_cat_idx'),
+        ]
+
     def __str__(self):
         return self.variation_value
     
@@ -79,6 +84,11 @@ class ReviewRating(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'status'], name='store_review_product_idx'),
+        ]
+
     def __str__(self):
         return self.subject or f"Review by {self.user}"
     
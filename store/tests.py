@@ -1,3 +1,32 @@
+# store/tests.py
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from core.testing import QueryPlanTestMixin, create_customer, create_product
+from orders.models import Order, OrderProduct
+from store.models import ReviewRating
+
+
+class ProductDetailQueryPlanTests(QueryPlanTestMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_customer()
+        cls.product = create_product()
+        ReviewRating.objects.create(product=cls.product, user=cls.user, subject='Nice', rating=5)
+        order = Order.objects.create(user=cls.user, first_name='Test', last_name='Customer',
+                                     phone='01700000000', email='customer@example.com',
+                                     address_line_1='Road 1', state='Dhaka', order_total=500,
+                                     is_ordered=True)
+        OrderProduct.objects.create(order=order, user=cls.user, product=cls.product,
+                                    quantity=1, product_price=500, ordered=True)
+        cls.url = reverse('product_detail', args=[cls.product.category.slug, cls.product.slug])
+
+    def test_anonymous(self):
+        response = self.assertNoFullScans(self.client.get, self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_authenticated(self):
+        self.client.force_login(self.user)
+        response = self.assertNoFullScans(self.client.get, self.url)
+        self.assertEqual(response.status_code, 200)
@@ -11,7 +11,7 @@ from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from django.db.models import Q
 from .forms import ReviewForm
 from django.contrib import messages
-from orders.models import OrderProduct
+from orders.services import has_purchased
 
 
 def store(request, category_slug=None):
@@ -105,10 +105,7 @@ def product_detail(request, category_slug, product_slug):
 
     orderproduct = False
     if request.user.is_authenticated:
-        orderproduct = OrderProduct.objects.filter(
-            user=request.user,
-            product_id=single_product.id
-        ).exists()
+        orderproduct = has_purchased(request.user, single_product.id)
     
     reviews = ReviewRating.objects.filter(product_id=single_product.id, status=True)
     product_gallery = ProductGallery.objects.filter(product_id=single_product.id)